@@ -5,6 +5,7 @@ import time               # 재시도 시 지연(대기) 처리용
 import requests           # HTTP 요청 라이브러리
 from tqdm import tqdm     # 진행 상황(progress bar) 표시
 from subprocess import run, CalledProcessError  # ffmpeg 실행용
+from buffers import SegmentBuffer, SegmentBufferPool, read_segment_into  # 재사용 수신 버퍼
 
 # ===================== 사용자 설정 =====================
 # BASE URL 예시들 (필요 시 직접 선택/수정)
@@ -32,6 +33,7 @@ OUT_MP4 = "output.mp4" # 최종 출력 mp4 파일명
 RETRY = 3              # 다운로드 재시도 횟수
 TIMEOUT = 30           # HTTP 요청 타임아웃(초)
 STOP_AFTER_N_404 = 5   # 연속 404가 몇 번 나오면 종료할지
+CHUNK_SIZE = 64 * 1024 # 스트리밍 수신 청크 크기
 
 # 실제 브라우저 요청 헤더 (DevTools → Request Headers에서 복사 가능)
 # Cookie 필요 시 아래 주석 해제 후 값 넣어야 함
@@ -45,31 +47,34 @@ HEADERS = {
 # =======================================================
 
 
-def download_segment(i: int, session: requests.Session) -> bytes:
-    """단일 세그먼트를 다운로드하여 바이트 데이터를 반환"""
+def download_segment(i: int, session: requests.Session, buf: SegmentBuffer) -> bool:
+    """단일 세그먼트를 buf 에 스트리밍으로 받음 (404면 False)"""
     num = str(i).zfill(ZEROPAD)      # 4자리 형식(예: 0001)
     url = f"{BASE}{num}.jpg"         # 최종 세그먼트 URL
     for attempt in range(1, RETRY + 1):   # 재시도 루프
         try:
             # GET 요청 (stream=True: 큰 파일 대비)
             with session.get(url, headers=HEADERS, timeout=TIMEOUT, stream=True) as r:
-                if r.status_code == 404:  # 파일 없음 → None 반환
-                    return None
+                if r.status_code == 404:  # 파일 없음 → False 반환
+                    return False
                 r.raise_for_status()      # 다른 오류 발생 시 예외 발생
-                return r.content          # 정상 → 바이트 데이터 반환
+                read_segment_into(r, buf, CHUNK_SIZE)  # 청크 단위로 버퍼에 수신 (0x47 확인 포함)
+                return True
         except Exception as e:
             # 재시도 횟수 도달 시 마지막 예외 발생
             if attempt == RETRY:
                 raise
             # 점진적 대기 (1초, 2초, 3초 …)
             time.sleep(1.0 * attempt)
-    return None  # 안전용 반환
+    return False  # 안전용 반환
 
 
 def main():
     session = requests.Session()  # 세션 생성(연결 재사용)
     n404 = 0                      # 연속 404 카운터
     total_written = 0             # 총 다운로드된 바이트 수
+    pool = SegmentBufferPool(1)   # 세그먼트마다 재사용할 수신 버퍼
+    buf = pool.acquire()
 
     # 기존 병합 TS 파일 삭제 (있으면 덮어쓰기)
     if os.path.exists(OUT_TS):
@@ -84,13 +89,13 @@ def main():
                 break
 
             try:
-                blob = download_segment(i, session)  # 세그먼트 다운로드
+                found = download_segment(i, session, buf)  # 세그먼트 다운로드
             except Exception as e:
                 # 다운로드 자체 실패 시 에러 출력 후 종료
                 print(f"[!] {i:0{ZEROPAD}} 다운로드 실패: {e}", file=sys.stderr)
                 return 1
 
-            if blob is None:
+            if not found:
                 # 세그먼트 없음 (404)
                 n404 += 1
                 if END is None and n404 >= STOP_AFTER_N_404:
@@ -99,14 +104,16 @@ def main():
             else:
                 # 정상 세그먼트 받음
                 n404 = 0
-                merged.write(blob)              # 파일에 이어쓰기
-                total_written += len(blob)      # 총량 누적
+                merged.write(buf.view())        # 파일에 이어쓰기 (복사 없음)
+                total_written += buf.length     # 총량 누적
                 # 진행바 업데이트
-                bar.set_postfix(idx=i, size=f"{len(blob)/1024:.0f}KB")
+                bar.set_postfix(idx=i, size=f"{buf.length/1024:.0f}KB")
                 bar.update(1)
 
             i += 1  # 다음 세그먼트 번호로 진행
 
+    print(f"[*] 수신 버퍼 최대 사용: {pool.peak_bytes / (1024 * 1024):.1f} MB")
+
     # 하나도 못 받았다면 에러 메시지 출력
     if total_written == 0:
         print("아무 세그먼트도 받지 못했습니다. BASE/헤더/범위를 확인하세요.")
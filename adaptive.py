@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Dict, Optional
+
+
+class AimdController:
+    """호스트별 동시 요청 수 조절기 (AIMD: 덧셈 증가 / 곱셈 감소)
+
+    - 창(window)만큼의 요청이 끝날 때마다 한 라운드로 보고, 처리량이 늘었고
+      지연이 안정적이면(기준 지연의 2배 이내) 창을 1 늘린다
+    - 타임아웃, 429, 5xx 가 오면 창을 절반으로 줄인다 (한 라운드에 한 번만)
+    - 같은 호스트로 가는 모든 잡이 공유하며, acquire/release 로 호스트 전체의
+      동시 요청 수가 창을 넘지 않게 한다
+    """
+
+    def __init__(self, host: str, initial: int = 4, minimum: int = 1, maximum: int = 32):
+        self.host = host
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self._window = min(max(initial, self.minimum), self.maximum)
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        # 현재 라운드 집계
+        self._round_start = time.monotonic()
+        self._round_count = 0
+        self._round_bytes = 0
+        self._round_latency = 0.0
+        self._prev_throughput = 0.0
+        self._base_latency: Optional[float] = None  # 지금까지 본 가장 낮은 라운드 평균 지연
+        self._cooldown_until = 0.0  # 이 시각 전에는 추가 감소 안 함
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def window(self) -> int:
+        return self._window
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    # ---------- 동시 요청 슬롯 ----------
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """창 안에 빈 자리가 있으면 차지 (timeout 동안 대기)"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._in_flight < self._window, timeout=timeout):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    # ---------- 신호 ----------
+    def _reset_round(self, now: float):
+        self._round_start = now
+        self._round_count = 0
+        self._round_bytes = 0
+        self._round_latency = 0.0
+
+    def on_success(self, latency: float, nbytes: int):
+        """요청 성공 - 라운드가 끝나면 창 증가 여부 판단"""
+        with self._cond:
+            self._round_count += 1
+            self._round_bytes += nbytes
+            self._round_latency += latency
+            if self._round_count < self._window:
+                return
+            now = time.monotonic()
+            elapsed = max(now - self._round_start, 1e-6)
+            throughput = self._round_bytes / elapsed
+            avg_latency = self._round_latency / self._round_count
+            if self._base_latency is None or avg_latency < self._base_latency:
+                self._base_latency = avg_latency
+            latency_stable = avg_latency <= self._base_latency * 2
+            improving = throughput >= self._prev_throughput * 1.05
+            if latency_stable and improving and self._window < self.maximum:
+                self._window += 1
+                self.increases += 1
+                self._cond.notify_all()
+            self._prev_throughput = throughput
+            self._reset_round(now)
+
+    def on_congestion(self):
+        """타임아웃/429/5xx - 창 절반으로 (연속 신호는 한 라운드에 한 번만 반영)"""
+        with self._cond:
+            now = time.monotonic()
+            if now < self._cooldown_until:
+                return
+            new_window = max(self.minimum, self._window // 2)
+            if new_window < self._window:
+                self._window = new_window
+                self.decreases += 1
+            # 줄어든 창으로 다시 처리량 기준을 잡음
+            self._prev_throughput = 0.0
+            avg = self._base_latency or 1.0
+            self._cooldown_until = now + max(1.0, avg * 2)
+            self._reset_round(now)
+
+
+_controllers: Dict[str, AimdController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_controller(host: str, initial: int = 4, maximum: int = 32) -> AimdController:
+    """호스트별 공유 조절기 (처음 요청한 잡의 설정으로 생성)"""
+    key = (host or "").lower()
+    with _controllers_lock:
+        controller = _controllers.get(key)
+        if controller is None:
+            controller = _controllers[key] = AimdController(key, initial=initial, maximum=maximum)
+        elif maximum > controller.maximum:
+            controller.maximum = maximum
+        return controller
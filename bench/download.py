@@ -0,0 +1,240 @@
+"""다운로드 벤치마크: 로컬 서버(bench.server) 시나리오별 처리량/프로브 수/첫 바이트 시간/메모리
+
+사용법:
+    python -m bench.download [--scenario baseline --scenario flaky ...] [--repeat 1] [--json]
+    python -m bench.download --list
+    python -m bench.download --save before.json        # 결과 저장
+    python -m bench.download --compare before.json     # 처리량이 tolerance 배 넘게 떨어지면 실패
+
+- 서버는 이 프로세스, 다운로드 작업(engine)은 시나리오마다 새 프로세스 → 최대 RSS 가 작업만의 값
+- 변환은 후처리 대기열로 넘기므로 다운로드 시간(download_s)과 전체 시간(total_s)을 나눠 잰다
+- 결과 항목: segments_per_s, mb_per_s, probe_requests(서버가 받은 HEAD 수), engine_probes,
+  time_to_first_byte_s(작업 시작 ~ 첫 세그먼트 기록), peak_rss_mb, 서버 통계(404, 주입 오류, 429 ...)
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from bench.server import SegmentServer, ServerConfig
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class Scenario:
+    """서버 설정 + 작업 설정 변경분"""
+    description: str
+    server: ServerConfig
+    job: Dict[str, object] = field(default_factory=dict)  # JobConfig 필드 덮어쓰기
+    kind: str = "segment"  # segment: 세그먼트 작업, ytdlp: index.m3u8 를 yt-dlp 작업으로
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "baseline": Scenario("지연 20ms, 오류 없음", ServerConfig(segments=200)),
+    "high_latency": Scenario("지연 150ms + 지터 50ms", ServerConfig(segments=150, latency=0.15, jitter=0.05)),
+    "bandwidth": Scenario("응답당 2 MB/s 제한 (동시 요청 수가 처리량을 좌우)",
+                          ServerConfig(segments=60, bandwidth=2e6)),
+    "flaky": Scenario("요청 5% 에 500/503/429 주입", ServerConfig(segments=150, error_rate=0.05,
+                                                             error_codes=(500, 503, 429))),
+    "rate_limited": Scenario("동시 4개 넘으면 429 (Retry-After 1)", ServerConfig(segments=150, max_concurrent=4)),
+    "probe_long": Scenario("작은 세그먼트 3000개 - 끝번호 탐지 비중 큼",
+                           ServerConfig(segments=3000, segment_bytes=16 * 1024, latency=0.01)),
+    "gaps": Scenario("60~62 404, 끝번호 모름 (연속 404 로 종료)",
+                     ServerConfig(segments=200, missing=[(60, 62)]), {"auto_detect": False, "start": 1}),
+    "placeholder": Scenario("없는 번호에 200 + 대체 TS", ServerConfig(segments=120, placeholder="ts")),
+    "sequential": Scenario("동시 요청 1개", ServerConfig(segments=100), {"concurrency": 1}),
+    "stream_remux": Scenario("스트리밍 변환 (내장 변환기)", ServerConfig(segments=150), {"stream_remux": True}),
+    "ytdlp_hls": Scenario("HLS 재생목록을 yt-dlp 작업으로", ServerConfig(segments=60), kind="ytdlp"),
+}
+
+_CHILD_FIELDS = ("ok", "message", "segments", "bytes", "download_s", "total_s", "time_to_first_byte_s",
+                 "engine_probes", "peak_rss_mb")
+
+
+def run_child(spec: dict) -> dict:
+    """새 프로세스에서 작업 하나를 실행 (--child) - 결과 dict"""
+    import threading
+
+    from engine import SegmentDownloadJob, create_job
+    from models import JobConfig, VideoType
+    from postprocess import PostProcessQueue
+
+    cfg = JobConfig(base_folder_url=spec["url"], save_dir=spec["save_dir"], out_name="bench.mp4",
+                    video_type=VideoType.PORNHUB if spec["kind"] == "ytdlp" else VideoType.YASYA,
+                    headers={"User-Agent": "bench"}, use_cache=False, remuxer="builtin",
+                    cookies_from_browser=None)  # 로컬 서버라 브라우저 쿠키 불필요 (Chrome 없는 환경에서도 실행)
+    for key, value in spec["job"].items():
+        setattr(cfg, key, value)
+    job = create_job(cfg)
+    queue = PostProcessQueue(max_workers=1)
+    finished = threading.Event()
+    marks: Dict[str, float] = {}
+    counters = {"segments": 0, "bytes": 0}
+    result: Dict[str, object] = {}
+
+    def on_progress(event):
+        # 진행 이벤트는 간격마다 묶여 나오고 마지막 상태는 항상 전달됨
+        if event.bytes_done:
+            marks.setdefault("first_byte", time.perf_counter())
+        counters["segments"] = event.segments_done
+        counters["bytes"] = event.bytes_done
+
+    def on_done(ok: bool, message: str, *_):
+        marks.setdefault("downloaded", time.perf_counter())
+        marks["done"] = time.perf_counter()
+        result.update(ok=ok, message=message)
+        finished.set()
+
+    job.progress.connect(on_progress)
+    job.done.connect(on_done)
+    if isinstance(job, SegmentDownloadJob):
+        job.post_queue = queue
+        job.downloaded.connect(lambda _path: marks.setdefault("downloaded", time.perf_counter()))
+        queue.job_finished.connect(lambda _key, ok, message, _durations: on_done(ok, message))
+
+    t0 = time.perf_counter()
+    job.run()
+    finished.wait(600)
+    queue.shutdown(wait=True)
+
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_rss_mb = rss / (1e6 if sys.platform == "darwin" else 1e3)  # Linux 는 KB, macOS 는 바이트
+    except ImportError:
+        peak_rss_mb = None
+    end = marks.get("done", time.perf_counter())
+    return {
+        "ok": result.get("ok", False),
+        "message": result.get("message", "결과 없음"),
+        "segments": counters["segments"],
+        "bytes": counters["bytes"],
+        "download_s": marks.get("downloaded", end) - t0,
+        "total_s": end - t0,
+        "time_to_first_byte_s": marks["first_byte"] - t0 if "first_byte" in marks else None,
+        "engine_probes": getattr(job, "_probe_count", 0),
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+
+def run_scenario(name: str, scenario: Scenario) -> dict:
+    server = SegmentServer(scenario.server).start()
+    try:
+        folder = f"{server.url}/{name}/"
+        url = folder + "index.m3u8" if scenario.kind == "ytdlp" else folder
+        with tempfile.TemporaryDirectory() as tmp:
+            spec = {"url": url, "save_dir": tmp, "job": scenario.job, "kind": scenario.kind}
+            proc = subprocess.run([sys.executable, "-m", "bench.download", "--child", json.dumps(spec)],
+                                  cwd=ROOT, capture_output=True, text=True, timeout=900)
+        stats = dict(server.stats)
+    finally:
+        server.stop()
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        child = {"ok": False, "message": (proc.stderr.strip().splitlines() or ["작업 프로세스 실패"])[-1]}
+    else:
+        child = json.loads(lines[-1])
+    download_s = child.get("download_s") or 0.0
+    mb = (child.get("bytes") or 0) / 1e6
+    segments = child.get("segments") or stats["get"] - stats["not_found"] - stats["injected_errors"]
+    return {
+        "scenario": name,
+        **{k: child.get(k) for k in _CHILD_FIELDS},
+        "segments_per_s": segments / download_s if download_s else None,
+        "mb_per_s": mb / download_s if download_s else None,
+        "probe_requests": stats["head"],
+        "server": stats,
+        "server_config": asdict(scenario.server),
+        "job_overrides": scenario.job,
+    }
+
+
+def _median_run(runs: List[dict]) -> dict:
+    """반복 결과 중 처리량이 중앙값인 실행 (나머지 값도 그 실행 기준)"""
+    ranked = sorted(runs, key=lambda r: r.get("mb_per_s") or 0.0)
+    result = dict(ranked[len(ranked) // 2])
+    if len(runs) > 1:
+        result["mb_per_s_all"] = [r.get("mb_per_s") for r in runs]
+        result["mb_per_s_stdev"] = statistics.pstdev(r.get("mb_per_s") or 0.0 for r in runs)
+    return result
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """기준보다 처리량이 1/tolerance 밑으로 떨어졌거나 프로브가 tolerance 배 넘게 늘어난 시나리오"""
+    base = {r["scenario"]: r for r in baseline}
+    regressions = []
+    for r in results:
+        b = base.get(r["scenario"])
+        if b is None:
+            continue
+        if r.get("mb_per_s") and b.get("mb_per_s") and r["mb_per_s"] < b["mb_per_s"] / tolerance:
+            regressions.append(f"{r['scenario']}: {r['mb_per_s']:.1f} MB/s (기준 {b['mb_per_s']:.1f})")
+        if b.get("probe_requests") and r["probe_requests"] > b["probe_requests"] * tolerance:
+            regressions.append(f"{r['scenario']}: 프로브 {r['probe_requests']}회 (기준 {b['probe_requests']})")
+        if b.get("ok") and not r.get("ok"):
+            regressions.append(f"{r['scenario']}: 실패 ({r.get('message')})")
+    return regressions
+
+
+def _fmt(value: Optional[float], spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="실행할 시나리오 (여러 번 가능)")
+    parser.add_argument("--repeat", type=int, default=1, help="시나리오별 반복 횟수 (처리량 중앙값 실행 보고)")
+    parser.add_argument("--list", action="store_true", help="시나리오 목록")
+    parser.add_argument("--json", action="store_true", help="JSON 으로 출력")
+    parser.add_argument("--save", metavar="PATH", help="결과 저장")
+    parser.add_argument("--compare", metavar="PATH", help="저장한 결과와 비교 (나빠지면 실패)")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="--compare 허용 배수 (기본 1.5)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child)), ensure_ascii=False))
+        return 0
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            print(f"{name:14} {scenario.description}")
+        return 0
+
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        runs = [run_scenario(name, SCENARIOS[name]) for _ in range(max(1, args.repeat))]
+        result = _median_run(runs)
+        results.append(result)
+        if not args.json:
+            status = "성공" if result["ok"] else f"실패: {result['message']}"
+            print(f"{name:14} {_fmt(result['mb_per_s'], '6.1f')} MB/s  {_fmt(result['segments_per_s'], '6.1f')} seg/s  "
+                  f"첫 바이트 {_fmt(result['time_to_first_byte_s'], '.2f')}초  프로브 {result['probe_requests']}회  "
+                  f"RSS {_fmt(result['peak_rss_mb'], '.0f')} MB  전체 {_fmt(result['total_s'], '.2f')}초  ({status})",
+                  flush=True)
+
+    failures = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            failures = compare(results, json.load(f)["results"], args.tolerance)
+    output = {"python": sys.version.split()[0], "repeat": args.repeat, "results": results}
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+    if args.json:
+        output["failures"] = failures
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+    for failure in failures:
+        if not args.json:
+            print(f"실패: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""TS→MP4 변환 벤치마크: 내장 변환기(tsmux) vs ffmpeg
+
+사용법:
+    python -m bench.remux input.ts [--repeat 3] [--json]
+
+- 내장: 변환 시간, 처리량, 파이썬 최대 메모리(tracemalloc, 별도 1회 실행)
+- ffmpeg: 변환 시간(프로세스 시작 포함), 프로세스 시작만 걸리는 시간, 최대 RSS
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from tsmux import remux_file
+
+try:
+    import resource  # Unix 전용 (자식 프로세스 최대 RSS)
+except ImportError:
+    resource = None
+
+
+def _best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def bench_builtin(src: str, dst: str, repeat: int) -> dict:
+    seconds = _best(lambda: remux_file(src, dst), repeat)
+    tracemalloc.start()
+    remuxer = remux_file(src, dst)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "seconds": seconds,
+        "mb_per_s": os.path.getsize(src) / seconds / 1e6,
+        "peak_python_mb": peak / 1e6,
+        "fragments": remuxer.fragments,
+        "samples": remuxer.sample_counts,
+        "output_bytes": os.path.getsize(dst),
+    }
+
+
+def bench_ffmpeg(src: str, dst: str, repeat: int) -> dict:
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return {"skipped": "ffmpeg 없음"}
+    cmd = [ffmpeg, "-y", "-loglevel", "error", "-i", src, "-c", "copy", dst]
+    try:
+        seconds = _best(lambda: subprocess.run(cmd, check=True), repeat)
+    except subprocess.CalledProcessError as e:
+        return {"skipped": f"ffmpeg 실패: {e}"}
+    startup = _best(lambda: subprocess.run([ffmpeg, "-version"], check=True, stdout=subprocess.DEVNULL), repeat)
+    result = {
+        "seconds": seconds,
+        "mb_per_s": os.path.getsize(src) / seconds / 1e6,
+        "process_startup_seconds": startup,
+        "output_bytes": os.path.getsize(dst),
+    }
+    if resource is not None:
+        # ru_maxrss: Linux 는 KB, macOS 는 바이트
+        rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        result["peak_rss_mb"] = rss / (1e6 if sys.platform == "darwin" else 1e3)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="H.264/AAC MPEG-TS 파일")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--json", action="store_true", help="JSON 으로 출력")
+    args = parser.parse_args(argv)
+
+    size_mb = os.path.getsize(args.input) / 1e6
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            "input_mb": size_mb,
+            "builtin": bench_builtin(args.input, os.path.join(tmp, "builtin.mp4"), args.repeat),
+            "ffmpeg": bench_ffmpeg(args.input, os.path.join(tmp, "ffmpeg.mp4"), args.repeat),
+        }
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    print(f"입력: {args.input} ({size_mb:.1f} MB)")
+    b = results["builtin"]
+    print(f"  내장   : {b['seconds']:.2f}초, {b['mb_per_s']:.0f} MB/s, 메모리 최대 {b['peak_python_mb']:.1f} MB, "
+          f"조각 {b['fragments']}개")
+    f = results["ffmpeg"]
+    if "skipped" in f:
+        print(f"  ffmpeg : 건너뜀 ({f['skipped']})")
+    else:
+        rss = f" , 최대 RSS {f['peak_rss_mb']:.1f} MB" if "peak_rss_mb" in f else ""
+        print(f"  ffmpeg : {f['seconds']:.2f}초, {f['mb_per_s']:.0f} MB/s (프로세스 시작 {f['process_startup_seconds']:.2f}초)"
+              f"{rss}")
+
+
+if __name__ == "__main__":
+    main()
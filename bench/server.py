@@ -0,0 +1,413 @@
+"""벤치마크용 로컬 세그먼트/HLS 서버
+
+실제 사이트 대신 합성 MPEG-TS(H.264 구조, 프레임 본문은 채움 값) 세그먼트를 segment_NNNN.jpg 이름으로 돌려준다.
+지연, 지터, 대역폭, 404 구간, 429/5xx 주입, 동시 요청 제한, 플레이스홀더 응답을 설정할 수 있다.
+
+경로 (폴더 이름은 아무거나, 모든 폴더가 같은 영상):
+    /<폴더>/segment_0001.jpg   세그먼트 (HEAD/GET)
+    /<폴더>/index.m3u8         HLS VOD 재생목록
+    /<폴더>/items1.shtml       같은 재생목록 (사이트의 목록 문서 이름)
+
+단독 실행:
+    python -m bench.server --segments 300 --latency 0.05 --port 8000
+"""
+import argparse
+import random
+import struct
+import threading
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+TS_PACKET_SIZE = 188
+VIDEO_PID = 0x100
+PMT_PID = 0x1000
+_FRAME_TICKS_BASE = 90000  # PTS 는 90kHz
+
+
+@dataclass
+class ServerConfig:
+    """서버 동작 설정 (시나리오마다 하나)"""
+    segments: int = 200                 # 세그먼트 수 (first ~ first+segments-1)
+    first: int = 1                      # 첫 번호
+    zero_pad: int = 4
+    segment_bytes: int = 512 * 1024     # 세그먼트당 영상 데이터 크기 (TS 패킷화 전, 대략값)
+    segment_seconds: float = 4.0        # 세그먼트 길이 (PTS 간격)
+    fps: int = 25
+    latency: float = 0.02               # 응답 전 대기 (첫 바이트까지 시간)
+    jitter: float = 0.0                 # 지연에 더하는 무작위 값의 최대 (초)
+    bandwidth: float = 0.0              # 응답 하나의 전송 속도 상한 (bytes/s, 0 = 무제한)
+    missing: List[Tuple[int, int]] = field(default_factory=list)  # 404 를 줄 번호 구간 [(시작, 끝)]
+    error_rate: float = 0.0             # 세그먼트 요청이 주입 오류를 받을 확률
+    error_codes: Tuple[int, ...] = (503,)  # 주입할 상태 코드 (429, 500, 503 ...)
+    retry_after: int = 1                # 429/503 에 붙일 Retry-After (초, 0 이면 생략)
+    max_concurrent: int = 0             # 동시 요청이 이보다 많으면 429 (0 = 제한 없음)
+    placeholder: Optional[str] = None   # 없는 번호에 200 으로 줄 대체 응답: None / "ts" / "html"
+    seed: int = 1                       # 지터/오류 주입 난수 (같은 값이면 같은 순서)
+
+
+# ---------- 합성 MPEG-TS ----------
+def _crc32_mpeg(data: bytes) -> int:
+    crc = 0xFFFFFFFF
+    for b in data:
+        crc ^= b << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+            crc &= 0xFFFFFFFF
+    return crc
+
+
+def _section_packet(pid: int, section: bytes, cc: int) -> bytes:
+    section += struct.pack(">I", _crc32_mpeg(section))
+    payload = b"\x00" + section  # pointer_field
+    header = bytes([0x47, 0x40 | (pid >> 8), pid & 0xFF, 0x10 | (cc & 0x0F)])
+    return header + payload + b"\xFF" * (TS_PACKET_SIZE - 4 - len(payload))
+
+
+def _pat(cc: int) -> bytes:
+    body = struct.pack(">HBBBHH", 1, 0xC1, 0, 0, 1, 0xE000 | PMT_PID)
+    return _section_packet(0, bytes([0x00, 0xB0, len(body) + 4]) + body, cc)
+
+
+def _pmt(cc: int) -> bytes:
+    body = struct.pack(">HBBBHH", 1, 0xC1, 0, 0, 0xE000 | VIDEO_PID, 0xF000)
+    body += struct.pack(">BHH", 0x1B, 0xE000 | VIDEO_PID, 0xF000)  # H.264
+    return _section_packet(PMT_PID, bytes([0x02, 0xB0, len(body) + 4]) + body, cc)
+
+
+def _ue(value: int) -> str:
+    bits = bin(value + 1)[2:]
+    return "0" * (len(bits) - 1) + bits
+
+
+def _emulation_prevent(rbsp: bytes) -> bytes:
+    out = bytearray()
+    zeros = 0
+    for b in rbsp:
+        if zeros >= 2 and b <= 3:
+            out.append(3)
+            zeros = 0
+        out.append(b)
+        zeros = zeros + 1 if b == 0 else 0
+    return bytes(out)
+
+
+def _sps(width: int = 320, height: int = 192) -> bytes:
+    """Baseline 프로파일 SPS (tsmux.parse_sps 와 ffmpeg 가 읽을 수 있는 최소 형태)"""
+    bits = (_ue(0) + _ue(0) + _ue(2) + _ue(1) + "0"
+            + _ue(width // 16 - 1) + _ue(height // 16 - 1) + "1" + "1" + "0" + "0" + "1")
+    bits += "0" * (-len(bits) % 8)
+    rbsp = bytes([66, 0xC0, 30]) + int(bits, 2).to_bytes(len(bits) // 8, "big")
+    return b"\x67" + _emulation_prevent(rbsp)
+
+
+_START = b"\x00\x00\x00\x01"
+_AUD = _START + b"\x09\xF0"
+_SPS_PPS = _START + _sps() + _START + b"\x68\xCE\x3C\x80"
+
+
+def _pts_bytes(pts: int) -> bytes:
+    return bytes([
+        0x21 | ((pts >> 29) & 0x0E), (pts >> 22) & 0xFF, ((pts >> 14) & 0xFE) | 1,
+        (pts >> 7) & 0xFF, ((pts << 1) & 0xFE) | 1,
+    ])
+
+
+def _pcr_bytes(base: int) -> bytes:
+    """PCR (base 33비트(90kHz) + 예약 6비트 + 확장 9비트, 확장은 0)"""
+    base &= (1 << 33) - 1
+    return struct.pack(">IH", base >> 1, ((base & 1) << 15) | 0x7E00)
+
+
+def _packetize(pes: bytes, with_pcr: bool) -> List[bytes]:
+    """PES 하나를 188바이트 영상 패킷들로 (마지막 패킷은 adaptation field 로 채움, CC 는 0)"""
+    packets = []
+    pos = 0
+    first = True
+    while pos < len(pes):
+        af_body = b""  # adaptation field 의 플래그 + 선택 필드 (길이 바이트 제외)
+        if first and with_pcr:
+            af_body = bytes([0x10]) + _pcr_bytes(0)
+        room = TS_PACKET_SIZE - 4 - (1 + len(af_body) if af_body else 0)
+        chunk = pes[pos:pos + room]
+        if len(chunk) < room:
+            # 남는 자리만큼 adaptation field 를 늘림 (0xFF 채움)
+            af_total = TS_PACKET_SIZE - 4 - len(chunk)
+            if af_total == 1:
+                af_field = b"\x00"
+            else:
+                af_body = af_body or b"\x00"
+                af_field = bytes([af_total - 1]) + af_body + b"\xFF" * (af_total - 1 - len(af_body))
+        else:
+            af_field = bytes([len(af_body)]) + af_body if af_body else b""
+        afc = 0x30 if af_field else 0x10
+        header = bytes([0x47, (0x40 if first else 0) | (VIDEO_PID >> 8), VIDEO_PID & 0xFF, afc])
+        packets.append(header + af_field + chunk)
+        pos += len(chunk)
+        first = False
+    return packets
+
+
+@lru_cache(maxsize=4)
+def _template(segment_bytes: int, segment_seconds: float, fps: int, seed: int):
+    """세그먼트 틀 - (바이트, 프레임별 (PTS 위치, PCR 위치 또는 None), 영상 패킷 수)
+
+    세그먼트마다 다른 것은 PTS/PCR 과 연속성 카운터뿐이라 틀을 복사해서 그 부분만 고친다.
+    프레임 본문은 채움 값이라 디코딩은 안 되지만 컨테이너 구조(PAT/PMT/PES/SPS)는 정상이다.
+    """
+    frames = max(1, round(segment_seconds * fps))
+    body = random.Random(seed).randbytes(max(16, segment_bytes // frames)).replace(b"\x00", b"\x01")
+    out = bytearray(_pat(0) + _pmt(0))
+    offsets = []
+    for k in range(frames):
+        # 첫 프레임은 SPS/PPS + IDR, 나머지는 non-IDR 슬라이스 (시작 코드 오인 없게 본문에 0 없음)
+        nal = (_AUD + _SPS_PPS + _START + b"\x65" if k == 0 else _AUD + _START + b"\x41") + body
+        pes = b"\x00\x00\x01\xE0\x00\x00\x80\x80\x05" + _pts_bytes(0) + nal
+        packets = _packetize(pes, with_pcr=k == 0)
+        start = len(out)
+        pcr_at = start + 6 if k == 0 else None
+        pts_at = start + (4 + 8 if k == 0 else 4) + 9
+        offsets.append((pts_at, pcr_at))
+        for packet in packets:
+            out += packet
+    return bytes(out), offsets, len(out) // TS_PACKET_SIZE - 2
+
+
+def synthetic_segment(order: int, cfg: ServerConfig) -> bytes:
+    """order 번째(0부터) 세그먼트 - 세그먼트끼리 PTS 와 연속성 카운터가 이어짐"""
+    template, offsets, video_packets = _template(cfg.segment_bytes, cfg.segment_seconds, cfg.fps, cfg.seed)
+    data = bytearray(template)
+    data[3] = 0x10 | (order & 0x0F)                    # PAT
+    data[TS_PACKET_SIZE + 3] = 0x10 | (order & 0x0F)   # PMT
+    base_cc = order * video_packets
+    for n, pos in enumerate(range(2 * TS_PACKET_SIZE, len(data), TS_PACKET_SIZE)):
+        data[pos + 3] = (data[pos + 3] & 0xF0) | ((base_cc + n) & 0x0F)
+    ticks = _FRAME_TICKS_BASE // cfg.fps
+    for k, (pts_at, pcr_at) in enumerate(offsets):
+        pts = _FRAME_TICKS_BASE + (order * len(offsets) + k) * ticks
+        data[pts_at:pts_at + 5] = _pts_bytes(pts)
+        if pcr_at is not None:
+            data[pcr_at:pcr_at + 6] = _pcr_bytes(pts)
+    return bytes(data)
+
+
+# ---------- HTTP ----------
+class SegmentServer(ThreadingHTTPServer):
+    """설정대로 동작하는 세그먼트 서버 (start() 로 백그라운드 실행)"""
+
+    daemon_threads = True
+
+    def __init__(self, cfg: ServerConfig, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.cfg = cfg
+        self._lock = threading.Lock()
+        self._rng = random.Random(cfg.seed)
+        self._in_flight = 0
+        self._cache: Dict[int, bytes] = {}
+        self._segment_length = len(synthetic_segment(0, cfg))
+        self._placeholder_body = (
+            synthetic_segment(0, ServerConfig(segment_bytes=4096, segment_seconds=0.04, seed=cfg.seed))
+            if cfg.placeholder == "ts" else b"<html><body>video not found</body></html>"
+        )
+        self.stats: Dict[str, int] = {}
+        self.reset_stats()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "SegmentServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        """클라이언트가 받다가 끊는 건 정상 (중단, yt-dlp 청크 요청) - 그 외 오류만 출력"""
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {
+                "requests": 0, "head": 0, "get": 0, "not_found": 0, "placeholder": 0,
+                "injected_errors": 0, "throttled_429": 0, "bytes_sent": 0, "max_in_flight": 0,
+            }
+
+    def count(self, key: str, n: int = 1):
+        with self._lock:
+            self.stats[key] += n
+
+    def enter(self) -> int:
+        with self._lock:
+            self._in_flight += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self._in_flight)
+            return self._in_flight
+
+    def leave(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def delay(self) -> float:
+        with self._lock:
+            return self.cfg.latency + (self._rng.uniform(0, self.cfg.jitter) if self.cfg.jitter else 0.0)
+
+    def inject_error(self) -> Optional[int]:
+        with self._lock:
+            if self.cfg.error_rate and self._rng.random() < self.cfg.error_rate:
+                return self._rng.choice(self.cfg.error_codes)
+        return None
+
+    def exists(self, num: int) -> bool:
+        cfg = self.cfg
+        if not cfg.first <= num < cfg.first + cfg.segments:
+            return False
+        return not any(a <= num <= b for a, b in cfg.missing)
+
+    def segment(self, num: int) -> bytes:
+        with self._lock:
+            data = self._cache.get(num)
+        if data is None:
+            data = synthetic_segment(num - self.cfg.first, self.cfg)
+            with self._lock:
+                if len(self._cache) > 64:
+                    self._cache.pop(next(iter(self._cache)))
+                self._cache[num] = data
+        return data
+
+    def playlist(self) -> bytes:
+        cfg = self.cfg
+        lines = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{int(cfg.segment_seconds + 0.999)}",
+                 f"#EXT-X-MEDIA-SEQUENCE:{cfg.first}", "#EXT-X-PLAYLIST-TYPE:VOD"]
+        for num in range(cfg.first, cfg.first + cfg.segments):
+            if not self.exists(num):
+                continue  # 404 구간은 목록에도 없음 (실제 사이트 목록처럼)
+            lines.append(f"#EXTINF:{cfg.segment_seconds:.3f},")
+            lines.append(f"segment_{str(num).zfill(cfg.zero_pad)}.jpg")
+        lines.append("#EXT-X-ENDLIST")
+        return ("\n".join(lines) + "\n").encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (실제 CDN 처럼 연결 재사용)
+    server: SegmentServer
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._serve(body=False)
+
+    def do_GET(self):
+        self._serve(body=True)
+
+    def _reply(self, code: int, data: bytes = b"", body: bool = True, content_type: str = "video/mp2t",
+               extra: Optional[Dict[str, str]] = None, length: Optional[int] = None):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data) if length is None else length))
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body and data:
+            self._send(data)
+
+    def _send(self, data: bytes):
+        """대역폭 제한이 있으면 조금씩 나눠 보냄"""
+        rate = self.server.cfg.bandwidth
+        if not rate:
+            self.wfile.write(data)
+            self.server.count("bytes_sent", len(data))
+            return
+        chunk = max(4096, int(rate / 50))  # 20ms 단위
+        t0 = time.monotonic()
+        for pos in range(0, len(data), chunk):
+            self.wfile.write(data[pos:pos + chunk])
+            sent = pos + len(data[pos:pos + chunk])
+            self.server.count("bytes_sent", len(data[pos:pos + chunk]))
+            ahead = sent / rate - (time.monotonic() - t0)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def _serve(self, body: bool):
+        srv = self.server
+        srv.count("requests")
+        srv.count("get" if body else "head")
+        path = self.path.split("?", 1)[0]
+        name = path.rsplit("/", 1)[-1]
+        if name in ("index.m3u8", "items1.shtml"):
+            self._reply(200, srv.playlist(), body, content_type="application/vnd.apple.mpegurl")
+            return
+        if not (name.startswith("segment_") and name.endswith(".jpg") and name[8:-4].isdigit()):
+            srv.count("not_found")
+            self._reply(404, body=body)
+            return
+        num = int(name[8:-4])
+        in_flight = srv.enter()
+        try:
+            time.sleep(srv.delay())
+            cfg = srv.cfg
+            if cfg.max_concurrent and in_flight > cfg.max_concurrent:
+                srv.count("throttled_429")
+                self._reply(429, body=body, extra={"Retry-After": str(cfg.retry_after)} if cfg.retry_after else None)
+                return
+            if not srv.exists(num):
+                outside = not cfg.first <= num < cfg.first + cfg.segments
+                if cfg.placeholder and outside:
+                    srv.count("placeholder")
+                    kind = "video/mp2t" if cfg.placeholder == "ts" else "text/html"
+                    self._reply(200, srv._placeholder_body, body, content_type=kind)
+                    return
+                srv.count("not_found")
+                self._reply(404, body=body)
+                return
+            code = srv.inject_error()
+            if code is not None:
+                srv.count("injected_errors")
+                extra = {"Retry-After": str(cfg.retry_after)} if cfg.retry_after and code in (429, 503) else None
+                self._reply(code, body=body, extra=extra)
+                return
+            if body:
+                self._reply(200, srv.segment(num), body)
+            else:
+                self._reply(200, body=False, length=srv._segment_length)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 중단
+        finally:
+            srv.leave()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--segment-kb", type=int, default=512)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="응답당 bytes/s (0 = 무제한)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrent", type=int, default=0)
+    parser.add_argument("--placeholder", choices=["ts", "html"])
+    args = parser.parse_args(argv)
+    cfg = ServerConfig(segments=args.segments, segment_bytes=args.segment_kb * 1024, latency=args.latency,
+                       jitter=args.jitter, bandwidth=args.bandwidth, error_rate=args.error_rate,
+                       max_concurrent=args.max_concurrent, placeholder=args.placeholder)
+    server = SegmentServer(cfg, port=args.port)
+    print(f"{server.url}/video/  ({cfg.segments}개, 재생목록 {server.url}/video/index.m3u8)")
+    print(asdict(cfg))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""시작 시간 벤치마크: 모듈 import 시간, 첫 창이 뜰 때까지 걸리는 시간
+
+사용법:
+    python -m bench.startup [--repeat 5] [--json] [--check]
+    python -m bench.startup --save baseline.json      # 기준값 저장
+    python -m bench.startup --compare baseline.json   # 기준값보다 tolerance 배 이상 느리면 실패
+
+- 매번 새 파이썬 프로세스에서 측정 (import 캐시 영향 없음), 중앙값/최솟값 보고
+- import: python -X importtime 으로 ui / cli 를 import 한 누적 시간과 무거운 모듈 순위
+- 첫 창: 프로세스 시작 ~ App 창을 띄운 뒤 첫 이벤트 루프 (QT_QPA_PLATFORM=offscreen)
+- --check: 시작할 때 불러오면 안 되는 모듈(yt-dlp, selenium 등)이 로드되면 종료 코드 1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 시작할 때 불러오면 안 되는 모듈 (작업이 필요로 할 때만 로드)
+FORBIDDEN = {
+    "ui": ["yt_dlp", "selenium", "undetected_chromedriver", "numpy", "engine", "requests"],
+    "cli": ["PyQt6", "yt_dlp", "selenium", "undetected_chromedriver", "numpy"],
+}
+
+_WINDOW_SCRIPT = """
+import json, os, sys, time
+t0 = time.perf_counter()
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+t_app = time.perf_counter()
+import ui
+t_import = time.perf_counter()
+w = ui.App()
+w.show()
+t_show = time.perf_counter()
+def first_turn():
+    print(json.dumps({"wall": time.time(), "qt_app": t_app - t0, "import_ui": t_import - t_app,
+                      "construct_show": t_show - t_import, "first_event": time.perf_counter() - t_show}))
+    app.quit()
+QTimer.singleShot(0, first_turn)
+app.exec()
+"""
+
+_MODULES_SCRIPT = "import json, sys; import {module}; print(json.dumps(sorted(sys.modules)))"
+
+
+def _run(args, env=None) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable] + args, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+def _parse_importtime(stderr: str, module: str):
+    """-X importtime 출력 → (module 누적 µs, module 이 불러온 하위 모듈 [(누적 µs, 이름)] 무거운 순)
+
+    출력은 하위 모듈이 먼저 나오는 후위 순서라, module 줄 바로 앞의 최상위 줄 다음부터가
+    module 의 하위 트리다 (그 앞은 site 등 인터프리터 시작 때 불러온 것).
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            rows.append((int(cumulative), name.rstrip()[1:]))  # 앞 공백 하나는 구분자
+        except ValueError:
+            continue  # 헤더 줄
+    target = next((i for i, (_, name) in enumerate(rows) if name == module), None)
+    if target is None:
+        return 0, []
+    first = target
+    while first > 0 and rows[first - 1][1].startswith(" "):
+        first -= 1
+    subtree = sorted(((us, name.strip()) for us, name in rows[first:target]), reverse=True)
+    return rows[target][0], subtree
+
+
+def measure_import(module: str, repeat: int) -> dict:
+    totals = []
+    heaviest = []
+    for _ in range(repeat):
+        proc = _run(["-X", "importtime", "-c", f"import {module}"])
+        # 인터프리터 시작(site 등)은 빼고 대상 모듈 누적 시간만
+        total_us, heaviest = _parse_importtime(proc.stderr, module)
+        totals.append(total_us / 1e6)
+    loaded = json.loads(_run(["-c", _MODULES_SCRIPT.format(module=module)]).stdout)
+    return {
+        "median_s": statistics.median(totals),
+        "min_s": min(totals),
+        "modules_loaded": len(loaded),
+        "forbidden_loaded": [m for m in FORBIDDEN.get(module, []) if m in loaded],
+        "heaviest": [{"module": name, "cumulative_s": us / 1e6} for us, name in heaviest[:10]],
+    }
+
+
+def measure_window(repeat: int) -> dict:
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    runs = []
+    for _ in range(repeat):
+        spawned = time.time()
+        try:
+            proc = _run(["-c", _WINDOW_SCRIPT], env=env)
+        except subprocess.CalledProcessError as e:
+            return {"skipped": f"창 생성 실패: {e.stderr.strip().splitlines()[-1:] or e}"}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result["first_window"] = result.pop("wall") - spawned
+        runs.append(result)
+    keys = ["first_window", "qt_app", "import_ui", "construct_show", "first_event"]
+    summary = {f"{k}_median_s": statistics.median(r[k] for r in runs) for k in keys}
+    summary["first_window_min_s"] = min(r["first_window"] for r in runs)
+    return summary
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """기준값보다 tolerance 배 넘게 느려진 항목"""
+    regressions = []
+    for section in ("import_ui", "import_cli", "window"):
+        for key, value in results.get(section, {}).items():
+            base = baseline.get(section, {}).get(key)
+            if not key.endswith("median_s") or not isinstance(base, (int, float)) or base <= 0:
+                continue
+            if value > base * tolerance:
+                regressions.append(f"{section}.{key}: {value * 1000:.0f} ms (기준 {base * 1000:.0f} ms)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="반복 횟수 (중앙값 사용)")
+    parser.add_argument("--no-window", action="store_true", help="창 띄우기 측정 생략 (PyQt6 없는 서버)")
+    parser.add_argument("--json", action="store_true", help="JSON 으로 출력")
+    parser.add_argument("--check", action="store_true", help="시작 때 금지 모듈이 로드되면 실패")
+    parser.add_argument("--save", metavar="PATH", help="결과를 기준값으로 저장")
+    parser.add_argument("--compare", metavar="PATH", help="저장한 기준값과 비교 (느려지면 실패)")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="--compare 허용 배수 (기본 1.5)")
+    args = parser.parse_args(argv)
+
+    results = {"python": sys.version.split()[0], "repeat": args.repeat}
+    results["import_cli"] = measure_import("cli", args.repeat)
+    if not args.no_window:
+        results["import_ui"] = measure_import("ui", args.repeat)
+        results["window"] = measure_window(args.repeat)
+
+    failures = []
+    if args.check:
+        for section in ("import_ui", "import_cli"):
+            for name in results.get(section, {}).get("forbidden_loaded", []):
+                failures.append(f"{section}: 시작 때 {name} 로드됨")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            failures += compare(results, json.load(f), args.tolerance)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.json:
+        results["failures"] = failures
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for section in ("import_cli", "import_ui"):
+            r = results.get(section)
+            if r is None:
+                continue
+            heavy = ", ".join(f"{h['module']} {h['cumulative_s'] * 1000:.0f}ms" for h in r["heaviest"][:3])
+            print(f"{section:10}: 중앙값 {r['median_s'] * 1000:.0f} ms (최소 {r['min_s'] * 1000:.0f} ms), "
+                  f"모듈 {r['modules_loaded']}개 - {heavy}")
+        w = results.get("window")
+        if w is not None and "skipped" in w:
+            print(f"첫 창      : 건너뜀 ({w['skipped']})")
+        elif w is not None:
+            print(f"첫 창      : 중앙값 {w['first_window_median_s'] * 1000:.0f} ms "
+                  f"(QApplication {w['qt_app_median_s'] * 1000:.0f}, import ui {w['import_ui_median_s'] * 1000:.0f}, "
+                  f"창 생성 {w['construct_show_median_s'] * 1000:.0f}, 첫 이벤트 {w['first_event_median_s'] * 1000:.0f})")
+        for failure in failures:
+            print(f"실패: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""작업 표 벤치마크: 행 추가/진행 갱신/삭제와 대기열 순번 갱신 시간 (기본 1만 행)
+
+사용법:
+    python -m bench.table [--rows 10000] [--ticks 20] [--per-tick 200] [--json]
+    python -m bench.table --legacy                    # 이전 방식(QTableWidget + 셀 위젯)도 같이 측정
+    python -m bench.table --save table.json / --compare table.json [--tolerance 1.5]
+
+- 창(QTableView + delegate)을 띄운 채 측정하고, 단계마다 이벤트 루프를 돌려 다시 그리는 시간까지 포함
+  (QT_QPA_PLATFORM 이 없으면 offscreen)
+- insert: 행을 하나씩 추가 (UI 의 '추가' 버튼과 같은 경로), update_all: 모든 행 진행 갱신 후 flush,
+  tick: 진행 버스 한 번에 해당하는 무작위 per-tick 행 갱신 (중앙값), remove: 10 행마다 하나 삭제,
+  queue: 워커 rows 개를 대기열에 넣고 순번 표시를 한 번 갱신
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+# progress.format_progress 와 같은 모양의 진행 문구
+_TEXT = "{pct}% ({done}/200) · 12.3 MB/s · 남은 0:42"
+
+
+def _pump(app):
+    """대기 중인 다시 그리기까지 처리"""
+    app.processEvents()
+    app.processEvents()
+
+
+def _timed(app, fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    _pump(app)
+    return time.perf_counter() - t0
+
+
+def _make_view(model):
+    from PyQt6.QtWidgets import QTableView
+
+    from jobtable import COL_CHECK, COL_PROGRESS, CheckBoxDelegate, ProgressDelegate
+
+    view = QTableView()
+    view.setModel(model)
+    view.setItemDelegateForColumn(COL_CHECK, CheckBoxDelegate(view))
+    view.setItemDelegateForColumn(COL_PROGRESS, ProgressDelegate(view))
+    view.resize(980, 400)
+    view.show()
+    return view
+
+
+def measure_model(app, rows: int, ticks: int, per_tick: int) -> dict:
+    from jobtable import JobTableModel
+
+    model = JobTableModel()
+    view = _make_view(model)
+    _pump(app)
+    rng = random.Random(0)
+    result = {}
+
+    def insert():
+        for i in range(rows):
+            model.add_job(f"https://cdn{i % 7}.example.com/video{i}/", "save", f"output{i:05d}.mp4")
+
+    result["insert_s"] = _timed(app, insert)
+
+    def update_all():
+        for job in model.jobs():
+            model.set_progress(job.job_id, _TEXT.format(pct=10, done=20), 0.1)
+        model.flush()
+
+    result["update_all_s"] = _timed(app, update_all)
+
+    ids = [job.job_id for job in model.jobs()]
+    tick_times = []
+    for tick in range(ticks):
+        def update_some():
+            for job_id in rng.sample(ids, min(per_tick, len(ids))):
+                done = rng.randrange(200)
+                model.set_progress(job_id, _TEXT.format(pct=done // 2, done=done), done / 200)
+            model.flush()
+
+        tick_times.append(_timed(app, update_some))
+    result["tick_median_s"] = statistics.median(tick_times)
+    result["tick_max_s"] = max(tick_times)
+
+    result["remove_s"] = _timed(app, lambda: model.remove_jobs(ids[::10]))
+    result["rows_left"] = model.rowCount()
+    view.close()
+    return result
+
+
+def measure_queue(app, rows: int) -> dict:
+    """대기열에 rows 개 - 등록(submit) 시간과 순번 전체 갱신 시간 (워커는 시작하지 않음)"""
+    from PyQt6.QtCore import QThread, pyqtSignal
+
+    from scheduler import DownloadScheduler
+
+    class _IdleWorker(QThread):
+        done = pyqtSignal(bool, str)
+
+        def start(self, *_args):
+            pass  # 실행 자리만 차지
+
+    scheduler = DownloadScheduler(max_running=3, per_host=2)
+    workers = [_IdleWorker() for _ in range(rows)]
+    t0 = time.perf_counter()
+    for i, worker in enumerate(workers):
+        scheduler.submit(worker, f"cdn{i % 3}.example.com")
+    submit_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    positions = scheduler.queue_positions()
+    positions_s = time.perf_counter() - t0
+    _pump(app)
+    return {"submit_s": submit_s, "positions_s": positions_s, "queued": len(positions)}
+
+
+def measure_legacy(app, rows: int) -> dict:
+    """이전 방식 - 행마다 QCheckBox/QLabel 위젯을 둔 QTableWidget (비교용)"""
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QCheckBox, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QWidget
+
+    table = QTableWidget(0, 5)
+    table.resize(980, 400)
+    table.show()
+    _pump(app)
+    labels = []
+
+    def insert():
+        for i in range(rows):
+            row = table.rowCount()
+            table.insertRow(row)
+            chk_widget = QWidget()
+            chk_layout = QHBoxLayout(chk_widget)
+            chk_layout.addWidget(QCheckBox())
+            chk_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            chk_layout.setContentsMargins(0, 0, 0, 0)
+            table.setCellWidget(row, 0, chk_widget)
+            table.setItem(row, 1, QTableWidgetItem(f"https://cdn{i % 7}.example.com/video{i}/"))
+            table.setItem(row, 2, QTableWidgetItem("save"))
+            table.setItem(row, 3, QTableWidgetItem(f"output{i:05d}.mp4"))
+            label = QLabel("대기 중")
+            table.setCellWidget(row, 4, label)
+            labels.append(label)
+
+    result = {"insert_s": _timed(app, insert)}
+    result["update_all_s"] = _timed(app, lambda: [label.setText(_TEXT.format(pct=10, done=20)) for label in labels])
+    table.close()
+    table.deleteLater()
+    _pump(app)
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """기준값보다 tolerance 배 넘게 느려진 항목 (10ms 미만은 잡음이라 제외)"""
+    regressions = []
+    for section in ("model", "queue"):
+        for key, value in results.get(section, {}).items():
+            base = baseline.get(section, {}).get(key)
+            if not key.endswith("_s") or not isinstance(base, (int, float)) or max(base, value) < 0.01:
+                continue
+            if value > base * tolerance:
+                regressions.append(f"{section}.{key}: {value * 1000:.0f} ms (기준 {base * 1000:.0f} ms)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="행 수 (기본 10000)")
+    parser.add_argument("--ticks", type=int, default=20, help="진행 갱신 tick 수")
+    parser.add_argument("--per-tick", type=int, default=200, help="tick 마다 갱신할 행 수 (동시에 받는 작업 수)")
+    parser.add_argument("--legacy", action="store_true", help="이전 방식(QTableWidget + 셀 위젯)도 측정")
+    parser.add_argument("--json", action="store_true", help="JSON 으로 출력")
+    parser.add_argument("--save", metavar="PATH", help="결과를 기준값으로 저장")
+    parser.add_argument("--compare", metavar="PATH", help="저장한 기준값과 비교 (느려지면 실패)")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="--compare 허용 배수 (기본 1.5)")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    results = {"python": sys.version.split()[0], "rows": args.rows, "per_tick": args.per_tick}
+    results["model"] = measure_model(app, args.rows, args.ticks, args.per_tick)
+    results["queue"] = measure_queue(app, args.rows)
+    if args.legacy:
+        results["legacy"] = measure_legacy(app, args.rows)
+
+    failures = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            failures = compare(results, json.load(f), args.tolerance)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.json:
+        results["failures"] = failures
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        m, q = results["model"], results["queue"]
+        print(f"모델 ({args.rows}행): 추가 {m['insert_s'] * 1000:.0f} ms, 전체 갱신 {m['update_all_s'] * 1000:.0f} ms, "
+              f"tick({args.per_tick}행) 중앙값 {m['tick_median_s'] * 1000:.1f} ms (최대 {m['tick_max_s'] * 1000:.1f}), "
+              f"삭제 {m['remove_s'] * 1000:.0f} ms")
+        print(f"대기열: 등록 {q['submit_s'] * 1000:.0f} ms, 순번 갱신 {q['positions_s'] * 1000:.1f} ms ({q['queued']}개)")
+        legacy = results.get("legacy")
+        if legacy:
+            print(f"이전 방식: 추가 {legacy['insert_s'] * 1000:.0f} ms, 전체 갱신 {legacy['update_all_s'] * 1000:.0f} ms")
+        for failure in failures:
+            print(f"실패: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import threading
+import zlib
+from typing import Callable, List, Optional
+
+# TS 패킷 동기 바이트 - 모든 세그먼트는 이 값으로 시작해야 함
+TS_SYNC_BYTE = 0x47
+# Content-Length 만 보고 미리 잡는 용량의 상한 (넘는 세그먼트는 받으면서 늘림)
+MAX_RESERVE_BYTES = 64 * 1024 * 1024
+
+
+class SegmentBuffer:
+    """세그먼트 하나를 받는 재사용 버퍼 (bytearray + 유효 길이)
+
+    한 번 늘어난 용량은 줄이지 않으므로 비슷한 크기의 세그먼트를 반복해서 받으면
+    더 이상 메모리 할당이 일어나지 않는다.
+    """
+
+    def __init__(self, pool: "SegmentBufferPool", size: int):
+        self._pool = pool
+        self.data = bytearray(size)
+        self.length = 0
+        self.crc = 0  # 받은 내용의 crc32 (청크마다 누적 - 중복/플레이스홀더 판별용)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.data)
+
+    def reset(self):
+        """재시도 전에 내용을 비움 (용량은 유지)"""
+        self.length = 0
+        self.crc = 0
+
+    def reserve(self, size: int):
+        """Content-Length 를 알면 미리 용량 확보 (서버가 말한 크기를 믿는 것은 MAX_RESERVE_BYTES 까지)"""
+        size = min(size, MAX_RESERVE_BYTES)
+        if size > len(self.data):
+            self._pool._grow(self, size)
+
+    def append(self, chunk):
+        """수신한 청크를 버퍼 뒤에 복사"""
+        n = len(chunk)
+        end = self.length + n
+        if end > len(self.data):
+            self._pool._grow(self, max(end, len(self.data) * 2))
+        self.data[self.length:end] = chunk
+        self.length = end
+        self.crc = zlib.crc32(chunk, self.crc)
+
+    def view(self) -> memoryview:
+        """유효 데이터 부분의 memoryview (복사 없음)"""
+        return memoryview(self.data)[:self.length]
+
+
+class SegmentBufferPool:
+    """미리 할당한 세그먼트 버퍼 풀
+
+    - 동시에 받는 세그먼트 수만큼 버퍼를 만들어 두고 돌려 쓴다
+    - 잡 하나가 쓰는 메모리 = 버퍼 수 × 가장 큰 세그먼트 크기 로 제한됨
+    - preallocate 개만 미리 만들고 나머지는 필요할 때 count 까지 만든다
+    - capacity_bytes / peak_bytes 로 사용량 보고
+    """
+
+    def __init__(self, count: int, initial_size: int = 1024 * 1024, chunk_size: int = 64 * 1024,
+                 preallocate: Optional[int] = None):
+        self.chunk_size = chunk_size
+        self._cond = threading.Condition()
+        self._capacity = 0
+        self._in_use = 0
+        self.peak_bytes = 0  # 동시에 잡고 있던 버퍼 용량의 최댓값
+        self._initial_size = initial_size
+        self._count = max(1, count)
+        self._created = 0
+        self._free: List[SegmentBuffer] = []
+        for _ in range(self._count if preallocate is None else min(max(1, preallocate), self._count)):
+            self._free.append(self._new_buffer())
+
+    def _new_buffer(self) -> SegmentBuffer:
+        self._created += 1
+        self._capacity += self._initial_size
+        return SegmentBuffer(self, self._initial_size)
+
+    @property
+    def capacity_bytes(self) -> int:
+        """풀 전체가 들고 있는 메모리 (바이트)"""
+        return self._capacity
+
+    def acquire(self, timeout: Optional[float] = None) -> SegmentBuffer:
+        """빈 버퍼를 꺼냄 - 없으면 반납될 때까지 대기"""
+        with self._cond:
+            if not self._free and self._created < self._count:
+                self._free.append(self._new_buffer())
+            if not self._cond.wait_for(lambda: self._free, timeout=timeout):
+                raise TimeoutError("사용 가능한 세그먼트 버퍼가 없습니다")
+            buf = self._free.pop()
+            buf.reset()
+            self._in_use += buf.capacity
+            self.peak_bytes = max(self.peak_bytes, self._in_use)
+            return buf
+
+    def release(self, buf: SegmentBuffer):
+        """버퍼 반납"""
+        with self._cond:
+            self._in_use -= buf.capacity
+            self._free.append(buf)
+            self._cond.notify()
+
+    def _grow(self, buf: SegmentBuffer, size: int):
+        """버퍼 용량 확장 (기존 내용 유지)"""
+        extra = size - len(buf.data)
+        buf.data.extend(bytes(extra))
+        with self._cond:
+            self._capacity += extra
+            self._in_use += extra
+            self.peak_bytes = max(self.peak_bytes, self._in_use)
+
+
+def read_segment_into(r, buf: SegmentBuffer, chunk_size: int,
+                      on_chunk: Optional[Callable[[int], None]] = None) -> int:
+    """스트리밍 응답 본문을 청크 단위로 버퍼에 받음
+
+    첫 청크에서 TS 동기 바이트(0x47)를 확인해 HTML 오류 페이지 등은 본문을 끝까지
+    받지 않고 바로 실패 처리한다. on_chunk 는 청크마다 받은 바이트 수로 호출된다
+    (대역폭 제한 등). 반환: 받은 바이트 수
+
+    본문은 압축을 푼 내용으로 받으므로, Content-Encoding 이 있으면 Content-Length
+    (압축된 크기)는 용량 예약과 잘림 검사에 쓰지 않는다.
+    """
+    buf.reset()
+    length = r.headers.get("Content-Length")
+    encoding = (r.headers.get("Content-Encoding") or "identity").strip().lower()
+    expected = int(length) if length and length.isdigit() and encoding == "identity" else None
+    if expected:
+        buf.reserve(expected)
+
+    for chunk in r.iter_content(chunk_size=chunk_size):
+        if not chunk:
+            continue
+        if buf.length == 0 and chunk[0] != TS_SYNC_BYTE:
+            raise RuntimeError("Bad segment (not TS header 0x47)")
+        buf.append(chunk)
+        if on_chunk is not None:
+            on_chunk(len(chunk))
+
+    if buf.length == 0:
+        raise RuntimeError("Bad segment (empty body)")
+    if expected is not None and buf.length != expected:
+        raise RuntimeError(f"Bad segment (truncated: {buf.length}/{expected} bytes)")
+    return buf.length
@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from models import ResolvedSource
+
+# 기본 캐시 위치 (SEGMENTGRABBER_CACHE 환경변수로 변경 가능)
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".segmentgrabber", "cache.sqlite3")
+
+DEFAULT_TTL = 7 * 24 * 3600   # 항목 유효 기간 (초)
+DEFAULT_MAX_ENTRIES = 2000    # 테이블별 최대 항목 수 (초과 시 오래 안 쓴 것부터 삭제)
+
+
+@dataclass
+class CachedRange:
+    """베이스 URL 별로 탐지해 둔 세그먼트 범위"""
+    start: int
+    end: int
+    zero_pad: int
+    total_bytes: Optional[int] = None
+
+
+class ProbeCache:
+    """페이지 URL → 세그먼트 위치, 베이스 URL → 세그먼트 범위 디스크 캐시 (SQLite)
+
+    - TTL 이 지난 항목은 조회 시 무시/삭제
+    - 항목 수가 max_entries 를 넘으면 last_used 가 오래된 것부터 삭제 (LRU)
+    - 여러 워커 스레드에서 동시에 써도 되도록 연결 하나를 잠금으로 보호
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS resolved (
+                page_url    TEXT PRIMARY KEY,
+                base_url    TEXT NOT NULL,
+                listing_url TEXT,
+                created     REAL NOT NULL,
+                last_used   REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS ranges (
+                base_url    TEXT PRIMARY KEY,
+                start       INTEGER NOT NULL,
+                end         INTEGER NOT NULL,
+                zero_pad    INTEGER NOT NULL,
+                total_bytes INTEGER,
+                created     REAL NOT NULL,
+                last_used   REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS resolved_lru ON resolved(last_used);
+            CREATE INDEX IF NOT EXISTS ranges_lru ON ranges(last_used);
+        """)
+        # listing_url 컬럼이 없던 이전 버전 캐시 파일 갱신
+        cols = {row[1] for row in self._db.execute("PRAGMA table_info(resolved)")}
+        if "listing_url" not in cols:
+            self._db.execute("ALTER TABLE resolved ADD COLUMN listing_url TEXT")
+
+    # ---------- 내부 ----------
+    def _lookup(self, table: str, key_col: str, key: str, cols: str):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {cols}, created FROM {table} WHERE {key_col} = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[-1] > self.ttl:
+                # 만료된 항목 삭제
+                self._db.execute(f"DELETE FROM {table} WHERE {key_col} = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute(f"UPDATE {table} SET last_used = ? WHERE {key_col} = ?", (now, key))
+            self.hits += 1
+            return row[:-1]
+
+    def _evict(self, table: str):
+        """max_entries 를 넘는 만큼 오래 안 쓴 항목 삭제 (잠금 안에서 호출)"""
+        count = self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute(
+                f"DELETE FROM {table} WHERE rowid IN "
+                f"(SELECT rowid FROM {table} ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    # ---------- 페이지 URL → 베이스 URL ----------
+    def get_resolved(self, page_url: str) -> Optional[ResolvedSource]:
+        row = self._lookup("resolved", "page_url", page_url, "base_url, listing_url")
+        return ResolvedSource(*row) if row else None
+
+    def put_resolved(self, page_url: str, source: ResolvedSource):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO resolved (page_url, base_url, listing_url, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (page_url, source.base_url, source.listing_url, now, now),
+            )
+            self._evict("resolved")
+
+    # ---------- 베이스 URL → 세그먼트 범위 ----------
+    def get_range(self, base_url: str) -> Optional[CachedRange]:
+        row = self._lookup("ranges", "base_url", base_url, "start, end, zero_pad, total_bytes")
+        return CachedRange(*row) if row else None
+
+    def put_range(self, base_url: str, start: int, end: int, zero_pad: int, total_bytes: Optional[int] = None):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO ranges "
+                "(base_url, start, end, zero_pad, total_bytes, created, last_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (base_url, start, end, zero_pad, total_bytes, now, now),
+            )
+            self._evict("ranges")
+
+    def invalidate(self, base_url: str):
+        """범위가 틀린 것으로 확인되면 삭제"""
+        with self._lock:
+            self._db.execute("DELETE FROM ranges WHERE base_url = ?", (base_url,))
+
+
+_cache: Optional[ProbeCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ProbeCache:
+    """프로세스 전역 캐시 (처음 호출 시 생성)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ProbeCache(os.environ.get("SEGMENTGRABBER_CACHE", DEFAULT_CACHE_PATH))
+        return _cache
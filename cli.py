@@ -0,0 +1,248 @@
+"""헤드리스 일괄 다운로드 (Qt 없이 실행)
+
+사용법:
+    python cli.py batch.txt [-o 저장폴더] [-j 동시 작업 수] [--stream] ...
+
+batch.txt 는 한 줄에 'URL [저장이름]' (# 으로 시작하면 주석, '-' 면 표준 입력).
+진행 상황은 표준 출력에 한 줄에 JSON 하나(NDJSON)로 쓴다:
+    {"t": 1.23, "event": "status", "job": 1, "message": "..."}
+event: queued / started / status / progress / post_step / done / summary
+progress 는 작업당 0.25초에 한 번 이하 (phase, bytes, total_bytes, segments_done, segments_total, range, speed, eta ...)
+종료 코드: 모두 성공 0, 실패가 있으면 1, Ctrl+C 로 중단하면 130
+--metrics 파일을 주면 작업이 끝날 때마다 호스트별 요청 시간을 Prometheus 텍스트 형식으로 다시 쓴다.
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from engine import DownloadJob, SegmentDownloadJob, create_job
+from journal import find_journal
+from metrics import get_metrics
+from models import JobConfig, VideoType
+from postprocess import PostProcessQueue
+from remux import REMUXER_AUTO, REMUXER_BUILTIN, REMUXER_FFMPEG
+from transport import DEFAULT_POOL_MAXSIZE, get_transport
+from utils import parse_headers_text, sanitize_filename
+
+
+def read_batch(path: str) -> List[Tuple[str, Optional[str]]]:
+    """배치 파일 → [(URL, 저장이름 또는 None)]"""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        entries = []
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split(None, 1)
+            entries.append((parts[0], parts[1].strip() if len(parts) > 1 else None))
+        return entries
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def video_type_of(url: str) -> VideoType:
+    """URL 로 작업 종류 판단 (UI 에서는 라디오 버튼으로 고름)"""
+    return VideoType.PORNHUB if "pornhub.com" in url.lower() else VideoType.YASYA
+
+
+class EventWriter:
+    """NDJSON 이벤트 출력 - 여러 작업 스레드에서 동시에 불려도 줄이 섞이지 않음"""
+
+    def __init__(self, stream=None):
+        self._stream = stream or sys.stdout
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic()
+
+    def write(self, event: str, **fields):
+        record = {"t": round(time.monotonic() - self._t0, 3), "event": event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+
+class BatchRunner:
+    """작업들을 jobs 개씩 동시에 실행하고 모든 결과(후처리 포함)가 나올 때까지 대기"""
+
+    def __init__(self, configs: List[JobConfig], events: EventWriter, jobs: int = 2, post_workers: int = 2,
+                 metrics_path: Optional[str] = None):
+        self.events = events
+        self.metrics_path = metrics_path  # 호스트별 요청 시간 (Prometheus 텍스트, 작업이 끝날 때마다 갱신)
+        self.post_queue = PostProcessQueue(max_workers=post_workers, max_pending=max(1, jobs) * 2)
+        self.post_queue.step_started.connect(lambda job, name: self._emit(job, "post_step", step=name))
+        self.post_queue.job_finished.connect(self._on_post_finished)
+        self.jobs: List[DownloadJob] = [create_job(cfg) for cfg in configs]
+        self._ids: Dict[DownloadJob, int] = {job: n for n, job in enumerate(self.jobs, 1)}
+        self._finished: Dict[DownloadJob, threading.Event] = {job: threading.Event() for job in self.jobs}
+        self.results: Dict[DownloadJob, Tuple[bool, str]] = {}
+        self._results_lock = threading.Lock()  # _finish 는 작업 스레드와 후처리 스레드에서 불림
+        self._executor = ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="job")
+        self.interrupted = False
+
+    def _emit(self, job: DownloadJob, event: str, **fields):
+        self.events.write(event, job=self._ids[job], **fields)
+
+    def _finish(self, job: DownloadJob, ok: bool, message: str, **fields):
+        with self._results_lock:
+            # 확인과 기록을 한 번에 - 결과는 작업마다 처음 것 하나만
+            if job in self.results:
+                return
+            self.results[job] = (ok, message)
+            self._write_metrics()  # 파일 쓰기도 한 번에 하나씩
+        self._emit(job, "done", ok=ok, message=message, **fields)
+        self._finished[job].set()
+
+    def _write_metrics(self):
+        if not self.metrics_path:
+            return
+        try:
+            get_metrics().write_prometheus(self.metrics_path)
+        except OSError as e:
+            self.events.write("status", message=f"요청 시간 파일 저장 실패: {e}")
+
+    def _on_post_finished(self, job: DownloadJob, ok: bool, message: str, durations: list):
+        self._finish(job, ok, message, post_seconds={name: round(sec, 3) for name, sec in durations})
+
+    def _run_one(self, job: DownloadJob):
+        if self.interrupted:
+            self._finish(job, False, "사용자에 의해 중단됨")
+            return
+        self._emit(job, "started")
+        try:
+            job.run()
+        except Exception as e:
+            self._finish(job, False, f"오류: {e}")
+        if not self._finished[job].is_set() and not self.post_queue.is_pending(job):
+            # 시그널 없이 끝난 경우 (있어서는 안 되지만 대기가 끝나지 않도록)
+            self._finish(job, False, "결과 없이 종료됨")
+
+    def run(self) -> int:
+        for job in self.jobs:
+            job.status.connect(lambda msg, j=job: self._emit(j, "status", message=msg))
+            job.progress.connect(lambda event, j=job: self._emit(j, "progress", **event.to_dict()))
+            job.done.connect(lambda ok, msg, j=job: self._finish(j, ok, msg))
+            if isinstance(job, SegmentDownloadJob):
+                job.post_queue = self.post_queue
+            self._emit(job, "queued", url=job.cfg.base_folder_url, out_name=job.cfg.out_name)
+            self._executor.submit(self._run_one, job)
+
+        t0 = time.monotonic()
+        for job in self.jobs:
+            # 짧게 나눠 기다려야 메인 스레드가 Ctrl+C 를 받을 수 있음
+            while not self._finished[job].wait(0.2):
+                pass
+        self._executor.shutdown(wait=True)
+        self.post_queue.shutdown(wait=True)
+
+        failed = sum(1 for ok, _ in self.results.values() if not ok)
+        self.events.write("summary", jobs=len(self.jobs), ok=len(self.jobs) - failed, failed=failed,
+                          seconds=round(time.monotonic() - t0, 3), interrupted=self.interrupted)
+        if self.interrupted:
+            return 130
+        return 1 if failed else 0
+
+    def stop(self):
+        """Ctrl+C - 실행 중인 작업은 멈추고 (저널이 남아 --resume 으로 이어받음) 아직 시작 안 한 작업은 건너뜀"""
+        self.interrupted = True
+        for job in self.jobs:
+            job.stop()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="세그먼트 일괄 다운로드 (NDJSON 진행 출력)")
+    p.add_argument("batch", help="URL 목록 파일 ('URL [저장이름]' 한 줄에 하나, '-' 면 표준 입력)")
+    p.add_argument("-o", "--out-dir", default=os.getcwd(), help="저장 폴더 (기본: 현재 폴더)")
+    p.add_argument("-j", "--jobs", type=int, default=2, help="동시에 실행할 작업 수 (기본 2)")
+    p.add_argument("--post-workers", type=int, default=2, help="동시에 실행할 변환 수 (기본 2)")
+    p.add_argument("-c", "--concurrency", type=int, default=4, help="작업당 동시 세그먼트 요청 수 (자동 조절 시 시작값)")
+    p.add_argument("--max-concurrency", type=int, default=16, help="자동 조절 시 상한")
+    p.add_argument("--no-adaptive", action="store_true", help="동시 요청 수 자동 조절 끄기")
+    p.add_argument("--pool-size", type=int, default=DEFAULT_POOL_MAXSIZE,
+                   help=f"호스트당 유지할 keep-alive 연결 수 (기본 {DEFAULT_POOL_MAXSIZE})")
+    p.add_argument("--headers-file", help="요청 헤더 파일 ('키: 값' 한 줄에 하나, 없으면 기본 헤더)")
+    p.add_argument("--resume", action="store_true",
+                   help="저장 폴더에 같은 URL·저장이름의 중단된 저널이 있으면 이어받기 (없으면 처음부터)")
+    p.add_argument("--stream", action="store_true", help=".ts 없이 받는 대로 MP4 로 변환 (이어받기 불가)")
+    p.add_argument("--remuxer", choices=[REMUXER_AUTO, REMUXER_FFMPEG, REMUXER_BUILTIN], default=REMUXER_AUTO)
+    p.add_argument("--no-cache", action="store_true", help="탐지 결과 디스크 캐시 사용 안 함")
+    p.add_argument("--no-validate", action="store_true", help="세그먼트 TS 패킷 검증 끄기")
+    p.add_argument("--metrics", metavar="PATH", help="호스트별 요청 시간을 Prometheus 텍스트 파일로 (작업마다 갱신)")
+    p.add_argument("--profile", nargs="?", const="", metavar="DIR",
+                   help="작업마다 CPU(cProfile)·메모리(tracemalloc) 프로파일 기록 (기본 폴더 ~/.segmentgrabber/profiles)")
+    p.add_argument("--no-metrics-report", action="store_true", help="출력 옆 요청 시간 보고서(.metrics.json, .prom) 안 씀")
+    p.add_argument("--retry", type=int, default=5)
+    p.add_argument("--timeout", type=int, default=30)
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    headers_text = ""
+    if args.headers_file:
+        with open(args.headers_file, encoding="utf-8") as f:
+            headers_text = f.read()
+    headers = parse_headers_text(headers_text)
+    os.makedirs(args.out_dir, exist_ok=True)
+    get_transport().configure(pool_maxsize=args.pool_size)
+
+    configs = []
+    for n, (url, name) in enumerate(read_batch(args.batch), 1):
+        out_name = sanitize_filename(name or f"output{n:04d}.mp4")
+        # 이어받기는 요청했을 때만 (기본은 항상 새 파일로 처음부터)
+        resume_journal = find_journal(args.out_dir, url, out_name) if args.resume and not args.stream else None
+        configs.append(JobConfig(
+            base_folder_url=url,
+            save_dir=args.out_dir,
+            out_name=out_name,
+            video_type=video_type_of(url),
+            retry=args.retry,
+            timeout=args.timeout,
+            headers=dict(headers),
+            concurrency=args.concurrency,
+            adaptive_concurrency=not args.no_adaptive,
+            max_concurrency=args.max_concurrency,
+            use_cache=not args.no_cache,
+            stream_remux=args.stream,
+            remuxer=args.remuxer,
+            validate_segments=not args.no_validate,
+            metrics_report=not args.no_metrics_report,
+            profile=args.profile is not None,
+            profile_dir=args.profile or None,
+            resume_journal=resume_journal,
+        ))
+
+    events = EventWriter()
+    if not configs:
+        events.write("summary", jobs=0, ok=0, failed=0, seconds=0.0, interrupted=False)
+        return 0
+    runner = BatchRunner(configs, events, jobs=args.jobs, post_workers=args.post_workers,
+                         metrics_path=args.metrics)
+
+    def on_interrupt(signum, frame):
+        if runner.interrupted:
+            sys.exit(130)  # 두 번째 Ctrl+C → 기다리지 않고 종료
+        runner.stop()
+
+    signal.signal(signal.SIGINT, on_interrupt)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, on_interrupt)
+    try:
+        return runner.run()
+    finally:
+        # Chrome 풀을 썼다면 정리 (resolver 는 selenium 을 필요할 때만 로드)
+        resolver = sys.modules.get("resolver")
+        if resolver is not None:
+            resolver.shutdown_resolver_service()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
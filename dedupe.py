@@ -0,0 +1,77 @@
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# 세그먼트 내용 키: (crc32, 길이) - 암호학적 해시는 필요 없고 빠른 것이 중요
+ContentKey = Tuple[int, int]
+
+
+@dataclass
+class PlaceholderSignature:
+    """없는 번호에도 200 으로 돌려주는 대체 응답의 특징 (카나리 요청으로 확인)"""
+    crc: int
+    length: int
+
+    @property
+    def key(self) -> ContentKey:
+        return self.crc, self.length
+
+
+def body_signature(r, chunk_size: int = 64 * 1024, limit: int = 32 * 1024 * 1024) -> Optional[PlaceholderSignature]:
+    """스트리밍 응답 본문의 crc32/길이 (limit 보다 크면 None - 대체 응답으로 보기엔 너무 큼)"""
+    crc = 0
+    length = 0
+    for chunk in r.iter_content(chunk_size=chunk_size):
+        crc = zlib.crc32(chunk, crc)
+        length += len(chunk)
+        if length > limit:
+            return None
+    return PlaceholderSignature(crc, length)
+
+
+class SegmentHashTable:
+    """잡 하나에서 받은 세그먼트 내용 표
+
+    TS 세그먼트는 타임스탬프/연속성 카운터가 들어 있어 정상이라면 서로 같을 수 없다.
+    앞에서 받은 것과 내용이 같거나 플레이스홀더와 같으면 '없는 세그먼트'로 본다.
+    같은 내용이 run_limit 개 연속되면 end_of_stream (끝번호를 모를 때 스트림 끝으로 판단)
+    """
+
+    def __init__(self, run_limit: int = 3, placeholder: Optional[PlaceholderSignature] = None):
+        self.run_limit = max(1, run_limit)
+        self.placeholder = placeholder
+        self._first_seen: Dict[ContentKey, int] = {}  # 내용 → 처음 받은 세그먼트 번호
+        self.run_key: Optional[ContentKey] = None  # 지금 이어지고 있는 중복 내용
+        self.run_length = 0
+        self.run_origin = -1  # 연속 중복 내용을 처음 받은 번호 (플레이스홀더면 -1)
+        self.duplicates: List[Tuple[int, int]] = []   # (세그먼트 번호, 같은 내용의 첫 번호, -1=플레이스홀더)
+
+    def check(self, seg: int, key: ContentKey) -> Optional[str]:
+        """새 내용이면 None, 중복이면 이유 문자열"""
+        if self.placeholder is not None and key == self.placeholder.key:
+            reason, first = "플레이스홀더 응답", -1
+        else:
+            first = self._first_seen.setdefault(key, seg)
+            if first == seg:
+                self.run_key = None
+                self.run_length = 0
+                return None
+            reason = f"{first}번과 내용이 같음"
+        self.duplicates.append((seg, first))
+        if key == self.run_key:
+            self.run_length += 1
+        else:
+            self.run_key = key
+            self.run_length = 1
+            self.run_origin = first
+        return reason
+
+    @property
+    def end_of_stream(self) -> bool:
+        """같은 내용이 run_limit 개 연속 → 이후는 모두 대체 응답일 가능성이 큼"""
+        return self.run_length >= self.run_limit
+
+    def summary(self, limit: int = 10) -> str:
+        nums = ", ".join(str(seg) for seg, _ in self.duplicates[:limit])
+        more = f" 외 {len(self.duplicates) - limit}개" if len(self.duplicates) > limit else ""
+        return f"중복/플레이스홀더 세그먼트 {len(self.duplicates)}개 ({nums}{more})"
@@ -0,0 +1,1019 @@
+import os
+import time
+import uuid
+import requests
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import urlparse
+from events import Signal
+from models import JobConfig, VideoType
+from buffers import SegmentBuffer, SegmentBufferPool, read_segment_into
+from cache import get_cache
+from listing import SegmentListing, fetch_segment_listing
+from journal import JOURNAL_SUFFIX, SegmentJournal, find_journal
+from resolver import get_resolver_service, is_yasya_page_url
+from transport import get_transport
+from ratelimit import get_limiter
+from adaptive import AimdController, get_controller
+from remux import REMUXER_BUILTIN, REMUXER_FFMPEG, BuiltinMp4Sink, FfmpegPipeSink, TsFileSink, choose_remuxer, ffmpeg_available
+from tsmux import TsMuxError, remux_file
+from tsvalidate import validate_ts
+from dedupe import PlaceholderSignature, SegmentHashTable, body_signature
+from metrics import JobMetrics
+from profiling import JobProfiler, start_job_profiler
+from progress import Phase, ProgressTracker
+from postprocess import PostJob, PostProcessQueue, PostStep, format_durations, run_post_job
+
+
+class InvalidSegmentError(RuntimeError):
+    """받은 세그먼트의 TS 패킷 검증 실패 (재시도 대상)"""
+    error_class = "invalid_segment"  # 요청 시간 집계의 오류 종류
+
+
+def _retry_after(value: Optional[str], default: float) -> float:
+    """Retry-After 헤더(초 단위)를 대기 시간으로 (없거나 날짜 형식이면 기본값, 최대 30초)"""
+    if value and value.strip().isdigit():
+        return min(float(value.strip()), 30.0)
+    return default
+
+
+class DownloadJob:
+    """Qt 없는 다운로드 작업 - run() 을 부른 스레드에서 끝까지 실행
+
+    진행 상황은 시그널(events.Signal)로 알리고, 다른 스레드에서 stop() 하면 멈춘다.
+    UI 는 workers.py 의 QThread 로 감싸서 쓰고, CLI(cli.py)는 그대로 스레드에서 돌린다.
+    """
+
+    def __init__(self, cfg: JobConfig, key=None):
+        self.cfg = cfg
+        self.key = self if key is None else key  # 후처리 대기열 등에서 이 작업을 가리키는 키
+        self._stop = False
+        # 진행 상황, 상태 메시지, 완료 신호
+        self.progress = Signal()  # progress.ProgressEvent (단계, 범위, 바이트, EWMA 속도, 남은 시간) - 간격마다 한 번 이하
+        self.status = Signal()    # 상태 메시지
+        self.done = Signal()      # 완료 여부, 메시지
+        self._tracker = ProgressTracker(self.progress.emit)  # 갱신은 자주, 내보내기는 일정 간격으로
+        self._profiler: Optional[JobProfiler] = None  # 프로파일링을 켰을 때만 (cfg.profile 또는 전체 설정)
+
+    def stop(self):
+        """다른 스레드(UI, 시그널 핸들러)에서 호출하면 루프가 멈춤"""
+        self._stop = True
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop
+
+    def run(self):
+        """작업 실행 - 프로파일링을 켰으면 이 스레드와 작업이 만든 요청 스레드를 측정하고 요약을 상태로 알림"""
+        self._profiler = start_job_profiler(self.cfg.out_name, self.cfg.profile, self.cfg.profile_dir)
+        try:
+            self._run()
+        finally:
+            self._stop_profiler()  # 완료 신호 없이 끝난 경우 (보통은 _emit_done 에서 이미 끝남)
+
+    def _stop_profiler(self):
+        """프로파일링 종료 후 요약을 상태로 알림 (켜지 않았거나 이미 끝났으면 아무것도 안 함)"""
+        profiler, self._profiler = self._profiler, None
+        if profiler is not None:
+            try:
+                for line in profiler.stop():
+                    self.status.emit(line)
+            except Exception as e:
+                self.status.emit(f"프로파일 저장 실패: {e}")
+
+    def _emit_done(self, ok: bool, message: str):
+        """완료 신호 - 프로파일 요약을 먼저 보내서 완료/실패 메시지가 마지막 상태로 남게 함"""
+        self._stop_profiler()
+        self.done.emit(ok, message)
+
+    def _thread_initializer(self):
+        """작업이 만드는 스레드 풀의 initializer (프로파일링 중이면 풀 스레드도 측정)"""
+        return self._profiler.thread_started if self._profiler is not None else None
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class SegmentDownloadJob(DownloadJob):
+    """세그먼트(segment_0001.jpg ...) 다운로드 → 병합 → MP4"""
+
+    def __init__(self, cfg: JobConfig, key=None):
+        super().__init__(cfg, key)
+        self.downloaded = Signal()  # 받기는 끝나고 후처리 대기열에 넘김 (병합 TS 경로) - 이후 결과는 대기열이 알림
+        self.post_queue: Optional[PostProcessQueue] = None  # 있으면 변환을 여기에 넘김 (없으면 직접 실행)
+        self._out_ts = None  # 임시 파일 경로 추적용
+        self._buffers: Optional[SegmentBufferPool] = None  # 세그먼트 수신 버퍼 풀
+        self._journal: Optional[SegmentJournal] = None     # 세그먼트 저널 (이어받기용)
+        self.journal_path: Optional[str] = None            # UI에서 재개할 때 사용
+        self._probe_count = 0                # 존재 확인 요청 횟수 (병렬 프로브에서도 집계)
+        self._probe_lock = threading.Lock()
+        self._cache_hits = 0                 # 탐지 캐시 적중/미스 (잡 단위)
+        self._cache_misses = 0
+        self._range_invalidated = False      # 캐시 범위가 틀려 지웠는지 (다시 기록하지 않음)
+        self._limiter = get_limiter()        # 모든 워커가 공유하는 대역폭 제한기
+        self._host = ""                      # 세그먼트 호스트 (호스트별 제한용)
+        self._controller: Optional[AimdController] = None  # 호스트별 동시 요청 수 조절기
+        self._invalid_segments = 0           # 검증 실패로 다시 받은 횟수
+        self._cc_accepted = 0                # 연속성 카운터 오류만 있어 다시 받지 않고 쓴 세그먼트 수
+        self._stats_lock = threading.Lock()
+        self.request_metrics = JobMetrics()  # 요청별 단계 시간/재시도/오류 (잡·호스트별 히스토그램)
+        self._placeholder: Optional[PlaceholderSignature] = None  # 없는 번호에 돌아오는 200 응답
+        self._sink = None                    # 세그먼트 출력 (TsFileSink / FfmpegPipeSink / BuiltinMp4Sink)
+
+    def _normalize_url(self, u: str) -> str:
+        """URL 끝에 '/'가 없으면 붙여줌"""
+        return u if u.endswith('/') else u + '/'
+
+    def _cleanup_temp_file(self):
+        """임시 TS 파일 삭제"""
+        if self._out_ts and os.path.exists(self._out_ts):
+            try:
+                os.remove(self._out_ts)
+            except OSError:
+                pass  # 삭제 실패해도 무시
+
+    def _probe_segment(self, session: requests.Session, base: str, num: int, headers: dict) -> bool:
+        """세그먼트가 존재하는지 HEAD 요청으로 확인 (빠른 탐지)"""
+        url = f"{base}{str(num).zfill(self.cfg.zero_pad)}.jpg"
+        with self._probe_lock:
+            self._probe_count += 1
+        try:
+            # HEAD 요청으로 빠르게 확인 (본문 다운로드 안함)
+            with self.request_metrics.request("probe", url) as timing:
+                r = session.head(url, headers=headers, timeout=10, allow_redirects=True)
+                timing.response(r.status_code)
+            if r.status_code == 200:
+                # 압축 전송이면 Content-Length 는 압축된 크기라 플레이스홀더 길이와 비교할 수 없음
+                encoded = (r.headers.get("Content-Encoding") or "identity").strip().lower() != "identity"
+                length = None if encoded else r.headers.get("Content-Length")
+                return not self._looks_like_placeholder(session, url, headers, length)
+            # HEAD가 지원 안되면 GET으로 재시도
+            if r.status_code == 405:
+                with self.request_metrics.request("probe", url) as timing, \
+                        session.get(url, headers=headers, timeout=10, stream=True) as r:
+                    timing.response(r.status_code)
+                    if r.status_code != 200:
+                        return False  # 본문은 안 읽고 닫아서 연결을 공유 풀에 돌려줌
+                    if self._placeholder is None:
+                        return True
+                    signature = body_signature(r)
+                    return signature is None or signature.key != self._placeholder.key
+            return False
+        except:
+            return False
+
+    def _looks_like_placeholder(self, session: requests.Session, url: str, headers: dict,
+                                content_length: Optional[str]) -> bool:
+        """200 응답이 플레이스홀더와 같은지 - 길이가 다르면 바로 아님, 같으면 본문 해시 비교"""
+        placeholder = self._placeholder
+        if placeholder is None:
+            return False
+        if content_length and content_length.isdigit() and int(content_length) != placeholder.length:
+            return False
+        with self.request_metrics.request("probe", url) as timing, \
+                session.get(url, headers=headers, timeout=10, stream=True) as r:
+            timing.response(r.status_code)
+            if r.status_code != 200:
+                return True
+            signature = body_signature(r)
+        return signature is not None and signature.key == placeholder.key
+
+    def _detect_placeholder(self, session: requests.Session, base: str, headers: dict):
+        """있을 수 없는 번호(카나리)를 요청해 200 대체 응답을 주는 호스트인지 확인"""
+        url = f"{base}{str(10 ** (self.cfg.zero_pad + 2) - 1).zfill(self.cfg.zero_pad)}.jpg"
+        try:
+            with self.request_metrics.request("probe", url) as timing, \
+                    session.get(url, headers=headers, timeout=10, stream=True) as r:
+                timing.response(r.status_code)
+                if r.status_code != 200:
+                    return
+                self._placeholder = body_signature(r)
+        except requests.RequestException:
+            return
+        if self._placeholder is not None:
+            self.status.emit(
+                f"없는 번호에도 200 응답 (플레이스홀더 {self._placeholder.length} bytes) → 내용 비교로 탐지"
+            )
+
+    def _find_start(self, session: requests.Session, base: str, headers: dict) -> int:
+        """시작 번호 자동 탐지 (0부터 순차 탐색)"""
+        self.status.emit("시작 번호 탐지 중...")
+
+        # 일반적인 시작 번호들 우선 확인 (0, 1)
+        for start_candidate in [0, 1]:
+            if self._stop:
+                return 1
+            if self._probe_segment(session, base, start_candidate, headers):
+                self.status.emit(f"시작 번호 발견: {start_candidate}")
+                return start_candidate
+
+        # 못 찾으면 기본값 1 반환
+        return 1
+
+    def _find_end(self, session: requests.Session, base: str, headers: dict, start: int) -> int:
+        """끝 번호 자동 탐지 (이진 탐색, probe_parallelism > 1 이면 병렬 k분 탐색)"""
+        self.status.emit("끝 번호 탐지 중...")
+        probes_before = self._probe_count
+        t0 = time.monotonic()
+
+        k = max(1, self.cfg.probe_parallelism)
+        if k > 1:
+            with ThreadPoolExecutor(max_workers=k, initializer=self._thread_initializer()) as probe_pool:
+                low = self._find_end_parallel(probe_pool, session, base, headers, start, k)
+        else:
+            low = self._find_end_sequential(session, base, headers, start)
+        if low is None:
+            return None
+
+        self.status.emit(
+            f"끝 번호 발견: {low} "
+            f"(프로브 {self._probe_count - probes_before}회, {time.monotonic() - t0:.2f}초)"
+        )
+        return low
+
+    def _find_end_sequential(self, session: requests.Session, base: str, headers: dict, start: int) -> int:
+        """끝 번호 순차 탐지 (지수적 증가 → 이진 탐색)"""
+        # 1단계: 상한선 찾기 (지수적 증가)
+        probe = start
+        step = 100
+        max_probe = 100000  # 최대 탐색 범위
+
+        while probe < max_probe:
+            if self._stop:
+                return None
+            if not self._probe_segment(session, base, probe, headers):
+                break
+            probe += step
+            step = min(step * 2, 1000)  # 점점 큰 스텝으로
+
+        # 2단계: 이진 탐색으로 정확한 끝 찾기
+        low = start
+        high = min(probe, max_probe)
+
+        while low < high:
+            if self._stop:
+                return None
+            mid = (low + high + 1) // 2
+            if self._probe_segment(session, base, mid, headers):
+                low = mid
+            else:
+                high = mid - 1
+
+        return low
+
+    def _probe_batch(self, probe_pool: ThreadPoolExecutor, session: requests.Session, base: str,
+                     headers: dict, points: list):
+        """여러 번호를 동시에 확인해서 (마지막으로 존재한 번호, 처음으로 없는 번호) 반환
+
+        세그먼트는 앞에서부터 연속으로 존재하므로 처음 실패한 지점 뒤의 결과는 무시한다.
+        """
+        results = list(probe_pool.map(lambda n: self._probe_segment(session, base, n, headers), points))
+        last_ok = None
+        for n, ok in zip(points, results):
+            if not ok:
+                return last_ok, n
+            last_ok = n
+        return last_ok, None
+
+    def _find_end_parallel(self, probe_pool: ThreadPoolExecutor, session: requests.Session, base: str,
+                           headers: dict, start: int, k: int) -> int:
+        """끝 번호 병렬 탐지
+
+        1단계: 지수적 증가 지점을 k개씩 묶어 동시에 확인
+        2단계: 구간 안의 균등한 k개 지점을 동시에 확인 → 한 라운드에 구간이 1/(k+1) 로 줄어듦
+        """
+        max_probe = 100000  # 최대 탐색 범위
+
+        # 1단계: 상한선 찾기 (순차 탐색과 같은 지점들을 k개씩 동시에)
+        low = start
+        high = max_probe
+        probe = start
+        step = 100
+        while probe < max_probe:
+            if self._stop:
+                return None
+            points = []
+            while len(points) < k and probe < max_probe:
+                points.append(probe)
+                probe += step
+                step = min(step * 2, 1000)
+            last_ok, first_missing = self._probe_batch(probe_pool, session, base, headers, points)
+            if last_ok is not None:
+                low = last_ok
+            if first_missing is not None:
+                high = first_missing - 1 if last_ok is not None else first_missing
+                break
+
+        # 2단계: k분 탐색으로 정확한 끝 찾기 (low 는 존재, 끝은 [low, high] 안에 있음)
+        while low < high:
+            if self._stop:
+                return None
+            span = high - low
+            if span <= k:
+                points = list(range(low + 1, high + 1))
+            else:
+                points = sorted({low + (span * j + k) // (k + 1) for j in range(1, k + 1)})
+            last_ok, first_missing = self._probe_batch(probe_pool, session, base, headers, points)
+            if last_ok is not None:
+                low = last_ok
+            if first_missing is not None:
+                high = first_missing - 1
+            else:
+                # 모든 지점이 존재 → 마지막 지점 이후만 남음
+                low = points[-1]
+
+        return low
+
+    def _fetch_segment(self, session: requests.Session, base: str, num: int, headers: dict,
+                       buf: SegmentBuffer) -> bool:
+        """세그먼트 하나를 재시도 포함해서 buf 에 받음 (풀 스레드에서 실행됨)
+        반환: 성공 여부 (404거나 끝내 실패하면 False)
+        """
+        num_str = str(num).zfill(self.cfg.zero_pad)
+        url = f"{base}{num_str}.jpg"
+
+        # 재시도 루프
+        for attempt in range(1, self.cfg.retry + 1):
+            if self._stop:
+                return False
+            delay = 1.0 * attempt
+            try:
+                t0 = time.monotonic()
+                # 시도마다 단계별 시간 기록 (검증 실패도 이 시도의 오류로 집계)
+                with self.request_metrics.request("segment", url, attempt) as timing:
+                    with session.get(url, headers=headers, timeout=self.cfg.timeout, stream=True) as r:
+                        timing.response(r.status_code)
+                        if r.status_code == 404:
+                            return False
+                        if r.status_code == 429 or r.status_code >= 500:
+                            # 서버 과부하 신호 → 호스트 동시 요청 수를 줄이고 Retry-After 만큼 쉼
+                            self._congestion()
+                            delay = _retry_after(r.headers.get("Retry-After"), delay)
+                        r.raise_for_status()
+                        # 본문을 통째로 bytes 로 만들지 않고 청크 단위로 버퍼에 받음 (청크마다 대역폭 제한)
+                        nbytes = read_segment_into(r, buf, self._buffers.chunk_size, on_chunk=self._throttle)
+                        timing.body_done(nbytes)
+                    if self.cfg.validate_segments:
+                        self._check_segment(buf)
+                if self._controller is not None:
+                    self._controller.on_success(time.monotonic() - t0, nbytes)
+                return True
+            except (requests.Timeout, requests.ConnectionError) as e:
+                self._congestion()
+                err = e
+            except Exception as e:
+                err = e
+            if attempt == self.cfg.retry:
+                self.status.emit(f"{num_str} 다운로드 실패: {err}")
+            else:
+                time.sleep(delay)
+        return False
+
+    def _check_segment(self, buf: SegmentBuffer):
+        """받은 세그먼트 전체 패킷 검증 - 동기 바이트/길이 오류면 예외로 재시도 경로에 태움
+
+        연속성 카운터 오류는 세그먼트 경계 등 원본 자체에 흔하고 다시 받아도 같으므로
+        바로 받아들이고 개수만 센다 (연속성 검사는 동기 바이트/길이가 정상일 때만 함).
+        """
+        check = validate_ts(buf.view())
+        if check.ok:
+            return
+        with self._stats_lock:
+            if check.cc_errors:
+                self._cc_accepted += 1
+                return
+            self._invalid_segments += 1
+        raise InvalidSegmentError(f"Bad segment ({check.reason})")
+
+    def _congestion(self):
+        """타임아웃/429/5xx 를 호스트 조절기에 알림"""
+        if self._controller is not None:
+            self._controller.on_congestion()
+
+    def _throttle(self, nbytes: int):
+        """받은 바이트를 전역 대역폭 제한기에 알리고 필요하면 대기"""
+        self._limiter.consume(self._host, nbytes, should_stop=lambda: self._stop)
+
+    def _read_listing(self, session: requests.Session, listing_url: str, headers: dict) -> Optional[SegmentListing]:
+        """items*.shtml 목록을 읽어 세그먼트 범위 확인 (실패하면 None → 프로브로 탐지)"""
+        self.status.emit("세그먼트 목록 읽는 중...")
+        try:
+            listing = fetch_segment_listing(session, listing_url, headers, timeout=self.cfg.timeout)
+        except requests.RequestException as e:
+            self.status.emit(f"목록을 읽지 못해 자동 탐지로 전환: {e}")
+            return None
+        if listing is None:
+            self.status.emit("목록에 세그먼트가 없어 자동 탐지로 전환")
+        return listing
+
+    def _write_metrics_reports(self, out_mp4: str):
+        """출력 파일 옆에 요청 시간 보고서 (.metrics.json + Prometheus 텍스트 .prom)"""
+        try:
+            json_path, _ = self.request_metrics.write_reports(out_mp4, os.path.basename(out_mp4))
+        except OSError as e:
+            self.status.emit(f"요청 시간 보고서 저장 실패: {e}")
+            return
+        self.status.emit(f"요청 시간 보고서: {json_path}")
+
+    def _cache_lookup(self, getter, key):
+        """캐시 조회 + 잡별 적중/미스 집계"""
+        value = getter(key)
+        if value is None:
+            self._cache_misses += 1
+        else:
+            self._cache_hits += 1
+        return value
+
+    def _invalidate_cached_range(self, base: str, reason: str):
+        """캐시한 세그먼트 범위가 실제와 다름 → 삭제 (다음 작업은 프로브/목록으로 다시 탐지)"""
+        get_cache().invalidate(base)
+        self._range_invalidated = True
+        self.status.emit(f"캐시한 세그먼트 범위가 맞지 않아 삭제 ({reason})")
+
+    def _load_resume_journal(self) -> Optional[SegmentJournal]:
+        """cfg.resume_journal (UI '이어받기', CLI --resume) 이 있을 때만 그 저널을 엶 - 없으면 처음부터"""
+        path = self.cfg.resume_journal
+        if not path:
+            return None
+        if not os.path.exists(path):
+            self.status.emit(f"이어받을 저널이 없어 처음부터 받습니다: {path}")
+            return None
+        try:
+            journal = SegmentJournal.load(path)
+        except Exception as e:
+            self.status.emit(f"저널을 읽지 못해 처음부터 받습니다: {e}")
+            return None
+        if not os.path.exists(journal.header.get("out_ts", "")):
+            journal.remove()
+            return None
+        return journal
+
+    def _finish_stopped(self, message: str):
+        """중단/실패 처리 - 커밋된 세그먼트가 있으면 TS와 저널을 남겨 이어받기 가능하게 함"""
+        if self._sink is not None and self._sink.streaming:
+            # 스트리밍 변환 중이던 MP4 는 완성될 수 없으므로 삭제
+            self._sink.abort()
+        journal = self._journal
+        if journal is not None and journal.has_commits:
+            journal.close()
+            self._emit_done(False, f"{message} (이어받기 가능)")
+            return
+        if journal is not None:
+            journal.remove()
+            self.journal_path = None
+        self._cleanup_temp_file()
+        self._emit_done(False, message)
+
+    def _remux_post_job(self, out_ts: str, out_mp4: str, journal: SegmentJournal) -> PostJob:
+        """병합 TS 를 MP4 로 바꾸는 후처리 작업 (저널은 결과가 나올 때까지 열어 둠)"""
+        use_ffmpeg = choose_remuxer(self.cfg.remuxer) == REMUXER_FFMPEG
+
+        def remux():
+            if use_ffmpeg:
+                subprocess.run(
+                    ["ffmpeg", "-y", "-i", out_ts, "-c", "copy", out_mp4],
+                    check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+            else:
+                # ffmpeg 가 없으면 내장 변환기로 (파일을 청크 단위로 읽어 메모리 일정)
+                remux_file(out_ts, out_mp4)
+
+        def finish(error: Optional[BaseException]):
+            if error is None:
+                # 성공 시 임시 파일과 저널 삭제
+                journal.remove()
+                try:
+                    os.remove(out_ts)
+                except OSError:
+                    pass
+                return True, out_mp4
+            if isinstance(error, FileNotFoundError):
+                # ffmpeg 없는 경우 - TS 파일 유지 (다운로드 자체는 끝났으므로 저널은 삭제)
+                journal.remove()
+                return False, f"ffmpeg가 없어 merged.ts만 생성했습니다: {out_ts}"
+            if isinstance(error, (TsMuxError, IndexError, ValueError)):
+                # 내장 변환기가 처리 못 하는 스트림 - TS 파일 유지
+                journal.remove()
+                if os.path.exists(out_mp4):
+                    os.remove(out_mp4)
+                return False, f"내장 변환 실패({error}), merged.ts만 생성했습니다: {out_ts}"
+            # 변환만 다시 하면 되도록 저널 유지
+            journal.close()
+            if isinstance(error, subprocess.CalledProcessError):
+                return False, f"ffmpeg 오류: {error} (이어받기 가능)"
+            return False, f"후처리 오류: {error} (이어받기 가능)"
+
+        step = "ffmpeg 컨테이너 변환" if use_ffmpeg else "내장 MP4 변환"
+        return PostJob(key=self.key, steps=[PostStep(step, remux)], finish=finish)
+
+    def _run(self):
+        """다운로드 실행 (끝나면 done 시그널)"""
+        out_ts = None
+        out_mp4 = None
+
+        try:
+            source_url = self.cfg.base_folder_url.strip()
+            out_dir = self.cfg.save_dir or os.getcwd()
+            # 호스트별 공유 세션 - 다른 잡과 keep-alive 연결을 같이 씀
+            transport = get_transport()
+            headers = self.cfg.headers or {}
+            concurrency = max(1, self.cfg.concurrency)
+
+            # 탐지 캐시에서 가져온 범위인지 (받아 보니 틀리면 캐시에서 지움)
+            range_cached = False
+            # 범위 안에서 목록에 없는 번호 - 요청하지 않고 건너뜀 (목록에 빈 번호가 있을 때만)
+            missing = set()
+
+            # 이어받기를 요청했으면 URL 추출/범위 탐지를 건너뛰고 저널에서 이어받음
+            journal = self._load_resume_journal()
+            if journal is not None:
+                header = journal.header
+                base = header["base_url"]
+                start = header["start"]
+                end = header["end"]
+                self.cfg.zero_pad = header["zero_pad"]
+                missing = set(header.get("missing", []))
+                out_ts = header["out_ts"]
+                out_mp4 = header["out_mp4"]
+                self._out_ts = out_ts
+                session = transport.session_for(base)
+                resume_from = start if journal.last_seg is None else journal.last_seg + 1
+                self.status.emit(f"이어받기: {resume_from}번부터 ({journal.offset / (1024 * 1024):.1f} MB 완료)")
+                self._tracker.resume(journal.offset, resume_from - start - sum(1 for n in missing if n < resume_from))
+                if end is not None:
+                    self.status.emit(f"탐지 완료: {start} ~ {end} (총 {end - start + 1}개)")
+            else:
+                # 남아 있는 같은 URL·같은 이름의 저널은 건드리지 않고 알리기만 함 (새 파일로 처음부터)
+                leftover = find_journal(out_dir, source_url, self.cfg.out_name)
+                if leftover:
+                    self.status.emit(f"이전에 중단된 다운로드가 있습니다 (이어받기로 재개 가능): {leftover}")
+                url = source_url
+                listing_url = None
+                cache = get_cache() if self.cfg.use_cache else None
+                # yasyadong.tv 페이지 URL이면 세그먼트 URL 자동 추출
+                if is_yasya_page_url(url):
+                    resolved = self._cache_lookup(cache.get_resolved, url) if cache else None
+                    if resolved:
+                        self.status.emit(f"세그먼트 URL (캐시): {resolved.base_url}")
+                    else:
+                        self._tracker.set_phase(Phase.RESOLVE)
+                        try:
+                            # HTTP 로 먼저 시도하고, 안 되면 전역 Chrome 풀의 탭에서 추출
+                            resolver = get_resolver_service()
+                            resolved = resolver.resolve(
+                                url, status_callback=lambda msg: self.status.emit(msg),
+                                timeout=self.cfg.resolve_timeout, session=transport.session_for(url),
+                                headers=headers,
+                            )
+                            self.status.emit(f"세그먼트 URL 발견: {resolved.base_url} - {resolver.stats_text()}")
+                        except Exception as e:
+                            self._emit_done(False, f"URL 추출 실패: {e}")
+                            return
+                        if cache:
+                            cache.put_resolved(url, resolved)
+                    url = resolved.base_url
+                    listing_url = resolved.listing_url
+
+                # segment_0001.jpg 같은 형태로 URL 조합
+                base = self._normalize_url(url) + "segment_"
+                session = transport.session_for(base)
+
+                # 자동 탐지 모드
+                start = self.cfg.start
+                end = self.cfg.end
+
+                if self.cfg.auto_detect:
+                    cached = self._cache_lookup(cache.get_range, base) if cache else None
+                    listing = None
+                    if not cached and listing_url:
+                        listing = self._read_listing(transport.session_for(listing_url), listing_url, headers)
+                    if cached:
+                        # 이전에 탐지한 범위 재사용 → 프로브 생략
+                        start, end = cached.start, cached.end
+                        self.cfg.zero_pad = cached.zero_pad
+                        range_cached = True
+                    elif listing:
+                        # items*.shtml 목록에 나온 세그먼트만 받음 → 프로브 생략, 빈 번호는 요청하지 않음
+                        start, end = listing.start, listing.end
+                        self.cfg.zero_pad = listing.zero_pad
+                        missing = set(listing.missing)
+                        self.status.emit(f"목록에서 세그먼트 {listing.count}개 확인 (프로브 생략"
+                                         + (f", 빈 번호 {len(missing)}개 건너뜀)" if missing else ")"))
+                        # 캐시는 연속 범위만 저장하므로 빈 번호가 있으면 다음에도 목록을 읽음
+                        if cache and not missing:
+                            cache.put_range(base, start, end, self.cfg.zero_pad)
+                    else:
+                        # 없는 번호에 200 을 주는 호스트면 프로브가 끝없이 이어지지 않게 대체 응답 파악
+                        self._tracker.set_phase(Phase.PROBE)
+                        self._detect_placeholder(session, base, headers)
+                        # 시작번호 자동 탐지
+                        start = self._find_start(session, base, headers)
+                        if self._stop:
+                            self._emit_done(False, "사용자에 의해 중단됨")
+                            return
+
+                        # 끝번호 자동 탐지
+                        end = self._find_end(session, base, headers, start)
+                        if self._stop:
+                            self._emit_done(False, "사용자에 의해 중단됨")
+                            return
+
+                        if end is None or end < start:
+                            self._emit_done(False, "유효한 세그먼트를 찾지 못했습니다. URL을 확인하세요.")
+                            return
+
+                        if cache:
+                            cache.put_range(base, start, end, self.cfg.zero_pad)
+
+                    self.status.emit(f"탐지 완료: {start} ~ {end} (총 {end - start + 1}개)")
+
+                if cache:
+                    self.status.emit(f"캐시 적중 {self._cache_hits} / 미스 {self._cache_misses}")
+
+                # 랜덤 고유 ID를 붙여 동일 out_name 입력 시 덮어쓰기 방지
+                unique_id = uuid.uuid4().hex[:6]
+                base_name, ext = os.path.splitext(self.cfg.out_name or "output.mp4")
+                if not ext:
+                    ext = ".mp4"
+
+                # 임시 TS 파일 및 최종 출력 파일 경로
+                out_ts = os.path.join(out_dir, f"{base_name}_{unique_id}.ts")
+                out_mp4 = os.path.join(out_dir, f"{base_name}_{unique_id}{ext}")
+                self._out_ts = out_ts  # 정리용으로 저장
+
+                # 스트리밍 변환은 .ts 와 저널 없이 바로 MP4 를 만듦 (ffmpeg 가 없으면 내장 변환기)
+                streaming = self.cfg.stream_remux
+
+                # 기존에 남아있던 같은 이름 TS 삭제 (충돌 방지)
+                if os.path.exists(out_ts):
+                    os.remove(out_ts)
+
+                # 세그먼트 저널 생성 (출력 파일 옆)
+                journal = None if streaming else SegmentJournal.create(
+                    os.path.join(out_dir, f"{base_name}_{unique_id}{JOURNAL_SUFFIX}"),
+                    {
+                        "source_url": source_url,
+                        "out_name": self.cfg.out_name,
+                        "base_url": base,
+                        "start": start,
+                        "end": end,
+                        "zero_pad": self.cfg.zero_pad,
+                        "out_ts": out_ts,
+                        "out_mp4": out_mp4,
+                        "missing": sorted(missing),
+                    },
+                )
+                resume_from = start
+
+            self._journal = journal
+            self.journal_path = journal.path if journal else None
+
+            # 커밋된 지점까지만 남기고 TS 파일을 잘라냄 (저널 이후에 쓰다 만 데이터 제거)
+            if journal is not None:
+                with open(out_ts, "ab") as f:
+                    f.truncate(journal.offset)
+
+            n404 = 0
+            total_written = journal.offset if journal else 0
+            self._host = urlparse(base).hostname or ""
+            requests_before, conns_before = transport.connection_stats(base)
+            next_idx = resume_from
+            while next_idx in missing:
+                next_idx += 1
+            # 자동 조절이면 같은 호스트의 모든 잡이 조절기 하나를 공유하고, 창 크기만큼만 동시에 요청
+            if self.cfg.adaptive_concurrency and concurrency > 1:
+                limit = max(concurrency, self.cfg.max_concurrency)
+                self._controller = get_controller(self._host, initial=concurrency, maximum=limit)
+                self.status.emit(f"다운로드 시작 (동시 요청 자동 조절, 현재 {self._controller.window}개 / 최대 {limit}개)")
+            else:
+                limit = concurrency
+                self.status.emit("다운로드 시작" if concurrency == 1 else f"다운로드 시작 (동시 {concurrency}개)")
+            controller = self._controller
+            self._tracker.set_range(start, end, len(missing))
+            self._tracker.set_phase(Phase.DOWNLOAD)
+            reported_window = controller.window if controller else concurrency
+
+            # 세그먼트는 여러 스레드가 동시에 받고, 병합 파일 쓰기는 이 스레드만 번호 순서대로 한다.
+            # window 는 (번호, 버퍼, future) 의 순서 재조립 버퍼 - 최대 limit 개까지만 유지
+            # 버퍼는 요청마다 풀에서 꺼내고 기록 후 반납하므로 잡 메모리는 풀 크기로 제한됨
+            window = deque()
+            # 세그먼트 내용 해시 표 (중복/플레이스홀더 판별) + 번호별 기록 시작 위치 (되감기용)
+            hashes = SegmentHashTable(placeholder=self._placeholder)
+            offsets = {}
+            # 마지막으로 기록한 번호와 그 앞 번호 (플레이스홀더 하나를 되감을 때 저널에 남길 번호)
+            last_written = prev_written = resume_from - 1
+            self._buffers = SegmentBufferPool(limit, preallocate=concurrency)
+            pool = ThreadPoolExecutor(max_workers=limit, initializer=self._thread_initializer())
+            try:
+                # TS 병합 파일(+저널) 또는 ffmpeg 입력 파이프 / 내장 변환기
+                if journal is not None:
+                    sink = TsFileSink(out_ts, journal)
+                else:
+                    remuxer = choose_remuxer(self.cfg.remuxer)
+                    if remuxer == REMUXER_FFMPEG and not ffmpeg_available():
+                        # ffmpeg 를 골랐지만 PATH 에 없음 → 작업을 실패시키지 않고 내장 변환기로
+                        self.status.emit("ffmpeg 를 찾을 수 없어 내장 변환기로 스트리밍 변환합니다")
+                        remuxer = REMUXER_BUILTIN
+                    if remuxer == REMUXER_FFMPEG:
+                        self.status.emit("스트리밍 변환: 세그먼트를 받는 대로 ffmpeg 로 넘깁니다")
+                        sink = FfmpegPipeSink(out_mp4)
+                    else:
+                        self.status.emit("스트리밍 변환: 세그먼트를 받는 대로 내장 변환기로 MP4 를 씁니다")
+                        sink = BuiltinMp4Sink(out_mp4)
+                self._sink = sink
+                try:
+                    while not self._stop:
+                        # 빈 자리만큼 다음 세그먼트 요청을 미리 보냄
+                        while len(window) < limit and (end is None or next_idx <= end):
+                            # 호스트 창이 꽉 찼으면 보류 (받을 게 없을 때만 잠깐 대기)
+                            if controller and not controller.acquire(timeout=0 if window else 0.2):
+                                break
+                            buf = self._buffers.acquire()
+                            fut = pool.submit(self._fetch_segment, session, base, next_idx, headers, buf)
+                            if controller:
+                                # 끝나거나 취소되면 슬롯 반납
+                                fut.add_done_callback(lambda _f: controller.release())
+                            window.append((next_idx, buf, fut))
+                            next_idx += 1
+                            while next_idx in missing:
+                                next_idx += 1
+                        if not window:
+                            if controller and (end is None or next_idx <= end):
+                                continue  # 다른 잡이 창을 다 쓰고 있음 → 자리 날 때까지 대기
+                            break
+
+                        # 가장 앞 번호가 끝날 때까지 기다렸다가 순서대로 기록
+                        i, buf, fut = window.popleft()
+                        duplicate = None
+                        try:
+                            ok = fut.result()
+                            if ok:
+                                # 앞에서 받은 것/플레이스홀더와 내용이 같으면 없는 세그먼트로 취급
+                                duplicate = hashes.check(i, (buf.crc, buf.length))
+                                ok = duplicate is None
+                            if ok:
+                                # 세그먼트 이어쓰기 (memoryview 그대로 기록)
+                                offsets[i] = total_written
+                                sink.write(buf.view())
+                                size = buf.length
+                        finally:
+                            self._buffers.release(buf)
+
+                        if duplicate is not None:
+                            # 중복은 기록하지 않고 없는 세그먼트로 셈 (아래 not ok 경로)
+                            self.status.emit(f"{i} 중복 세그먼트: {duplicate}")
+                            if hashes.run_length == hashes.run_limit:
+                                # 같은 내용이 run_limit 개 이어짐. 그 내용을 처음 받은 번호가 바로 앞에 기록한
+                                # 세그먼트이고 없는 번호용 대체 응답이면 (카나리로 확인) 그것만 출력에서 제거
+                                # - 그보다 앞에 기록한 세그먼트는 정상이므로 남김
+                                origin = hashes.run_origin
+                                if origin == last_written and origin in offsets and self._placeholder is None:
+                                    self._detect_placeholder(session, base, headers)
+                                is_placeholder = self._placeholder is not None and self._placeholder.key == hashes.run_key
+                                if is_placeholder and origin == last_written and origin in offsets \
+                                        and sink.rewind(prev_written, offsets[origin]):
+                                    total_written = offsets.pop(origin)
+                                    last_written = prev_written
+                                    self.status.emit(f"{origin}번은 플레이스홀더 응답 → 출력에서 제거")
+                                if end is None:
+                                    # 끝번호를 모르면 이후는 모두 대체 응답으로 보고 끝냄
+                                    self.status.emit("같은 내용 세그먼트 반복 → 스트림 끝으로 판단")
+                                    break
+                                # 끝번호를 알면 중간의 빈 구간일 수 있으므로 건너뛰며 끝까지 받음
+                                self.status.emit(f"같은 내용 세그먼트 반복 → 건너뛰고 {end}번까지 계속")
+
+                        if not ok:
+                            n404 += 1
+                            if range_cached and end is not None and i <= end:
+                                # 캐시한 범위 안에 없는 세그먼트 → 그사이 스트림이 바뀜, 다음 작업은 다시 탐지
+                                self._invalidate_cached_range(base, f"{i}번 없음")
+                                range_cached = False
+                            # 자동 탐지 모드에서는 404 허용치를 낮춤 (이미 범위를 알고 있으므로)
+                            threshold = 3 if self.cfg.auto_detect and end else self.cfg.stop_after_n_404
+                            if end is None and n404 >= threshold:
+                                self.status.emit("연속 404 임계치 도달 → 종료")
+                                break
+                        else:
+                            n404 = 0
+                            total_written += size
+                            sink.commit(i, total_written)
+                            prev_written, last_written = last_written, i
+                            self._tracker.add(size, i)
+                        if controller and controller.window != reported_window:
+                            reported_window = controller.window
+                            self.status.emit(f"동시 요청 창: {reported_window}개 ({self._host})")
+                finally:
+                    # 중단/오류로 빠져나가도 기록한 만큼은 저널에 확정 (스트리밍은 입력 EOF)
+                    sink.close()
+            finally:
+                # 아직 시작 안 한 요청은 취소, 진행 중인 요청은 끝날 때까지 대기
+                pool.shutdown(wait=True, cancel_futures=True)
+            # 마지막 상태는 간격과 상관없이 전달 (이 스레드에서 MP4 를 마무리하면 FINALIZE)
+            self._tracker.finish(Phase.FINALIZE if sink.streaming or self.post_queue is None else Phase.DONE)
+
+            if hashes.duplicates:
+                self.status.emit(hashes.summary())
+            if self._invalid_segments or self._cc_accepted:
+                self.status.emit(
+                    f"세그먼트 검증: 실패 후 재요청 {self._invalid_segments}회, "
+                    f"연속성 오류 그대로 사용 {self._cc_accepted}개"
+                )
+            self.status.emit(
+                f"버퍼 최대 사용: {self._buffers.peak_bytes / (1024 * 1024):.1f} MB "
+                f"(풀 {self._buffers.capacity_bytes / (1024 * 1024):.1f} MB)"
+            )
+            # 같은 호스트를 쓰는 다른 잡의 요청도 함께 집계됨 (호스트 단위 연결 풀)
+            requests_after, conns_after = transport.connection_stats(base)
+            new_conns = conns_after - conns_before
+            self.status.emit(
+                f"호스트 연결: 요청 {requests_after - requests_before}회, 새 연결 {new_conns}개, "
+                f"재사용 {max(0, requests_after - requests_before - new_conns)}회"
+            )
+            self.status.emit(self.request_metrics.summary())
+            if self.cfg.metrics_report:
+                self._write_metrics_reports(out_mp4)
+
+            # 중지 요청으로 종료된 경우
+            if self._stop:
+                self._finish_stopped("사용자에 의해 중단됨")
+                return
+
+            # 총 데이터가 하나도 없으면 실패 처리
+            if total_written == 0:
+                if range_cached:
+                    self._invalidate_cached_range(base, "받은 세그먼트 없음")
+                self._finish_stopped("세그먼트를 하나도 받지 못했습니다. URL/헤더/쿠키를 확인하세요.")
+                return
+
+            # 다음에 같은 영상을 받을 때를 위해 범위와 총 크기 기록 (캐시 범위가 틀렸으면 다시 쓰지 않음)
+            if self.cfg.use_cache and self.cfg.auto_detect and end is not None and not self._range_invalidated \
+                    and not missing:
+                get_cache().put_range(base, start, end, self.cfg.zero_pad, total_written)
+
+            if sink.streaming:
+                # 입력은 이미 끝났으므로 ffmpeg 가 MP4 를 마무리할 때까지만 기다림
+                self.status.emit("MP4 마무리 중…")
+                if sink.finish():
+                    self.status.emit(
+                        f"스트리밍 변환: 다운로드와 겹친 시간 {sink.overlap_seconds:.1f}초, "
+                        f"마지막 세그먼트 후 마무리 {sink.tail_seconds:.1f}초"
+                    )
+                    self._emit_done(True, out_mp4)
+                else:
+                    error = sink.error_text()
+                    sink.abort()
+                    self._emit_done(False, f"MP4 변환 오류: {error}")
+                return
+
+            # TS → MP4 변환은 후처리 대기열로 넘기고 다운로드 슬롯은 바로 반납
+            job = self._remux_post_job(out_ts, out_mp4, journal)
+            if self.post_queue is not None:
+                self.status.emit("다운로드 완료, 후처리 대기 중…")
+                if not self.post_queue.put(job, should_stop=lambda: self._stop):
+                    self._finish_stopped("사용자에 의해 중단됨")
+                    return
+                self._stop_profiler()  # 변환은 대기열 스레드에서 - 이 작업의 측정은 여기까지
+                self.downloaded.emit(out_ts)
+                return
+
+            # 대기열 없이 쓰일 때는 이 스레드에서 바로 변환
+            ok, message = run_post_job(job, on_step=lambda name: self.status.emit(f"{name} 중…"))
+            self.status.emit(f"후처리 시간: {format_durations(job.durations)}")
+            self._emit_done(ok, message)
+
+        except Exception as e:
+            # 전체 루프에서 예외 발생 시 정리 후 실패 신호
+            self._finish_stopped(f"오류: {e}")
+
+
+class PornhubDownloadJob(DownloadJob):
+    """Pornhub 비디오 다운로드 (yt-dlp 사용, 진행 이벤트는 바이트 기준)"""
+
+    def __init__(self, cfg: JobConfig, key=None):
+        super().__init__(cfg, key)
+        self._downloaded_bytes = 0
+        self._total_bytes = 0
+        self._limiter = get_limiter()  # 세그먼트 워커와 같은 대역폭 제한 공유
+        self._host = urlparse(cfg.base_folder_url.strip()).hostname or ""
+        self._charged_file: Optional[str] = None  # 제한기에 알린 바이트의 기준 파일 (포맷마다 다름)
+        self._charged_bytes = 0                   # 그 파일의 downloaded_bytes 중 이미 알린 지점
+
+    def _charge_limiter(self, d):
+        """훅의 누적 downloaded_bytes 증가분만큼 대역폭 제한기에 알림 (제한을 넘었으면 대기)
+
+        - 다른 파일(영상/오디오 포맷)로 넘어가면 yt-dlp 카운터가 0부터 다시 시작 → 기준점 0
+        - 조각 재시도 등으로 값이 줄면 기준점만 낮춤 → 다시 받는 바이트도 빠짐없이 계산
+        """
+        downloaded = d.get('downloaded_bytes', 0) or 0
+        filename = d.get('filename')
+        if filename != self._charged_file:
+            self._charged_file, self._charged_bytes = filename, 0
+        delta = downloaded - self._charged_bytes
+        self._charged_bytes = downloaded
+        if delta > 0:
+            self._limiter.consume(self._host, delta, should_stop=lambda: self._stop)
+
+    def _progress_hook(self, d):
+        """yt-dlp 진행 상황 콜백"""
+        if self._stop:
+            raise Exception("사용자에 의해 중단됨")
+
+        if d['status'] == 'downloading':
+            # 훅은 yt-dlp 다운로드 스레드에서 블록마다 불리므로 여기서 대기하면 속도가 제한됨
+            self._charge_limiter(d)
+            self._downloaded_bytes = d.get('downloaded_bytes', 0) or 0
+            self._total_bytes = d.get('total_bytes', 0) or d.get('total_bytes_estimate', 0)
+            # 훅은 블록마다 불리지만 진행 이벤트는 일정 간격으로만 나감
+            self._tracker.set_phase(Phase.DOWNLOAD)
+            self._tracker.update(self._downloaded_bytes, self._total_bytes)
+
+        elif d['status'] == 'finished':
+            self._tracker.finish(Phase.FINALIZE)
+            self.status.emit("다운로드 완료, 처리 중...")
+
+    def _run(self):
+        """다운로드 실행"""
+        out_path = None
+        try:
+            import yt_dlp  # 무거운 모듈이라 Pornhub 작업에서만 로드
+
+            url = self.cfg.base_folder_url.strip()
+
+            # 출력 디렉토리 생성
+            out_dir = self.cfg.save_dir or os.getcwd()
+            os.makedirs(out_dir, exist_ok=True)
+
+            # 고유 ID로 파일명 생성
+            unique_id = uuid.uuid4().hex[:6]
+            base_name, ext = os.path.splitext(self.cfg.out_name or "output.mp4")
+            if not ext:
+                ext = ".mp4"
+            out_path = os.path.join(out_dir, f"{base_name}_{unique_id}{ext}")
+
+            self.status.emit("비디오 정보 가져오는 중...")
+            self._tracker.set_phase(Phase.RESOLVE)
+
+            # yt-dlp 옵션 설정
+            ydl_opts = {
+                'format': 'worst[ext=mp4]/worst',  # 가장 낮은 화질로 테스트 (다운로드 속도 최대화)
+                'outtmpl': out_path,
+                'progress_hooks': [self._progress_hook],
+                'quiet': False,  # 디버깅을 위해 로그 출력
+                'no_warnings': False,
+                'nocheckcertificate': True,
+                # 타임아웃 및 재시도 설정
+                'socket_timeout': 120,  # 소켓 타임아웃 더 증가
+                'retries': 20,  # 재시도 횟수 더 증가
+                'fragment_retries': 20,  # 프래그먼트 재시도
+                'file_access_retries': 10,  # 파일 접근 재시도
+                # HTTP 청크 크기 설정 (작은 청크로 타임아웃 방지)
+                'http_chunk_size': 524288,  # 512KB 청크 (더 작게)
+                # 버퍼 크기 설정
+                'buffersize': 1024,
+                # 사용자 정의 헤더가 있으면 사용
+                'http_headers': self.cfg.headers if self.cfg.headers else {
+                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                    'Accept-Language': 'en-us,en;q=0.5',
+                    'Sec-Fetch-Mode': 'navigate',
+                }
+            }
+
+            # 브라우저 쿠키 사용
+            if self.cfg.cookies_from_browser:
+                ydl_opts['cookiesfrombrowser'] = (self.cfg.cookies_from_browser,)
+
+            self.status.emit("비디오 다운로드 중...")
+
+            # yt-dlp로 다운로드
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.download([url])
+
+            # 다운로드 완료
+            if os.path.exists(out_path):
+                self._emit_done(True, out_path)
+            else:
+                self._emit_done(False, "다운로드는 완료되었으나 파일을 찾을 수 없습니다.")
+
+        except Exception as e:
+            if self._stop:
+                self._emit_done(False, "사용자에 의해 중단됨")
+            else:
+                self._emit_done(False, f"오류: {e}")
+
+            # 실패 시 부분 다운로드 파일 삭제
+            if out_path and os.path.exists(out_path):
+                try:
+                    os.remove(out_path)
+                except:
+                    pass
+
+
+def create_job(cfg: JobConfig, key=None) -> DownloadJob:
+    """설정의 비디오 종류에 맞는 작업 생성"""
+    if cfg.video_type == VideoType.PORNHUB:
+        return PornhubDownloadJob(cfg, key)
+    return SegmentDownloadJob(cfg, key)
@@ -0,0 +1,29 @@
+import threading
+from typing import Callable, List
+
+
+class Signal:
+    """Qt 없이 쓰는 시그널 - pyqtSignal 과 같은 connect/emit
+
+    슬롯은 emit 한 스레드에서 바로 호출된다. UI 스레드로 넘겨야 하면
+    Qt 쪽에서 pyqtSignal 의 emit 을 슬롯으로 연결한다 (workers.py).
+    """
+
+    def __init__(self):
+        self._slots: List[Callable] = []
+        self._lock = threading.Lock()
+
+    def connect(self, slot: Callable):
+        with self._lock:
+            self._slots.append(slot)
+
+    def disconnect(self, slot: Callable):
+        with self._lock:
+            if slot in self._slots:
+                self._slots.remove(slot)
+
+    def emit(self, *args):
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            slot(*args)
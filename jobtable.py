@@ -0,0 +1,264 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractTableModel, QEvent, QModelIndex, Qt
+from PyQt6.QtWidgets import (
+    QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton, QStyleOptionProgressBar
+)
+
+# 작업 목록 모델/뷰 - 행 상태는 작업 ID 로 찾고 (행 번호는 제거할 때 바뀜), 바뀐 행만 다시 그린다.
+# 셀마다 위젯(QCheckBox, QLabel)을 만들지 않고 delegate 가 보이는 행만 그린다.
+
+COLUMNS = ["선택", "원본 URL", "저장경로", "저장이름", "진행상황"]
+COL_CHECK, COL_URL, COL_DIR, COL_NAME, COL_PROGRESS = range(len(COLUMNS))
+_TEXT_FIELDS = {COL_URL: "url", COL_DIR: "save_dir", COL_NAME: "out_name", COL_PROGRESS: "text"}
+FRACTION_ROLE = Qt.ItemDataRole.UserRole + 1  # 진행상황 열: 0~1 (막대 없으면 None)
+
+
+@dataclass
+class JobRow:
+    """표 한 줄 - job_id 는 추가 순서대로 붙고 다른 행을 지워도 바뀌지 않음"""
+    job_id: int
+    url: str
+    save_dir: str
+    out_name: str
+    checked: bool = True
+    text: str = "대기 중"
+    fraction: Optional[float] = None        # 진행 막대 (None 이면 글자만)
+    completed: bool = False                 # 완료/실패 - 다시 시작하지 않음 (재개는 resume_journal 로)
+    resume_journal: Optional[str] = None    # 중단/실패 후 남은 세그먼트 저널
+
+
+class JobTableModel(QAbstractTableModel):
+    """작업 목록 모델
+
+    - 행은 리스트, 작업 ID → 행 번호는 딕셔너리로 바로 찾음 (행을 지울 때만 다시 만듦)
+    - set_status()/set_progress() 는 값만 바꾸고 그 작업을 '바뀜'으로 표시, flush() 가 바뀐 행만
+      dataChanged 로 알린다 (이어진 행은 한 범위로 묶음) → 작업이 많아도 다시 그리는 건 바뀐 행뿐
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[JobRow] = []
+        self._index: Dict[int, int] = {}  # 작업 ID → 행 번호
+        self._dirty: set = set()          # flush 전에 바뀐 작업 ID
+        self._next_id = 1
+
+    # ---------- Qt 모델 ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)  # 세로 헤더는 행 번호
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        job = self._rows[index.row()]
+        col = index.column()
+        if col == COL_CHECK:
+            if role == Qt.ItemDataRole.CheckStateRole:
+                return Qt.CheckState.Checked if job.checked else Qt.CheckState.Unchecked
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return getattr(job, _TEXT_FIELDS[col])
+        if col == COL_PROGRESS:
+            if role == FRACTION_ROLE:
+                return job.fraction
+            if role == Qt.ItemDataRole.ToolTipRole:
+                return job.text  # 열이 좁아 잘린 메시지
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() == COL_CHECK:
+            return flags | Qt.ItemFlag.ItemIsUserCheckable
+        if index.column() in (COL_URL, COL_DIR, COL_NAME):
+            return flags | Qt.ItemFlag.ItemIsEditable  # 시작 전에 고쳐 쓸 수 있음
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid():
+            return False
+        job = self._rows[index.row()]
+        col = index.column()
+        if col == COL_CHECK and role == Qt.ItemDataRole.CheckStateRole:
+            job.checked = value in (Qt.CheckState.Checked, Qt.CheckState.Checked.value)
+        elif col in (COL_URL, COL_DIR, COL_NAME) and role == Qt.ItemDataRole.EditRole:
+            setattr(job, _TEXT_FIELDS[col], str(value))
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    # ---------- 작업 추가/삭제 ----------
+    def add_job(self, url: str, save_dir: str, out_name: str) -> JobRow:
+        return self.add_jobs([(url, save_dir, out_name)])[0]
+
+    def add_jobs(self, entries: Iterable[Tuple[str, str, str]]) -> List[JobRow]:
+        """(URL, 저장경로, 저장이름) 여러 개를 한 번에 추가 (행 삽입 알림 한 번)"""
+        entries = list(entries)
+        if not entries:
+            return []
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        added = []
+        for url, save_dir, out_name in entries:
+            job = JobRow(self._next_id, url, save_dir, out_name)
+            self._next_id += 1
+            self._index[job.job_id] = len(self._rows)
+            self._rows.append(job)
+            added.append(job)
+        self.endInsertRows()
+        return added
+
+    def remove_jobs(self, job_ids: Iterable[int]) -> List[JobRow]:
+        """작업 ID 로 행 삭제 - 이어진 행은 한 번에, 뒤쪽부터 지워서 앞 행 번호가 밀리지 않게"""
+        rows = sorted({self._index[j] for j in job_ids if j in self._index}, reverse=True)
+        removed = []
+        i = 0
+        while i < len(rows):
+            last = first = rows[i]
+            while i + 1 < len(rows) and rows[i + 1] == first - 1:
+                i += 1
+                first = rows[i]
+            self.beginRemoveRows(QModelIndex(), first, last)
+            removed.extend(self._rows[first:last + 1])
+            del self._rows[first:last + 1]
+            self.endRemoveRows()
+            i += 1
+        if removed:
+            self._index = {job.job_id: row for row, job in enumerate(self._rows)}
+            self._dirty.difference_update(job.job_id for job in removed)
+        return removed
+
+    # ---------- 조회 ----------
+    def job(self, job_id: int) -> Optional[JobRow]:
+        row = self._index.get(job_id)
+        return None if row is None else self._rows[row]
+
+    def row_of(self, job_id: int) -> Optional[int]:
+        return self._index.get(job_id)
+
+    def jobs(self) -> List[JobRow]:
+        return list(self._rows)
+
+    def checked_jobs(self) -> List[JobRow]:
+        return [job for job in self._rows if job.checked]
+
+    # ---------- 상태 갱신 (flush 할 때 화면에 반영) ----------
+    def set_status(self, job_id: int, text: str):
+        """상태 메시지만 바꿈 (진행 막대는 그대로)"""
+        job = self.job(job_id)
+        if job is not None and job.text != text:
+            job.text = text
+            self._dirty.add(job_id)
+
+    def set_progress(self, job_id: int, text: str, fraction: Optional[float]):
+        job = self.job(job_id)
+        if job is not None and (job.text != text or job.fraction != fraction):
+            job.text = text
+            job.fraction = fraction
+            self._dirty.add(job_id)
+
+    def finish(self, job_id: int, text: str, resume_journal: Optional[str] = None):
+        """완료/실패 - 막대를 없애고 바로 다시 그림"""
+        job = self.job(job_id)
+        if job is None:
+            return
+        job.text = text
+        job.fraction = None
+        job.completed = True
+        job.resume_journal = resume_journal
+        self._dirty.add(job_id)
+        self.flush()
+
+    def flush(self) -> int:
+        """바뀐 행의 진행상황 칸만 dataChanged 로 알림 - 다시 그린 행 수 반환"""
+        if not self._dirty:
+            return 0
+        rows = sorted(self._index[j] for j in self._dirty if j in self._index)
+        self._dirty.clear()
+        i = 0
+        while i < len(rows):
+            first = last = rows[i]
+            while i + 1 < len(rows) and rows[i + 1] == last + 1:
+                i += 1
+                last = rows[i]
+            self.dataChanged.emit(self.index(first, COL_PROGRESS), self.index(last, COL_PROGRESS),
+                                  [Qt.ItemDataRole.DisplayRole, FRACTION_ROLE])
+            i += 1
+        return len(rows)
+
+
+def _style(option):
+    return option.widget.style() if option.widget is not None else QApplication.style()
+
+
+class CheckBoxDelegate(QStyledItemDelegate):
+    """선택 열 - 칸 가운데 체크박스, 클릭/스페이스로 전환 (행마다 QCheckBox 위젯을 만들지 않음)"""
+
+    def _check_option(self, option, index) -> QStyleOptionButton:
+        check = QStyleOptionButton()
+        check.state = QStyle.StateFlag.State_Enabled
+        check.state |= (QStyle.StateFlag.State_On if index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+                        else QStyle.StateFlag.State_Off)
+        size = _style(option).subElementRect(QStyle.SubElement.SE_CheckBoxIndicator, check, option.widget).size()
+        check.rect = QStyle.alignedRect(option.direction, Qt.AlignmentFlag.AlignCenter, size, option.rect)
+        return check
+
+    def paint(self, painter, option, index):
+        style = _style(option)
+        # 선택 배경은 기본대로 그리고 체크박스만 가운데
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_IndicatorCheckBox, self._check_option(option, index),
+                            painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if not index.flags() & Qt.ItemFlag.ItemIsUserCheckable:
+            return False
+        kind = event.type()
+        if kind in (QEvent.Type.MouseButtonRelease, QEvent.Type.MouseButtonDblClick):
+            if event.button() != Qt.MouseButton.LeftButton or \
+                    not self._check_option(option, index).rect.contains(event.position().toPoint()):
+                return False
+            if kind == QEvent.Type.MouseButtonDblClick:
+                return True  # 두 번 눌러도 한 번만 전환
+        elif kind == QEvent.Type.KeyPress:
+            if event.key() not in (Qt.Key.Key_Space, Qt.Key.Key_Select):
+                return False
+        else:
+            return False
+        checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+        return model.setData(index, Qt.CheckState.Unchecked if checked else Qt.CheckState.Checked,
+                             Qt.ItemDataRole.CheckStateRole)
+
+
+class ProgressDelegate(QStyledItemDelegate):
+    """진행상황 열 - 진행률이 있으면 막대 위에 글자, 없으면 (대기/완료/실패) 글자만"""
+
+    def paint(self, painter, option, index):
+        fraction = index.data(FRACTION_ROLE)
+        if fraction is None:
+            super().paint(painter, option, index)
+            return
+        style = _style(option)
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+        bar = QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(2, 2, -2, -2)
+        bar.palette = option.palette
+        bar.fontMetrics = option.fontMetrics
+        bar.direction = option.direction
+        bar.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Horizontal
+        bar.minimum = 0
+        bar.maximum = 1000
+        bar.progress = int(fraction * 1000)
+        bar.text = bar.fontMetrics.elidedText(index.data(), Qt.TextElideMode.ElideRight, bar.rect.width() - 4)
+        bar.textVisible = True
+        bar.textAlignment = Qt.AlignmentFlag.AlignCenter
+        style.drawControl(QStyle.ControlElement.CE_ProgressBar, bar, painter, option.widget)
@@ -0,0 +1,134 @@
+import glob
+import json
+import os
+import threading
+from typing import Optional, Set
+
+# 저널 파일 확장자 (출력 파일 옆에 {이름}_{id}.journal 로 생성)
+JOURNAL_SUFFIX = ".journal"
+
+# 현재 프로세스에서 사용 중인 저널 (같은 저널을 두 잡이 동시에 이어받지 않도록)
+_active: Set[str] = set()
+_active_lock = threading.Lock()
+
+
+class SegmentJournal:
+    """잡별 세그먼트 저널 (JSON Lines)
+
+    첫 줄은 잡 정보 헤더, 이후 줄은 커밋된 세그먼트 번호와 그 세그먼트까지 기록한
+    TS 파일 크기(offset)다. 커밋은 모아서 처리하며, TS 파일을 먼저 fsync 한 뒤에
+    저널에 적기 때문에 저널이 가리키는 offset 까지는 항상 디스크에 있다.
+    """
+
+    def __init__(self, path: str, header: dict, fsync_every: int = 16):
+        self.path = path
+        self.header = header
+        self.fsync_every = max(1, fsync_every)
+        self.last_seg: Optional[int] = None  # 마지막으로 커밋된 세그먼트 번호
+        self.offset = 0                      # 커밋된 TS 바이트 수
+        self._pending = []                   # 아직 fsync 안 된 커밋
+        self._fp = None
+
+    # ---------- 생성/로드 ----------
+    @classmethod
+    def create(cls, path: str, header: dict, fsync_every: int = 16) -> "SegmentJournal":
+        """새 저널 생성 (기존 파일은 덮어씀)"""
+        journal = cls(path, header, fsync_every)
+        journal._acquire()
+        journal._fp = open(path, "w", encoding="utf-8")
+        journal._fp.write(json.dumps(header, ensure_ascii=False) + "\n")
+        journal._fp.flush()
+        os.fsync(journal._fp.fileno())
+        return journal
+
+    @classmethod
+    def load(cls, path: str, fsync_every: int = 16) -> "SegmentJournal":
+        """기존 저널을 읽어서 이어쓰기용으로 엶 (마지막 줄이 잘려 있으면 무시)"""
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        if not lines:
+            raise ValueError(f"빈 저널 파일: {path}")
+        journal = cls(path, json.loads(lines[0]), fsync_every)
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+                seg, offset = int(entry["seg"]), int(entry["offset"])
+            except (ValueError, KeyError, TypeError):
+                break  # 쓰다 만 줄 → 그 앞까지만 유효
+            journal.last_seg, journal.offset = seg, offset
+        journal._acquire()
+        journal._fp = open(path, "a", encoding="utf-8")
+        return journal
+
+    def _acquire(self):
+        with _active_lock:
+            key = os.path.abspath(self.path)
+            if key in _active:
+                raise RuntimeError(f"이미 사용 중인 저널입니다: {self.path}")
+            _active.add(key)
+
+    def _release_active(self):
+        with _active_lock:
+            _active.discard(os.path.abspath(self.path))
+
+    # ---------- 기록 ----------
+    @property
+    def has_commits(self) -> bool:
+        return self.last_seg is not None or bool(self._pending)
+
+    def commit(self, seg: int, offset: int, data_file):
+        """세그먼트 기록 완료 표시 - fsync_every 개마다 디스크에 확정"""
+        self._pending.append((seg, offset))
+        if len(self._pending) >= self.fsync_every:
+            self.sync(data_file)
+
+    def sync(self, data_file):
+        """대기 중인 커밋 확정: TS 파일 fsync → 저널 기록 → 저널 fsync"""
+        if not self._pending or self._fp is None:
+            return
+        data_file.flush()
+        os.fsync(data_file.fileno())
+        for seg, offset in self._pending:
+            self._fp.write(json.dumps({"seg": seg, "offset": offset}) + "\n")
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+        self.last_seg, self.offset = self._pending[-1]
+        self._pending.clear()
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+        self._release_active()
+
+    def remove(self):
+        """잡 완료 후 저널 삭제"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def find_journal(save_dir: str, source_url: str, out_name: str) -> Optional[str]:
+    """save_dir 에서 같은 원본 URL + 같은 저장이름의 저널을 찾음 (앱 재시작/크래시 후 이어받기 제안용)
+
+    저장이름이 없는 (이전 형식) 저널이나 다른 이름으로 받던 저널은 고르지 않는다.
+    """
+    with _active_lock:
+        active = set(_active)
+    candidates = []
+    for path in glob.glob(os.path.join(glob.escape(save_dir), "*" + JOURNAL_SUFFIX)):
+        if os.path.abspath(path) in active:
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+        except (OSError, ValueError):
+            continue
+        if header.get("source_url") == source_url and header.get("out_name") == out_name \
+                and os.path.exists(header.get("out_ts", "")):
+            candidates.append((os.path.getmtime(path), path))
+    if not candidates:
+        return None
+    return max(candidates)[1]
@@ -0,0 +1,70 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import urljoin
+
+import requests
+
+# 목록 문서 안의 세그먼트 파일명 (segment_0001.jpg)
+SEGMENT_NAME_RE = re.compile(r'segment_(\d+)\.jpg')
+# 다른 재생목록을 가리키는 줄 (variant m3u8, items2.shtml 등)
+NESTED_PLAYLIST_RE = re.compile(r'^[^#\s][^\s]*\.(?:m3u8|shtml)(?:\?[^\s]*)?$', re.MULTILINE)
+
+
+@dataclass
+class SegmentListing:
+    """items*.shtml 목록에서 읽은 세그먼트 정보"""
+    names: List[str]   # 목록에 나온 순서대로의 세그먼트 파일명
+    start: int
+    end: int
+    zero_pad: int
+
+    @property
+    def count(self) -> int:
+        return len(self.names)
+
+    @property
+    def missing(self) -> List[int]:
+        """start~end 중 목록에 없는 번호 (받지 않고 건너뜀)"""
+        listed = {int(SEGMENT_NAME_RE.match(name).group(1)) for name in self.names}
+        return [n for n in range(self.start, self.end + 1) if n not in listed]
+
+
+def parse_segment_listing(text: str) -> Optional[SegmentListing]:
+    """목록/재생목록 본문에서 세그먼트 파일명과 번호 범위 추출 (없으면 None)"""
+    names = []
+    numbers = []
+    seen = set()
+    for m in SEGMENT_NAME_RE.finditer(text):
+        if m.group(0) in seen:
+            continue
+        seen.add(m.group(0))
+        names.append(m.group(0))
+        numbers.append(m.group(1))
+    if not names:
+        return None
+    values = [int(n) for n in numbers]
+    # 가장 작은 번호의 자릿수를 쓰면 zfill 로 모든 이름이 그대로 재현됨 (0001 … 10000)
+    first = numbers[values.index(min(values))]
+    return SegmentListing(names=names, start=min(values), end=max(values), zero_pad=len(first))
+
+
+def fetch_segment_listing(session: requests.Session, listing_url: str, headers: Optional[dict] = None,
+                          timeout: float = 10.0, max_depth: int = 2) -> Optional[SegmentListing]:
+    """목록 문서를 받아서 파싱 - 세그먼트가 없고 다른 재생목록을 가리키면 max_depth 단계까지 따라감"""
+    r = session.get(listing_url, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    listing = parse_segment_listing(r.text)
+    if listing or max_depth <= 0:
+        return listing
+    for ref in NESTED_PLAYLIST_RE.findall(r.text):
+        nested = urljoin(listing_url, ref.strip())
+        if nested == listing_url:
+            continue
+        try:
+            listing = fetch_segment_listing(session, nested, headers, timeout, max_depth - 1)
+        except requests.RequestException:
+            continue
+        if listing:
+            return listing
+    return None
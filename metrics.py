@@ -0,0 +1,389 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# 요청 단계: DNS 조회, TCP 연결, TLS 핸드셰이크 (새 연결일 때만), 첫 바이트(요청 전송 ~ 응답 헤더),
+# 본문 전송, 전체. 연결 단계는 transport.py 의 연결 클래스가 현재 스레드의 RequestTiming 에 기록한다.
+PHASES = ("dns", "connect", "tls", "ttfb", "transfer", "total")
+
+# 히스토그램 구간 상한 (초) - Prometheus 기본값에 1ms 이하 구간을 더함 (로컬/CDN 캐시 적중)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS_JSON_SUFFIX = ".metrics.json"
+METRICS_PROM_SUFFIX = ".prom"
+
+
+class Histogram:
+    """고정 구간 히스토그램 (구간별 개수 + 합계) - 값 하나 기록은 이분 탐색 한 번"""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """구간 안에서 선형 보간한 근사 분위수 (Prometheus histogram_quantile 과 같은 방식)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                if i == len(BUCKETS):
+                    return BUCKETS[-1]
+                low = BUCKETS[i - 1] if i else 0.0
+                return low + (BUCKETS[i] - low) * (rank - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {str(le): n for le, n in zip(BUCKETS + ("+Inf",), self.counts)},
+        }
+
+
+def error_class(exc: BaseException, status: Optional[int] = None) -> str:
+    """예외 → 오류 종류 이름 (timeout / connection / http_429 / http_5xx / http_4xx / 예외 클래스 이름)
+
+    requests 를 불러오지 않도록 클래스 이름으로 판단한다. 예외에 error_class 속성이 있으면 그 값.
+    """
+    label = getattr(exc, "error_class", None)
+    if label:
+        return label
+    if status is not None and status >= 400:
+        return "http_429" if status == 429 else f"http_{status // 100}xx"
+    name = type(exc).__name__
+    if "Timeout" in name:
+        return "timeout"
+    if "Connection" in name or "ChunkedEncoding" in name:
+        return "connection"
+    return name
+
+
+_current = threading.local()
+
+
+def current_timing() -> Optional["RequestTiming"]:
+    """이 스레드에서 진행 중인 요청의 시간 기록 (없으면 None)"""
+    return getattr(_current, "timing", None)
+
+
+class RequestTiming:
+    """요청 하나의 단계별 시간 - with 블록 동안 현재 스레드의 요청으로 등록
+
+    with metrics.request("segment", url, attempt) as timing:
+        r = session.get(...)
+        timing.response(r.status_code)   # 응답 헤더 도착 (첫 바이트)
+        ... 본문 읽기 ...
+        timing.body_done(nbytes)         # 본문 끝 (안 부르면 with 가 끝난 시각)
+    """
+
+    __slots__ = ("kind", "host", "attempt", "start", "dns", "connect", "tls", "new_connection",
+                 "headers_at", "end", "status", "nbytes", "error", "_owner", "_previous")
+
+    def __init__(self, owner: "JobMetrics", kind: str, host: str, attempt: int = 1):
+        self._owner = owner
+        self.kind = kind
+        self.host = host
+        self.attempt = attempt
+        self.start = 0.0
+        self.dns = 0.0
+        self.connect = 0.0
+        self.tls = 0.0
+        self.new_connection = False
+        self.headers_at: Optional[float] = None
+        self.end: Optional[float] = None
+        self.status: Optional[int] = None
+        self.nbytes = 0
+        self.error: Optional[str] = None
+        self._previous = None
+
+    def response(self, status: int):
+        self.headers_at = time.perf_counter()
+        self.status = status
+
+    def body_done(self, nbytes: int):
+        self.end = time.perf_counter()
+        self.nbytes = nbytes
+
+    def fail(self, label: str):
+        """오류 종류를 직접 지정 (예외로 끝나도 이 값이 우선)"""
+        if self.error is None:
+            self.error = label
+
+    def phases(self) -> Dict[str, float]:
+        end = self.end if self.end is not None else time.perf_counter()
+        result = {"total": end - self.start}
+        if self.new_connection:
+            result.update(dns=self.dns, connect=self.connect, tls=self.tls)
+        if self.headers_at is not None:
+            result["ttfb"] = max(0.0, self.headers_at - self.start - self.dns - self.connect - self.tls)
+            result["transfer"] = end - self.headers_at
+        return result
+
+    def __enter__(self) -> "RequestTiming":
+        self._previous = getattr(_current, "timing", None)
+        _current.timing = self
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.end is None:
+            self.end = time.perf_counter()
+        _current.timing = self._previous
+        self._previous = None
+        if exc is not None:
+            self.fail(error_class(exc, self.status))
+        self._owner.record(self)
+        return False
+
+
+class RequestMetrics:
+    """요청 시간 집계 - 종류(segment/probe)·단계별 히스토그램, 상태 코드/오류/재시도/새 연결 수"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.requests: Dict[Tuple[str, str], int] = {}   # (종류, 상태 코드 또는 "error") → 횟수
+        self.errors: Dict[Tuple[str, str], int] = {}     # (종류, 오류 종류) → 횟수
+        self.retries: Dict[str, int] = {}                # 종류 → 재시도 요청 수 (두 번째 시도부터)
+        self.new_connections: Dict[str, int] = {}
+        self.bytes: Dict[str, int] = {}
+
+    def record(self, timing: RequestTiming):
+        phases = timing.phases()
+        kind = timing.kind
+        status = str(timing.status) if timing.status is not None else "error"
+        with self._lock:
+            for phase, seconds in phases.items():
+                key = (kind, phase)
+                hist = self.histograms.get(key)
+                if hist is None:
+                    hist = self.histograms[key] = Histogram()
+                hist.observe(seconds)
+            self.requests[(kind, status)] = self.requests.get((kind, status), 0) + 1
+            if timing.error is not None:
+                self.errors[(kind, timing.error)] = self.errors.get((kind, timing.error), 0) + 1
+            if timing.attempt > 1:
+                self.retries[kind] = self.retries.get(kind, 0) + 1
+            if timing.new_connection:
+                self.new_connections[kind] = self.new_connections.get(kind, 0) + 1
+            if timing.nbytes:
+                self.bytes[kind] = self.bytes.get(kind, 0) + timing.nbytes
+
+    def quantile(self, kind: str, phase: str, q: float) -> Optional[float]:
+        with self._lock:
+            hist = self.histograms.get((kind, phase))
+            return hist.quantile(q) if hist else None
+
+    def summary(self) -> str:
+        """상태 메시지용 한 줄 요약"""
+        parts = []
+        for kind in ("segment", "probe"):
+            ttfb = self.quantile(kind, "ttfb", 0.5)
+            if ttfb is None:
+                continue
+            transfer = self.quantile(kind, "transfer", 0.5) or 0.0
+            parts.append(f"{kind} 중앙값 첫 바이트 {ttfb * 1000:.0f}ms / 전송 {transfer * 1000:.0f}ms")
+        with self._lock:
+            connect = sum(self.new_connections.values())
+            retries = sum(self.retries.values())
+            errors = {}
+            for (_, label), n in self.errors.items():
+                errors[label] = errors.get(label, 0) + n
+        parts.append(f"새 연결 {connect}개, 재시도 {retries}회")
+        if errors:
+            parts.append("오류 " + ", ".join(f"{label} {n}" for label, n in sorted(errors.items())))
+        return "요청 시간: " + ", ".join(parts)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            kinds = sorted({k for k, _ in self.histograms} | {k for k, _ in self.requests})
+            return {
+                kind: {
+                    "requests": {s: n for (k, s), n in sorted(self.requests.items()) if k == kind},
+                    "errors": {e: n for (k, e), n in sorted(self.errors.items()) if k == kind},
+                    "retries": self.retries.get(kind, 0),
+                    "new_connections": self.new_connections.get(kind, 0),
+                    "bytes": self.bytes.get(kind, 0),
+                    "phases": {p: self.histograms[(kind, p)].to_dict()
+                               for p in PHASES if (kind, p) in self.histograms},
+                }
+                for kind in kinds
+            }
+
+
+class JobMetrics:
+    """잡 하나의 요청 시간 - 호스트별로 집계하고 프로세스 전역 호스트 집계(get_metrics)에도 더함"""
+
+    def __init__(self, registry: Optional["MetricsRegistry"] = None):
+        self.registry = registry if registry is not None else get_metrics()
+        self.total = RequestMetrics()
+        self.hosts: Dict[str, RequestMetrics] = {}
+        self._lock = threading.Lock()
+        self._last_host: Tuple[str, str] = ("", "")  # (URL 앞부분, 호스트) - 같은 호스트 반복 파싱 생략
+
+    def request(self, kind: str, url: str, attempt: int = 1) -> RequestTiming:
+        return RequestTiming(self, kind, self._host_of(url), attempt)
+
+    def _host_of(self, url: str) -> str:
+        prefix, host = self._last_host
+        if prefix and url.startswith(prefix):
+            return host
+        host = (urlsplit(url).hostname or "").lower()
+        cut = url.find("/", url.find("//") + 2)
+        self._last_host = (url[:cut + 1] if cut > 0 else url, host)
+        return host
+
+    def record(self, timing: RequestTiming):
+        with self._lock:
+            host_metrics = self.hosts.get(timing.host)
+            if host_metrics is None:
+                host_metrics = self.hosts[timing.host] = RequestMetrics()
+        self.total.record(timing)
+        host_metrics.record(timing)
+        self.registry.host(timing.host).record(timing)
+
+    def summary(self) -> str:
+        return self.total.summary()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            hosts = dict(self.hosts)
+        return {
+            "buckets": list(BUCKETS),
+            "total": self.total.to_dict(),
+            "hosts": {host: m.to_dict() for host, m in sorted(hosts.items())},
+        }
+
+    def write_reports(self, output_path: str, job_name: str) -> Tuple[str, str]:
+        """출력 파일 옆에 JSON 보고서와 Prometheus 텍스트 파일 작성 → (JSON 경로, .prom 경로)"""
+        stem = os.path.splitext(output_path)[0]
+        json_path = stem + METRICS_JSON_SUFFIX
+        prom_path = stem + METRICS_PROM_SUFFIX
+        report = {"job": job_name, "output": output_path, "written_at": time.time(), **self.to_dict()}
+        _write_atomic(json_path, json.dumps(report, ensure_ascii=False, indent=2))
+        with self._lock:
+            hosts = list(self.hosts.items())
+        _write_atomic(prom_path, prometheus_text(({"job": job_name, "host": h}, m) for h, m in sorted(hosts)))
+        return json_path, prom_path
+
+
+class MetricsRegistry:
+    """프로세스 전역 호스트별 집계 (여러 잡이 같은 호스트를 쓰면 합쳐짐)"""
+
+    def __init__(self):
+        self._hosts: Dict[str, RequestMetrics] = {}
+        self._lock = threading.Lock()
+
+    def host(self, host: str) -> RequestMetrics:
+        with self._lock:
+            metrics = self._hosts.get(host)
+            if metrics is None:
+                metrics = self._hosts[host] = RequestMetrics()
+            return metrics
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            hosts = sorted(self._hosts.items())
+        return prometheus_text(({"host": h}, m) for h, m in hosts)
+
+    def write_prometheus(self, path: str):
+        """node_exporter textfile 수집기 등이 읽을 수 있게 통째로 교체"""
+        _write_atomic(path, self.prometheus_text())
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            hosts = sorted(self._hosts.items())
+        return {"buckets": list(BUCKETS), "hosts": {h: m.to_dict() for h, m in hosts}}
+
+
+_PREFIX = "segmentgrabber"
+_HELP = [
+    ("request_phase_seconds", "histogram", "요청 단계별 시간 (dns/connect/tls 는 새 연결만)"),
+    ("requests_total", "counter", "요청 수 (상태 코드별, 응답 없이 실패하면 error)"),
+    ("request_errors_total", "counter", "오류 종류별 요청 수"),
+    ("request_retries_total", "counter", "재시도 요청 수"),
+    ("new_connections_total", "counter", "새로 연 연결 수 (나머지는 keep-alive 재사용)"),
+    ("response_bytes_total", "counter", "받은 본문 바이트"),
+]
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    def escape(value: str) -> str:
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def prometheus_text(groups: Iterable[Tuple[Dict[str, str], RequestMetrics]]) -> str:
+    """[(공통 레이블, 집계)] → Prometheus 텍스트 형식"""
+    samples: Dict[str, List[str]] = {name: [] for name, _, _ in _HELP}
+    for base, metrics in groups:
+        with metrics._lock:
+            histograms = sorted(metrics.histograms.items())
+            requests = sorted(metrics.requests.items())
+            errors = sorted(metrics.errors.items())
+            retries = sorted(metrics.retries.items())
+            connections = sorted(metrics.new_connections.items())
+            nbytes = sorted(metrics.bytes.items())
+        for (kind, phase), hist in histograms:
+            labels = dict(base, kind=kind, phase=phase)
+            out = samples["request_phase_seconds"]
+            cumulative = 0
+            for le, n in zip(BUCKETS + ("+Inf",), hist.counts):
+                cumulative += n
+                out.append(f"{_PREFIX}_request_phase_seconds_bucket{_labels(dict(labels, le=le))} {cumulative}")
+            out.append(f"{_PREFIX}_request_phase_seconds_sum{_labels(labels)} {hist.sum:.6f}")
+            out.append(f"{_PREFIX}_request_phase_seconds_count{_labels(labels)} {hist.count}")
+        for (kind, status), n in requests:
+            samples["requests_total"].append(f"{_PREFIX}_requests_total{_labels(dict(base, kind=kind, status=status))} {n}")
+        for (kind, label), n in errors:
+            samples["request_errors_total"].append(
+                f"{_PREFIX}_request_errors_total{_labels(dict(base, kind=kind, error=label))} {n}")
+        for name, counter in (("request_retries_total", retries), ("new_connections_total", connections),
+                              ("response_bytes_total", nbytes)):
+            for kind, n in counter:
+                samples[name].append(f"{_PREFIX}_{name}{_labels(dict(base, kind=kind))} {n}")
+
+    lines = []
+    for name, kind, help_text in _HELP:
+        lines.append(f"# HELP {_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {_PREFIX}_{name} {kind}")
+        lines.extend(samples[name])
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: str, text: str):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """프로세스 전역 호스트별 집계"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
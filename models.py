@@ -20,3 +20,24 @@ class JobConfig:
     timeout: int = 30
     headers: Optional[Dict[str, str]] = None
     auto_detect: bool = True  # 시작/끝번호 자동 탐지 여부
+    concurrency: int = 4      # 동시에 받을 세그먼트 수 (1이면 순차 다운로드, 자동 조절 시 시작값)
+    adaptive_concurrency: bool = True  # 지연/오류에 따라 호스트별 동시 요청 수 자동 조절 (AIMD)
+    max_concurrency: int = 16  # 자동 조절 시 상한
+    resume_journal: Optional[str] = None  # 이어받을 세그먼트 저널 경로
+    use_cache: bool = True      # 탐지 결과(베이스 URL, 세그먼트 범위) 디스크 캐시 사용
+    probe_parallelism: int = 8  # 끝번호 탐지 시 라운드당 동시 프로브 수 (1이면 이진 탐색)
+    resolve_timeout: float = 20.0  # 페이지 URL → 세그먼트 URL 추출 최대 대기 (초)
+    stream_remux: bool = False  # .ts 없이 세그먼트를 받는 대로 MP4 로 변환 (이어받기 불가)
+    remuxer: str = "auto"       # TS→MP4 변환기: auto(ffmpeg 없으면 내장) / ffmpeg / builtin
+    validate_segments: bool = True  # 받은 세그먼트의 모든 TS 패킷 검증 (동기 바이트, 연속성, 길이)
+    metrics_report: bool = True     # 출력 파일 옆에 요청 시간 보고서 (.metrics.json, Prometheus .prom)
+    profile: bool = False       # 작업 스레드 cProfile + 시작/끝 tracemalloc 스냅샷 (SEGMENTGRABBER_PROFILE 로 전체 켜기)
+    profile_dir: Optional[str] = None  # 프로파일 기록 폴더 (없으면 ~/.segmentgrabber/profiles)
+    cookies_from_browser: Optional[str] = "chrome"  # yt-dlp 작업이 쿠키를 읽을 브라우저 (None 이면 쿠키 없이)
+
+
+@dataclass
+class ResolvedSource:
+    """페이지 URL 에서 추출한 세그먼트 위치"""
+    base_url: str                      # 'https://host/HASH/' 형태의 베이스 URL
+    listing_url: Optional[str] = None  # items*.shtml 세그먼트 목록 URL (찾은 경우)
@@ -0,0 +1,152 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from events import Signal
+
+
+class PostProcessCancelled(Exception):
+    """대기열 종료로 시작하지 못한 후처리 (finish 에 넘겨 저널을 남기게 함)"""
+
+    def __init__(self):
+        super().__init__("종료로 후처리 취소됨")
+
+
+@dataclass
+class PostStep:
+    """후처리 단계 하나 (실패하면 예외를 던짐)"""
+    name: str
+    run: Callable[[], None]
+
+
+@dataclass
+class PostJob:
+    """다운로드가 끝난 뒤 할 일 목록
+
+    steps 를 순서대로 실행하고, 끝나면 finish(오류 또는 None) 로 최종 (성공 여부, 메시지)를
+    만든다. 임시 파일/저널 정리도 finish 에서 한다.
+    """
+    key: object  # 결과를 받을 쪽이 작업을 찾는 키 (보통 워커)
+    steps: List[PostStep]
+    finish: Callable[[Optional[BaseException]], Tuple[bool, str]]
+    durations: List[Tuple[str, float]] = field(default_factory=list)  # (단계 이름, 초)
+
+
+def run_post_job(job: PostJob, on_step: Optional[Callable[[str], None]] = None) -> Tuple[bool, str]:
+    """후처리 단계를 순서대로 실행 (중간에 실패하면 나머지 단계는 건너뜀)"""
+    error = None
+    for step in job.steps:
+        if on_step is not None:
+            on_step(step.name)
+        t0 = time.monotonic()
+        try:
+            step.run()
+        except Exception as e:
+            error = e
+        job.durations.append((step.name, time.monotonic() - t0))
+        if error is not None:
+            break
+    return _finish_post_job(job, error)
+
+
+def _finish_post_job(job: PostJob, error: Optional[BaseException]) -> Tuple[bool, str]:
+    try:
+        return job.finish(error)
+    except Exception as e:
+        return False, f"후처리 오류: {e}"
+
+
+def format_durations(durations: List[Tuple[str, float]]) -> str:
+    """[('변환', 3.2)] → '변환 3.2초'"""
+    return ", ".join(f"{name} {seconds:.1f}초" for name, seconds in durations)
+
+
+class PostProcessQueue:
+    """다운로드 슬롯과 분리된 후처리(ffmpeg 변환 등) 대기열
+
+    - 작업은 max_workers 개의 스레드에서만 실행 (디스크/CPU 를 다운로드와 나눠 씀)
+    - 대기 작업이 max_pending 개면 put() 이 자리가 날 때까지 막힘
+      → 후처리가 밀리면 다운로드도 자연스럽게 늦춰짐
+    - 다운로드 스레드에서 put() 을 부르고, 결과는 후처리 스레드에서 시그널로 알림
+      (UI 는 workers.QtPostProcessQueue 로 감싸 UI 스레드에서 받음)
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 4):
+        self.step_started = Signal()    # (키, 단계 이름)
+        self.job_finished = Signal()    # (키, 성공 여부, 메시지, [(단계, 초)])
+        self.depth_changed = Signal()   # (대기, 실행 중)
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="postprocess")
+        self._cond = threading.Condition()
+        self._pending: List[PostJob] = []  # 아직 시작 안 한 작업
+        self._futures: Dict[int, Future] = {}  # id(작업) → future (종료 때 대기 작업 취소용)
+        self._running: List[object] = []
+        self._closed = False
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    def is_pending(self, key) -> bool:
+        """대기 중이거나 실행 중인지"""
+        with self._cond:
+            return any(job.key == key for job in self._pending) or key in self._running
+
+    def put(self, job: PostJob, should_stop: Optional[Callable[[], bool]] = None) -> bool:
+        """작업 등록 - 대기열이 꽉 차면 대기 (중지되면 False)"""
+        with self._cond:
+            while len(self._pending) >= self.max_pending:
+                if self._closed or (should_stop and should_stop()):
+                    return False
+                self._cond.wait(timeout=0.2)
+            if self._closed:
+                return False
+            self._pending.append(job)
+            self._futures[id(job)] = self._executor.submit(self._run, job)
+        self._emit_depth()
+        return True
+
+    def _emit_depth(self):
+        self.depth_changed.emit(len(self._pending), len(self._running))
+
+    def _run(self, job: PostJob):
+        with self._cond:
+            self._pending.remove(job)
+            del self._futures[id(job)]
+            self._running.append(job.key)
+            self._cond.notify_all()
+        self._emit_depth()
+        try:
+            ok, message = run_post_job(job, on_step=lambda name: self.step_started.emit(job.key, name))
+        finally:
+            with self._cond:
+                self._running.remove(job.key)
+        self.job_finished.emit(job.key, ok, message, list(job.durations))
+        self._emit_depth()
+
+    def shutdown(self, wait: bool = True):
+        """대기 중인 작업은 취소, 실행 중인 것은 대기
+
+        취소한 작업도 finish(PostProcessCancelled) 를 거쳐 job_finished 로 실패를 알린다
+        (저널이 남아 나중에 이어받기로 변환 가능) - 결과를 기다리는 쪽이 끝없이 기다리지 않게.
+        """
+        with self._cond:
+            self._closed = True
+            cancelled = [job for job in self._pending if self._futures[id(job)].cancel()]
+            for job in cancelled:
+                self._pending.remove(job)
+                del self._futures[id(job)]
+            self._cond.notify_all()
+        for job in cancelled:
+            ok, message = _finish_post_job(job, PostProcessCancelled())
+            self.job_finished.emit(job.key, ok, message, [])
+        if cancelled:
+            self._emit_depth()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,193 @@
+import io
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+# 작업 프로파일링 (기본 꺼짐) - 작업별로 JobConfig.profile, 전체는 환경 변수 SEGMENTGRABBER_PROFILE
+#   SEGMENTGRABBER_PROFILE=1       → 모든 작업을 기본 폴더에 기록
+#   SEGMENTGRABBER_PROFILE=/경로   → 모든 작업을 그 폴더에 기록
+# cProfile/pstats/tracemalloc 는 켰을 때만 불러온다.
+PROFILE_ENV = "SEGMENTGRABBER_PROFILE"
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".segmentgrabber", "profiles")
+TRACEMALLOC_FRAMES = 5  # 할당 위치마다 남길 호출 스택 깊이 (스냅샷 파일에서 traceback 으로 볼 수 있음)
+REPORT_LINES = 40       # .cpu.txt / .mem.txt 에 남길 항목 수
+# 스레드마다 따로 재는 3.11 까지는 스레드 CPU 시간으로 잼 (대기 시간이 상위를 차지하지 않게).
+# 3.12+ 는 프로파일러 하나가 모든 스레드를 재므로 스레드별 시계를 쓸 수 없어 경과 시간.
+CPU_TIMER = time.thread_time if sys.version_info < (3, 12) else None
+
+_global_dir: Optional[str] = None
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+_tracemalloc_lock = threading.Lock()
+
+
+def enable_globally(directory: Optional[str] = None):
+    """이후 시작하는 모든 작업을 프로파일링 (None 이면 끔, 환경 변수는 그대로)"""
+    global _global_dir
+    _global_dir = directory
+
+
+def global_profile_dir() -> Optional[str]:
+    """전체 프로파일링이 켜져 있으면 기록 폴더 (enable_globally 가 환경 변수보다 우선)"""
+    if _global_dir:
+        return _global_dir
+    value = os.environ.get(PROFILE_ENV, "").strip()
+    if not value or value.lower() in ("0", "false", "no", "off"):
+        return None
+    return DEFAULT_PROFILE_DIR if value.lower() in ("1", "true", "yes", "on") else value
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    import tracemalloc
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            _tracemalloc_owned = True  # PYTHONTRACEMALLOC 등으로 이미 켜져 있었으면 끄지 않음
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    import tracemalloc
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)  # macOS 는 바이트, Linux 는 KB
+
+
+class JobProfiler:
+    """작업 하나의 CPU(cProfile)·메모리(tracemalloc) 프로파일
+
+    - start() 를 부른 스레드(작업 스레드)와, thread_started 를 initializer 로 넘긴 스레드 풀
+      (세그먼트/프로브 요청 스레드)을 각각 cProfile 로 재고 stop() 에서 합친다
+    - tracemalloc 스냅샷은 시작과 끝에 한 번씩 (프로세스 전역이라 다른 작업 할당도 섞일 수 있음)
+    - stop() 은 directory 에 <이름>.prof(pstats), .cpu.txt, .mem.txt, .start/.end.tracemalloc 를
+      쓰고 상태 메시지용 요약 줄을 돌려준다
+    """
+
+    def __init__(self, name: str, directory: str, top: int = 5):
+        self.name = name
+        self.directory = directory
+        self.top = top
+        self._lock = threading.Lock()
+        self._profiles = []
+        self._start_snapshot = None
+        self._t0 = 0.0
+        self._rss_start: Optional[float] = None
+
+    @property
+    def path_prefix(self) -> str:
+        return os.path.join(self.directory, self.name)
+
+    def start(self):
+        import tracemalloc
+
+        _start_tracemalloc()
+        self._start_snapshot = tracemalloc.take_snapshot()
+        self._rss_start = _peak_rss_mb()
+        self._t0 = time.perf_counter()
+        self.thread_started()
+
+    def thread_started(self):
+        """이 스레드도 측정 (ThreadPoolExecutor(initializer=...) 로 넘김)"""
+        import cProfile
+        profile = cProfile.Profile(CPU_TIMER) if CPU_TIMER else cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ 는 프로파일러가 프로세스에 하나뿐 (켜져 있는 것이 모든 스레드를 잼)
+            return
+        with self._lock:
+            self._profiles.append(profile)
+
+    def stop(self) -> List[str]:
+        """측정 종료 → 파일 기록, 요약 줄 반환 (start() 한 스레드에서 호출)"""
+        import pstats
+        import tracemalloc
+
+        elapsed = time.perf_counter() - self._t0
+        with self._lock:
+            profiles, self._profiles = self._profiles, []
+        # 이 스레드 것을 끄고, 풀 스레드는 작업이 풀을 닫으며 이미 끝남
+        for profile in profiles:
+            profile.disable()
+        end_snapshot = tracemalloc.take_snapshot()
+        _stop_tracemalloc()
+        rss_end = _peak_rss_mb()
+
+        os.makedirs(self.directory, exist_ok=True)
+        prefix = self.path_prefix
+        stats = None
+        if profiles:
+            stats = pstats.Stats(*profiles)
+            stats.dump_stats(prefix + ".prof")
+            cpu_text = io.StringIO()
+            stats.stream = cpu_text
+            clock = "스레드 CPU 시간" if CPU_TIMER else "경과 시간"
+            cpu_text.write(f"# {self.name}: {elapsed:.2f}초, 스레드 {len(profiles)}개, 측정 기준 {clock}\n\n")
+            stats.sort_stats("tottime").print_stats(REPORT_LINES)
+            stats.sort_stats("cumulative").print_stats(REPORT_LINES)
+            with open(prefix + ".cpu.txt", "w", encoding="utf-8") as f:
+                f.write(cpu_text.getvalue())
+
+        snapshot_filter = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        start_snapshot = self._start_snapshot.filter_traces(snapshot_filter)
+        end_snapshot = end_snapshot.filter_traces(snapshot_filter)
+        start_snapshot.dump(prefix + ".start.tracemalloc")
+        end_snapshot.dump(prefix + ".end.tracemalloc")
+        growth = end_snapshot.compare_to(start_snapshot, "lineno")
+        with open(prefix + ".mem.txt", "w", encoding="utf-8") as f:
+            f.write(f"# {self.name}: 최대 RSS {_fmt_mb(self._rss_start)} → {_fmt_mb(rss_end)}\n")
+            f.write("# 시작 대비 증가량 (파일:줄) - 전체 호출 스택은 .end.tracemalloc 를 "
+                    "tracemalloc.Snapshot.load 로 열어 traceback 통계로 확인\n\n")
+            for stat in growth[:REPORT_LINES]:
+                f.write(f"{stat}\n")
+        self._start_snapshot = None
+
+        return [
+            f"프로파일 CPU 상위 (자체 시간): {self._top_functions(stats)}" if stats is not None
+            else "프로파일 CPU: 다른 작업의 프로파일러가 실행 중이라 생략",
+            f"프로파일 메모리 증가 상위: {self._top_growth(growth)} / 최대 RSS {_fmt_mb(rss_end)}",
+            f"프로파일 저장: {prefix}.*",
+        ]
+
+    def _top_functions(self, stats) -> str:
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        return ", ".join(f"{name} ({os.path.basename(path)}:{line}) {tt:.2f}s"
+                         for (path, line, name), (_, _, tt, _, _) in rows) or "-"
+
+    def _top_growth(self, growth) -> str:
+        rows = [s for s in growth if s.size_diff > 0][:self.top]
+        return ", ".join(f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno} "
+                         f"+{s.size_diff / (1024 * 1024):.1f} MB" for s in rows) or "-"
+
+
+def _fmt_mb(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.0f} MB"
+
+
+def start_job_profiler(name: str, enabled: bool = False, directory: Optional[str] = None) -> Optional[JobProfiler]:
+    """작업 설정(enabled, directory) 또는 전체 설정으로 켜져 있으면 프로파일러를 시작해서 반환"""
+    global_dir = global_profile_dir()
+    if not enabled and global_dir is None:
+        return None
+    stem = re.sub(r"[^\w.-]+", "_", os.path.splitext(name)[0])[:60] or "job"
+    profiler = JobProfiler(f"{time.strftime('%Y%m%d-%H%M%S')}_{stem}_{uuid.uuid4().hex[:6]}",
+                           directory or global_dir or DEFAULT_PROFILE_DIR)
+    profiler.start()
+    return profiler
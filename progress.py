@@ -0,0 +1,289 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, Optional
+
+from events import Signal
+
+# 진행 이벤트 - 작업 스레드에서 EWMA 속도/남은 시간까지 계산하고 일정 간격으로만 내보낸다.
+# 세그먼트 크기나 yt-dlp 콜백 빈도와 상관없이 작업당 초당 1/interval 번 이하,
+# ProgressBus 를 거치면 작업 수와도 상관없이 tick 마다 한 번.
+
+DEFAULT_INTERVAL = 0.25  # 작업당 이벤트 최소 간격 (초)
+SPEED_TIME_CONSTANT = 5.0  # EWMA 속도 시정수 (초) - 클수록 완만
+
+
+class Phase(Enum):
+    RESOLVE = "resolve"    # 페이지 URL → 세그먼트 URL 추출
+    PROBE = "probe"        # 시작/끝 번호 탐지
+    DOWNLOAD = "download"  # 받는 중
+    FINALIZE = "finalize"  # 받기 끝, MP4 마무리 (스트리밍 변환·대기열 없는 변환)
+    DONE = "done"          # 받기 끝 (이후 후처리는 후처리 대기열이 알림)
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """작업 진행 상태 한 장면 (속도·남은 시간은 작업 스레드에서 계산)"""
+    phase: Phase
+    bytes_done: int = 0
+    bytes_total: Optional[int] = None      # 전체 바이트 (세그먼트 작업은 평균 크기로 추정)
+    total_estimated: bool = False          # bytes_total 이 추정값인지
+    segment: Optional[int] = None          # 마지막으로 기록한 세그먼트 번호
+    segments_done: int = 0
+    range_start: Optional[int] = None      # 세그먼트 범위 (탐지/목록/캐시/저널에서)
+    range_end: Optional[int] = None
+    range_skipped: int = 0                 # 범위 안에서 목록에 없어 건너뛰는 번호 수
+    speed: float = 0.0                     # EWMA 속도 (bytes/s)
+    eta: Optional[float] = None            # 남은 시간 (초) - 전체를 모르면 None
+    elapsed: float = 0.0                   # 받기 시작부터 (초)
+
+    @property
+    def segments_total(self) -> Optional[int]:
+        if self.range_start is None or self.range_end is None:
+            return None
+        return self.range_end - self.range_start + 1 - self.range_skipped
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """0~1 (모르면 None) - 세그먼트 범위가 있으면 세그먼트 수 기준"""
+        total = self.segments_total
+        if total:
+            return min(1.0, self.segments_done / total)
+        if self.bytes_total:
+            return min(1.0, self.bytes_done / self.bytes_total)
+        return None
+
+    def to_dict(self) -> dict:
+        """JSON 용 (CLI NDJSON 등)"""
+        return {
+            "phase": self.phase.value,
+            "bytes": self.bytes_done,
+            "total_bytes": self.bytes_total,
+            "total_estimated": self.total_estimated,
+            "segment": self.segment,
+            "segments_done": self.segments_done,
+            "segments_total": self.segments_total,
+            "range": [self.range_start, self.range_end] if self.range_start is not None else None,
+            "speed": round(self.speed),
+            "eta": round(self.eta, 1) if self.eta is not None else None,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None or math.isinf(seconds):
+        return "-"
+    seconds = int(seconds + 0.5)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def format_progress(event: ProgressEvent) -> str:
+    """표시용 한 줄 - '45% (90/200) · 12.3 MB/s · 남은 0:42'"""
+    if event.phase == Phase.RESOLVE:
+        return "URL 추출 중…"
+    if event.phase == Phase.PROBE:
+        return "세그먼트 범위 탐지 중…"
+    parts = []
+    fraction = event.fraction
+    total = event.segments_total
+    if fraction is not None:
+        count = f"{event.segments_done}/{total}" if total else \
+            f"{event.bytes_done / (1024 * 1024):.1f}/{event.bytes_total / (1024 * 1024):.1f} MB"
+        parts.append(f"{int(fraction * 100)}% ({count})")
+    elif event.segment is not None:
+        parts.append(f"{event.segment} seg, {event.bytes_done / (1024 * 1024):.1f} MB")
+    else:
+        parts.append(f"{event.bytes_done / (1024 * 1024):.1f} MB")
+    if event.phase == Phase.FINALIZE:
+        parts.append("마무리 중")
+    elif event.speed > 0:
+        parts.append(f"{event.speed / (1024 * 1024):.1f} MB/s")
+        if event.eta is not None:
+            parts.append(f"남은 {format_eta(event.eta)}")
+    return " · ".join(parts)
+
+
+class ProgressTracker:
+    """작업 하나의 진행 상태 - 작업 스레드(와 요청 스레드)에서 갱신, interval 마다 한 번만 emit
+
+    세그먼트 작업: set_range() 후 add(크기, 번호) / yt-dlp: update(받은 바이트, 전체 바이트)
+    단계가 바뀌거나 finish() 하면 간격과 상관없이 바로 내보낸다 (마지막 상태는 항상 전달).
+    set_phase() 는 같은 단계면 아무것도 안 하므로 매 콜백에서 불러도 된다.
+    여러 스레드가 동시에 내보내도 장면 순번으로 옛 장면이 새 장면 뒤에 나가지 않게 한다.
+    """
+
+    def __init__(self, emit: Callable[[ProgressEvent], None], interval: float = DEFAULT_INTERVAL,
+                 time_constant: float = SPEED_TIME_CONSTANT):
+        self._emit = emit
+        self.interval = interval
+        self.time_constant = time_constant
+        self._lock = threading.Lock()
+        self._phase: Optional[Phase] = None  # 첫 set_phase 전에는 이벤트 없음
+        self._bytes = 0
+        self._bytes_total: Optional[int] = None
+        self._segment: Optional[int] = None
+        self._segments = 0
+        self._range_start: Optional[int] = None
+        self._range_end: Optional[int] = None
+        self._range_skipped = 0
+        self._t_start: Optional[float] = None  # 첫 바이트 시각
+        self._speed = 0.0
+        self._sample_t = 0.0      # 마지막 속도 표본 시각/바이트
+        self._sample_bytes = 0
+        self._last_emit = 0.0
+        self._seq = 0               # 장면 순번 (_lock 안에서 증가)
+        self._emitted_seq = 0       # 마지막으로 내보낸 장면 순번
+        self._emit_lock = threading.Lock()  # 내보내기 순서용 - 갱신(_lock)은 막지 않음
+
+    # ---------- 갱신 (작업 스레드) ----------
+    def set_phase(self, phase: Phase):
+        with self._lock:
+            if phase == self._phase:
+                return
+            self._phase = phase
+        self._flush(force=True)
+
+    def set_range(self, start: Optional[int], end: Optional[int], skipped: int = 0):
+        """세그먼트 범위와 그중 건너뛸 번호 수 (다음 이벤트부터 실림 - 보통 바로 set_phase(DOWNLOAD))"""
+        with self._lock:
+            self._range_start, self._range_end = start, end
+            self._range_skipped = skipped
+
+    def resume(self, bytes_done: int, segments_done: int):
+        """이어받기 - 이미 받은 양 (속도 계산에서는 제외)"""
+        with self._lock:
+            self._bytes = self._sample_bytes = bytes_done
+            self._segments = segments_done
+
+    def add(self, nbytes: int, segment: Optional[int] = None):
+        """세그먼트 하나 기록"""
+        now = time.monotonic()
+        with self._lock:
+            self._start_clock(now)
+            self._bytes += nbytes
+            self._segments += 1
+            if segment is not None:
+                self._segment = segment
+        self._flush(now=now)
+
+    def update(self, bytes_done: int, bytes_total: Optional[int] = None):
+        """누적 바이트로 갱신 (yt-dlp 훅)"""
+        now = time.monotonic()
+        with self._lock:
+            self._start_clock(now)
+            self._bytes = bytes_done
+            self._bytes_total = bytes_total or None
+        self._flush(now=now)
+
+    def finish(self, phase: Phase = Phase.DONE):
+        with self._lock:
+            self._phase = phase
+        self._flush(force=True)
+
+    # ---------- 계산 ----------
+    def _start_clock(self, now: float):
+        if self._t_start is None:
+            self._t_start = self._sample_t = now
+
+    def _update_speed(self, now: float):
+        """마지막 표본 이후 평균 속도를 시간 가중 EWMA 로 반영 (간격이 들쭉날쭉해도 시정수 유지)"""
+        dt = now - self._sample_t
+        if dt <= 0:
+            return
+        rate = max(0, self._bytes - self._sample_bytes) / dt  # yt-dlp 는 조각이 바뀌며 줄어들 수 있음
+        if self._speed == 0.0:
+            self._speed = rate
+        else:
+            alpha = 1.0 - math.exp(-dt / self.time_constant)
+            self._speed += alpha * (rate - self._speed)
+        self._sample_t = now
+        self._sample_bytes = self._bytes
+
+    def _snapshot(self, now: float) -> ProgressEvent:
+        total = self._bytes_total
+        estimated = False
+        if total is None and self._range_start is not None and self._range_end is not None and self._segments:
+            # 세그먼트 작업은 지금까지의 평균 세그먼트 크기로 전체를 추정
+            count = self._range_end - self._range_start + 1 - self._range_skipped
+            total = int(self._bytes / self._segments * count)
+            estimated = True
+        eta = None
+        if total is not None and self._speed > 0:
+            eta = max(0.0, total - self._bytes) / self._speed
+        return ProgressEvent(
+            phase=self._phase,
+            bytes_done=self._bytes,
+            bytes_total=total,
+            total_estimated=estimated,
+            segment=self._segment,
+            segments_done=self._segments,
+            range_start=self._range_start,
+            range_end=self._range_end,
+            range_skipped=self._range_skipped,
+            speed=self._speed,
+            eta=eta,
+            elapsed=now - self._t_start if self._t_start is not None else 0.0,
+        )
+
+    def _flush(self, force: bool = False, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._phase is None or (not force and now - self._last_emit < self.interval):
+                return
+            self._last_emit = now
+            if self._t_start is not None:
+                self._update_speed(now)
+            event = self._snapshot(now)
+            self._seq += 1
+            seq = self._seq
+        with self._emit_lock:
+            if seq < self._emitted_seq:
+                return  # 다른 스레드가 더 새 장면을 먼저 내보냄 - 옛 장면은 버림
+            self._emitted_seq = seq
+            self._emit(event)
+
+
+class ProgressBus:
+    """여러 작업의 최신 진행 이벤트를 모아 interval 마다 한 번에 내보냄 (작업 수와 상관없이 일정한 빈도)
+
+    publish() 는 작업 스레드에서 덮어쓰기만 하고, 내보내기는 전용 스레드가 한다.
+    updated 시그널: {작업 키: ProgressEvent} (그 사이 바뀐 작업만)
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.updated = Signal()
+        self._latest: Dict[object, ProgressEvent] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, key, event: ProgressEvent):
+        with self._lock:
+            self._latest[key] = event
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._loop, name="progress-bus", daemon=True)
+                self._thread.start()
+
+    def flush(self):
+        with self._lock:
+            batch, self._latest = self._latest, {}
+        if batch:
+            self.updated.emit(batch)
+
+    def _loop(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self.flush()
+
+    def shutdown(self):
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.flush()
@@ -0,0 +1,176 @@
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 세부 제한 규칙: "cdn.example.com=512" (호스트별) / "09:00-18:00=1024" (시간대별 전체), 단위 KB/s
+_TIME_RULE_RE = re.compile(r'^(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})$')
+
+
+class TokenBucket:
+    """바이트 단위 토큰 버킷 (rate=0 이면 무제한)
+
+    토큰이 음수(빚)까지 내려갈 수 있게 해서, 큰 청크도 한 번에 통과시키고
+    그만큼 다음 요청을 기다리게 한다. 청크마다 호출하므로 속도가 고르게 유지된다.
+    """
+
+    def __init__(self, rate: float = 0.0, burst: Optional[float] = None):
+        self._lock = threading.Lock()
+        self.rate = 0.0
+        self.burst = 0.0
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self.set_rate(rate, burst)
+
+    def set_rate(self, rate: float, burst: Optional[float] = None):
+        """실행 중 변경 가능"""
+        with self._lock:
+            self._refill()
+            self.rate = max(0.0, float(rate))
+            # 기본 버스트: 0.5초 분량 (최소 64KB)
+            self.burst = burst if burst is not None else max(self.rate * 0.5, 64 * 1024)
+            self._tokens = min(self._tokens, self.burst)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def reserve(self, nbytes: int) -> float:
+        """nbytes 만큼 토큰을 쓰고, 보내기 전에 기다려야 할 시간(초) 반환"""
+        with self._lock:
+            if self.rate <= 0:
+                return 0.0
+            self._refill()
+            self._tokens -= nbytes
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+@dataclass
+class ScheduleRule:
+    """시간대별 전체 속도 제한 (분 단위, end < start 이면 자정을 넘는 구간)"""
+    start_minute: int
+    end_minute: int
+    rate: float  # bytes/s (0=무제한)
+
+    def active(self, minute_of_day: int) -> bool:
+        if self.start_minute <= self.end_minute:
+            return self.start_minute <= minute_of_day < self.end_minute
+        return minute_of_day >= self.start_minute or minute_of_day < self.end_minute
+
+
+def _valid_time(hour: int, minute: int) -> bool:
+    """00:00~23:59, 끝 시각으로 24:00 도 허용"""
+    return minute <= 59 and (hour < 24 or (hour == 24 and minute == 0))
+
+
+def parse_limit_rules(text: str) -> Tuple[Dict[str, float], List[ScheduleRule]]:
+    """'cdn.example.com=512, 09:00-18:00=1024' → (호스트별 bytes/s, 시간대 규칙)"""
+    host_rates: Dict[str, float] = {}
+    schedule: List[ScheduleRule] = []
+    for part in re.split(r'[,\n;]', text or ""):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" not in part:
+            raise ValueError(f"'{part}': '대상=KB/s' 형식이어야 합니다")
+        target, value = (x.strip() for x in part.rsplit("=", 1))
+        try:
+            rate = float(value) * 1024
+        except ValueError:
+            raise ValueError(f"'{part}': 속도는 숫자(KB/s)여야 합니다")
+        if not rate >= 0 or rate == float("inf"):
+            raise ValueError(f"'{part}': 속도는 0 이상이어야 합니다 (0=무제한)")
+        m = _TIME_RULE_RE.match(target)
+        if m:
+            h1, m1, h2, m2 = (int(x) for x in m.groups())
+            if not (_valid_time(h1, m1) and _valid_time(h2, m2)):
+                raise ValueError(f"'{part}': 잘못된 시각 (00:00~24:00)")
+            schedule.append(ScheduleRule(h1 * 60 + m1, h2 * 60 + m2, rate))
+        elif target:
+            host_rates[target.lower()] = rate
+        else:
+            raise ValueError(f"'{part}': 대상이 비어있습니다")
+    return host_rates, schedule
+
+
+class BandwidthLimiter:
+    """모든 워커가 공유하는 대역폭 제한기 (전체 + 호스트별 + 시간대별)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._global = TokenBucket()
+        self._global_rate = 0.0          # 시간대 규칙이 없을 때의 전체 제한
+        self._hosts: Dict[str, TokenBucket] = {}
+        self._schedule: List[ScheduleRule] = []
+        self._applied_rate: Optional[float] = None
+
+    def set_global_rate(self, rate: float):
+        """전체 제한 (bytes/s, 0=무제한)"""
+        with self._lock:
+            self._global_rate = max(0.0, float(rate))
+            self._applied_rate = None  # 다음 consume 에서 다시 적용
+
+    def set_host_rates(self, rates: Dict[str, float]):
+        """호스트별 제한 교체 (목록에 없는 호스트는 무제한)"""
+        with self._lock:
+            for host in list(self._hosts):
+                if host not in rates:
+                    del self._hosts[host]
+            for host, rate in rates.items():
+                bucket = self._hosts.get(host)
+                if bucket is None:
+                    self._hosts[host] = TokenBucket(rate)
+                else:
+                    bucket.set_rate(rate)
+
+    def set_schedule(self, rules: List[ScheduleRule]):
+        """시간대 규칙 교체 - 해당 시간에는 전체 제한 대신 규칙의 속도 사용"""
+        with self._lock:
+            self._schedule = list(rules)
+            self._applied_rate = None
+
+    def current_global_rate(self) -> float:
+        """지금 시각에 적용되는 전체 제한"""
+        t = time.localtime()
+        minute = t.tm_hour * 60 + t.tm_min
+        for rule in self._schedule:
+            if rule.active(minute):
+                return rule.rate
+        return self._global_rate
+
+    def consume(self, host: str, nbytes: int, should_stop: Optional[Callable[[], bool]] = None):
+        """청크 nbytes 를 받았음을 알리고, 제한을 넘었으면 그만큼 대기"""
+        if nbytes <= 0:
+            return
+        with self._lock:
+            rate = self.current_global_rate()
+            if rate != self._applied_rate:
+                self._global.set_rate(rate)
+                self._applied_rate = rate
+            host_bucket = self._hosts.get((host or "").lower())
+        wait = self._global.reserve(nbytes)
+        if host_bucket is not None:
+            wait = max(wait, host_bucket.reserve(nbytes))
+        # 중지 요청에 빨리 반응하도록 잘게 나눠 대기
+        deadline = time.monotonic() + wait
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (should_stop and should_stop()):
+                return
+            time.sleep(min(remaining, 0.1))
+
+
+_limiter: Optional[BandwidthLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> BandwidthLimiter:
+    """프로세스 전역 대역폭 제한기"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = BandwidthLimiter()
+        return _limiter
@@ -0,0 +1,222 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from journal import SegmentJournal
+from tsmux import TsMuxError, TsToMp4Remuxer
+
+REMUXER_AUTO = "auto"        # ffmpeg 가 있으면 ffmpeg, 없으면 내장 변환기
+REMUXER_FFMPEG = "ffmpeg"
+REMUXER_BUILTIN = "builtin"  # tsmux (H.264/AAC → fragmented MP4)
+
+
+def ffmpeg_available() -> bool:
+    """PATH 에 ffmpeg 가 있는지"""
+    return shutil.which("ffmpeg") is not None
+
+
+def choose_remuxer(preference: str) -> str:
+    """설정값(auto/ffmpeg/builtin) → 실제로 쓸 변환기"""
+    if preference == REMUXER_AUTO:
+        return REMUXER_FFMPEG if ffmpeg_available() else REMUXER_BUILTIN
+    return preference
+
+
+class TsFileSink:
+    """세그먼트를 병합 .ts 파일에 이어쓰고 저널에 커밋 (이어받기 가능, 끝난 뒤 별도 변환)"""
+
+    streaming = False
+
+    def __init__(self, path: str, journal: SegmentJournal):
+        self.path = path
+        self._journal = journal
+        self._f = open(path, "ab")
+
+    def write(self, data):
+        self._f.write(data)
+
+    def commit(self, seg: int, offset: int):
+        self._journal.commit(seg, offset, self._f)
+
+    def rewind(self, seg: int, offset: int) -> bool:
+        """이미 쓴 뒤쪽을 잘라냄 (나중에 플레이스홀더로 밝혀진 세그먼트 제거)
+        seg: 잘라낸 뒤 마지막으로 남는 세그먼트 번호 → 저널에 다시 기록 (마지막 줄이 유효)"""
+        self._journal.sync(self._f)
+        self._f.flush()
+        self._f.truncate(offset)
+        self._journal.commit(seg, offset, self._f)
+        self._journal.sync(self._f)
+        return True
+
+    def close(self):
+        """기록한 만큼 저널에 확정하고 파일을 닫음 (중단/오류 때도 호출)"""
+        try:
+            self._journal.sync(self._f)
+        finally:
+            self._f.close()
+
+
+class FfmpegPipeSink:
+    """세그먼트를 ffmpeg stdin 으로 바로 넘겨 다운로드와 동시에 MP4 로 변환
+
+    중간 .ts 파일이 없으므로 디스크 쓰기와 공간이 절반이 되고, 마지막 세그먼트 뒤에는
+    ffmpeg 가 MP4 를 마무리하는 시간만 남는다. 대신 저널이 없어 이어받기는 안 된다.
+    """
+
+    streaming = True
+
+    def __init__(self, out_path: str):
+        self.out_path = out_path
+        self._stderr_tail = deque(maxlen=20)  # 오류 메시지용 마지막 출력
+        self.started_at = time.monotonic()
+        self.input_closed_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._proc = subprocess.Popen(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "mpegts", "-i", "pipe:0", "-c", "copy", out_path],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        # stderr 를 읽어주지 않으면 파이프가 차서 ffmpeg 가 멈출 수 있음
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+
+    def _drain_stderr(self):
+        for line in self._proc.stderr:
+            self._stderr_tail.append(line.decode("utf-8", "replace").rstrip())
+
+    def error_text(self) -> str:
+        return " / ".join(self._stderr_tail) or f"종료 코드 {self._proc.returncode}"
+
+    def write(self, data):
+        try:
+            self._proc.stdin.write(data)
+        except (BrokenPipeError, OSError):
+            self._proc.wait()
+            self._stderr_thread.join(timeout=1)
+            raise RuntimeError(f"ffmpeg 가 입력 도중 종료됨: {self.error_text()}")
+
+    def commit(self, seg: int, offset: int):
+        pass  # 저널 없음
+
+    def rewind(self, seg: int, offset: int) -> bool:
+        return False  # 이미 변환기로 넘어간 데이터는 되돌릴 수 없음
+
+    def close(self):
+        """입력 끝(EOF) 알림 - 이후 finish() 로 MP4 마무리를 기다림"""
+        if self.input_closed_at is None:
+            self.input_closed_at = time.monotonic()
+            try:
+                self._proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+
+    def finish(self, timeout: Optional[float] = None) -> bool:
+        """ffmpeg 종료까지 대기 - 반환: 성공 여부"""
+        self.close()
+        try:
+            self._proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.abort()
+            return False
+        self._stderr_thread.join(timeout=1)
+        self.finished_at = time.monotonic()
+        return self._proc.returncode == 0
+
+    def abort(self):
+        """중단/오류 - ffmpeg 를 끝내고 만들다 만 출력 파일 삭제"""
+        self.close()
+        if self._proc.poll() is None:
+            self._proc.kill()
+            self._proc.wait()
+        if os.path.exists(self.out_path):
+            try:
+                os.remove(self.out_path)
+            except OSError:
+                pass
+
+    @property
+    def overlap_seconds(self) -> float:
+        """다운로드와 변환이 겹친 시간 (ffmpeg 시작 ~ 마지막 세그먼트 입력)"""
+        end = self.input_closed_at or time.monotonic()
+        return end - self.started_at
+
+    @property
+    def tail_seconds(self) -> float:
+        """마지막 세그먼트 이후 MP4 마무리에 걸린 시간"""
+        if self.input_closed_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.input_closed_at
+
+
+class BuiltinMp4Sink:
+    """세그먼트를 내장 변환기(tsmux)로 바로 fragmented MP4 로 씀 (ffmpeg 불필요)
+
+    FfmpegPipeSink 와 같은 인터페이스. 변환이 다운로드 스레드에서 일어나므로
+    마지막 세그먼트 뒤에는 남은 조각 하나만 쓰면 끝난다.
+    """
+
+    streaming = True
+
+    def __init__(self, out_path: str):
+        self.out_path = out_path
+        self.started_at = time.monotonic()
+        self.input_closed_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._error: Optional[Exception] = None
+        self._f = open(out_path, "wb")
+        self._remuxer = TsToMp4Remuxer(self._f)
+
+    def error_text(self) -> str:
+        return str(self._error) if self._error else "알 수 없는 오류"
+
+    def write(self, data):
+        try:
+            self._remuxer.feed(data)
+        except (TsMuxError, IndexError, ValueError) as e:
+            raise RuntimeError(f"내장 MP4 변환 실패: {e}")
+
+    def commit(self, seg: int, offset: int):
+        pass  # 저널 없음
+
+    def rewind(self, seg: int, offset: int) -> bool:
+        return False  # 이미 변환기로 넘어간 데이터는 되돌릴 수 없음
+
+    def close(self):
+        if self.input_closed_at is None:
+            self.input_closed_at = time.monotonic()
+
+    def finish(self, timeout: Optional[float] = None) -> bool:
+        self.close()
+        try:
+            self._remuxer.close()
+        except (TsMuxError, IndexError, ValueError) as e:
+            self._error = e
+            return False
+        finally:
+            self._f.close()
+        self.finished_at = time.monotonic()
+        return True
+
+    def abort(self):
+        self.close()
+        if not self._f.closed:
+            self._f.close()
+        if os.path.exists(self.out_path):
+            try:
+                os.remove(self.out_path)
+            except OSError:
+                pass
+
+    @property
+    def overlap_seconds(self) -> float:
+        end = self.input_closed_at or time.monotonic()
+        return end - self.started_at
+
+    @property
+    def tail_seconds(self) -> float:
+        if self.input_closed_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.input_closed_at
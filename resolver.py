@@ -0,0 +1,404 @@
+import atexit
+import html
+import importlib.util
+import json
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import requests
+
+from models import ResolvedSource
+from transport import get_transport
+
+# 네트워크 요청 / 페이지 소스에서 세그먼트 베이스 URL을 찾는 패턴
+SEGMENT_REQUEST_RE = re.compile(r'(https?://[^/]+/[A-Za-z0-9]+/)(?:segment_\d+\.jpg|items\d*\.shtml)')
+ITEMS_SOURCE_RE = re.compile(r'(https?://[^/]+/[A-Za-z0-9]+/)items\d*\.shtml')
+# 플레이어가 iframe 안에 있는 경우 따라갈 src
+IFRAME_SRC_RE = re.compile(r'<iframe[^>]+src=["\']([^"\']+)["\']', re.IGNORECASE)
+
+
+def is_yasya_page_url(url: str) -> bool:
+    """세그먼트 폴더가 아니라 yasyadong 페이지 URL인지"""
+    return 'yasyadong' in url and ('_Action=items' in url or 'items_id' in url)
+
+
+def _source_from_match(m) -> ResolvedSource:
+    """패턴 매치 결과 → ResolvedSource (items*.shtml 이면 목록 URL도 보관)"""
+    url = m.group(0)
+    return ResolvedSource(m.group(1), url if url.endswith('.shtml') else None)
+
+
+def find_source_in_html(text: str) -> Optional[ResolvedSource]:
+    """페이지 소스(인라인 플레이어 설정 포함)에서 세그먼트 위치 찾기"""
+    # JSON 으로 들어있는 플레이어 설정은 '/' 가 '\/' 나 '\u002F' 로 이스케이프되어 있음
+    text = text.replace('\\/', '/').replace('\\u002F', '/').replace('\\u002f', '/')
+    text = html.unescape(text)
+    for pattern in (ITEMS_SOURCE_RE, SEGMENT_REQUEST_RE):
+        m = pattern.search(text)
+        if m:
+            return _source_from_match(m)
+    return None
+
+
+def resolve_via_http(session: requests.Session, page_url: str, headers: Optional[dict] = None,
+                     timeout: float = 10.0, max_iframes: int = 2) -> Optional[ResolvedSource]:
+    """브라우저 없이 페이지를 받아서 세그먼트 위치 추출 (iframe 은 max_iframes 개까지 따라감)
+    timeout 은 페이지와 iframe 요청을 합친 시간 (iframe 은 남은 시간만큼만)
+    반환: 찾은 위치, 못 찾으면 None
+    """
+    deadline = time.monotonic() + timeout
+    r = session.get(page_url, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    source = find_source_in_html(r.text)
+    if source:
+        return source
+    for src in IFRAME_SRC_RE.findall(r.text)[:max_iframes]:
+        frame_url = urljoin(page_url, html.unescape(src))
+        if not frame_url.startswith(("http://", "https://")):
+            continue
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            fr = session.get(frame_url, headers=dict(headers or {}, Referer=page_url), timeout=remaining)
+            fr.raise_for_status()
+        except requests.RequestException:
+            continue
+        source = find_source_in_html(fr.text)
+        if source:
+            return source
+    return None
+
+
+def _create_driver():
+    """headless Chrome 생성 (undetected_chromedriver 는 필요할 때만 import)"""
+    import undetected_chromedriver as uc
+
+    options = uc.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-gpu')
+    # 세그먼트 요청은 performance 로그를 폴링해서 찾음 (탭별 구분은 _Browser.drain_log).
+    # uc.Chrome(enable_cdp_events=True) + add_cdp_listener('Network.requestWillBeSent', ...) 로
+    # 이벤트를 바로 받는 방법도 있음 - 폴링 간격(기본 0.25초)만큼 빨라지지만 콜백이 별도 스레드에서
+    # 불리므로 탭 구분과 잠금을 그쪽에 맞춰야 함
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    # driver.get 이 로딩 완료까지 막지 않도록 (로그는 직접 확인)
+    options.page_load_strategy = 'none'
+    return uc.Chrome(options=options)
+
+
+def psutil_available() -> bool:
+    """psutil 설치 여부 (불러오지는 않음) - 없으면 브라우저 메모리를 잴 수 없음"""
+    return importlib.util.find_spec("psutil") is not None
+
+
+def _browser_rss_mb(driver) -> Optional[float]:
+    """브라우저 프로세스 트리의 메모리 사용량 (psutil 이 없으면 None)"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    pid = getattr(driver, 'browser_pid', None)
+    if not pid:
+        return None
+    try:
+        proc = psutil.Process(pid)
+        procs = [proc] + proc.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs) / (1024 * 1024)
+    except psutil.Error:
+        return None
+
+
+class _Browser:
+    """풀에 있는 Chrome 인스턴스 하나
+
+    WebDriver 는 스레드 안전하지 않으므로 드라이버 호출은 lock 안에서만 한다.
+    performance 로그는 브라우저 전체에서 한 번에 비워지므로, 읽은 쪽이 탭(webview)별로
+    나눠서 found 에 넣어두고 각 탭은 자기 몫을 확인한다.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.lock = threading.Lock()
+        self.main_handle = driver.current_window_handle
+        self.uses = 0            # 처리한 페이지 수 (재활용 기준)
+        self.tabs = 0            # 현재 열려 있는 작업 탭 수
+        self.retired = False     # True 면 새 작업을 받지 않고, 탭이 다 닫히면 종료
+        self.found: Dict[str, ResolvedSource] = {}  # 탭 핸들 → 발견한 세그먼트 위치
+
+    def drain_log(self, handles: List[str]):
+        """로그를 읽어서 탭별 발견 결과 갱신 (lock 안에서 호출)"""
+        for entry in self.driver.get_log('performance'):
+            try:
+                data = json.loads(entry['message'])
+                msg = data['message']
+                if msg['method'] != 'Network.requestWillBeSent':
+                    continue
+                m = SEGMENT_REQUEST_RE.match(msg['params']['request']['url'])
+                if not m:
+                    continue
+                owner = data.get('webview')
+                if owner is None and len(handles) == 1:
+                    owner = handles[0]  # 탭이 하나뿐이면 주인이 분명함
+                if owner in handles:
+                    self.found.setdefault(owner, _source_from_match(m))
+            except Exception:
+                pass
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class ResolverService:
+    """페이지 URL → 세그먼트 베이스 URL 추출 서비스 (Chrome 풀)
+
+    - 최대 max_browsers 개의 headless Chrome 을 띄워 두고 재사용
+    - 브라우저 하나에서 최대 tabs_per_browser 개 페이지를 각각 새 탭으로 동시에 처리
+    - max_uses 번 사용했거나 메모리가 max_rss_mb 를 넘은 브라우저는 교체
+      (psutil 이 없어 메모리를 못 재면 fallback_max_uses 번마다 교체하고 처음 한 번 알림)
+    """
+
+    def __init__(self, max_browsers: int = 2, tabs_per_browser: int = 4,
+                 max_uses: int = 50, max_rss_mb: float = 1500.0, fallback_max_uses: int = 20):
+        self.max_browsers = max_browsers
+        self.tabs_per_browser = tabs_per_browser
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.fallback_max_uses = fallback_max_uses
+        self.rss_supported = psutil_available()
+        self._rss_warned = False
+        self._browsers: List[_Browser] = []
+        self._starting = 0       # 생성 중인 브라우저 수
+        self._cond = threading.Condition()
+        self._closed = False
+        self.launched = 0        # 지금까지 띄운 브라우저 수 (통계)
+        # 어느 경로로 추출에 성공했는지 (HTTP 빠른 경로 / 브라우저 / 실패)
+        self.stats = {"http": 0, "browser": 0, "failed": 0}
+
+    # ---------- 브라우저 대여/반납 ----------
+    def _checkout(self, deadline: float) -> _Browser:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("URL 추출 서비스가 종료되었습니다")
+                live = [b for b in self._browsers if not b.retired and b.tabs < self.tabs_per_browser]
+                if live:
+                    browser = min(live, key=lambda b: b.tabs)
+                    browser.tabs += 1
+                    return browser
+                if len(self._browsers) + self._starting < self.max_browsers:
+                    self._starting += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError("사용 가능한 브라우저가 없습니다 (대기 시간 초과)")
+                self._cond.wait(remaining)
+
+        # 브라우저 기동은 오래 걸리므로 잠금 밖에서
+        try:
+            browser = _Browser(_create_driver())
+        except Exception:
+            with self._cond:
+                self._starting -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._starting -= 1
+            self.launched += 1
+            browser.tabs = 1
+            self._browsers.append(browser)
+            self._cond.notify_all()
+        return browser
+
+    def _checkin(self, browser: _Browser, broken: bool = False):
+        with self._cond:
+            browser.tabs -= 1
+            browser.uses += 1
+            if broken or browser.uses >= self._use_limit():
+                browser.retired = True
+            elif self.max_rss_mb and self.rss_supported:
+                rss = _browser_rss_mb(browser.driver)
+                if rss is not None and rss > self.max_rss_mb:
+                    browser.retired = True
+            to_quit = browser.retired and browser.tabs == 0
+            if to_quit:
+                self._browsers.remove(browser)
+            self._cond.notify_all()
+        if to_quit:
+            browser.quit()
+
+    def _use_limit(self) -> int:
+        """브라우저 하나의 사용 횟수 상한 - 메모리 상한을 잴 수 없으면 더 자주 교체"""
+        if self.max_rss_mb and not self.rss_supported:
+            return min(self.max_uses, self.fallback_max_uses)
+        return self.max_uses
+
+    def _warn_no_rss(self, status_callback):
+        """psutil 이 없어 메모리 기준 교체가 안 된다는 것을 처음 한 번만 알림"""
+        with self._cond:
+            if self._rss_warned or not self.max_rss_mb or self.rss_supported:
+                return
+            self._rss_warned = True
+        if status_callback:
+            status_callback(f"psutil 이 없어 Chrome 메모리 상한({self.max_rss_mb:.0f} MB)을 확인할 수 없습니다 "
+                            f"→ {self._use_limit()}번 사용마다 교체 (pip install psutil)")
+
+    # ---------- 추출 ----------
+    def _record(self, path: str):
+        with self._cond:
+            self.stats[path] += 1
+
+    def stats_text(self) -> str:
+        """추출 경로 통계 문자열 (잡 상태 표시용)"""
+        with self._cond:
+            http, browser, failed = self.stats["http"], self.stats["browser"], self.stats["failed"]
+        total = http + browser + failed
+        rate = f"{http * 100 // total}%" if total else "-"
+        return f"HTTP {http} / 브라우저 {browser} / 실패 {failed} (HTTP 적중률 {rate})"
+
+    def resolve(self, page_url: str, status_callback=None, timeout: float = 20.0,
+                poll_interval: float = 0.25, session: Optional[requests.Session] = None,
+                headers: Optional[dict] = None) -> ResolvedSource:
+        """세그먼트 위치 추출 - 먼저 HTTP 로 페이지 소스만 받아보고, 실패하면 브라우저 사용
+
+        timeout 은 두 경로를 합친 전체 제한 시간 (브라우저는 HTTP 시도 후 남은 시간만 씀)
+        """
+        deadline = time.monotonic() + timeout
+        if status_callback:
+            status_callback("페이지 소스에서 세그먼트 URL 탐색 중 (HTTP)...")
+        try:
+            source = resolve_via_http(session or get_transport().session_for(page_url), page_url, headers,
+                                      timeout=min(timeout, 10.0))
+        except requests.RequestException:
+            source = None
+        if source:
+            self._record("http")
+            return source
+
+        try:
+            source = self._resolve_in_browser(page_url, status_callback, timeout, poll_interval, deadline)
+        except Exception:
+            self._record("failed")
+            raise
+        self._record("browser")
+        return source
+
+    def _resolve_in_browser(self, page_url: str, status_callback=None, timeout: float = 20.0,
+                            poll_interval: float = 0.25, deadline: Optional[float] = None) -> ResolvedSource:
+        """페이지를 새 탭에서 열고 세그먼트/items 요청이 보이는 즉시 위치 반환 (deadline 이 있으면 그때까지)"""
+        t0 = time.monotonic()
+        if deadline is None:
+            deadline = t0 + timeout
+        if t0 >= deadline:
+            raise RuntimeError(f"{timeout:.0f}초 안에 세그먼트 URL을 찾지 못했습니다. 페이지를 확인하세요.")
+        if status_callback:
+            status_callback("Chrome 브라우저로 페이지 로딩 중...")
+        self._warn_no_rss(status_callback)
+
+        browser = self._checkout(deadline)
+        handle = None
+        broken = False
+        try:
+            with browser.lock:
+                driver = browser.driver
+                driver.switch_to.new_window('tab')
+                handle = driver.current_window_handle
+                driver.get(page_url)
+
+            if status_callback:
+                status_callback("네트워크 요청에서 세그먼트 URL 탐색 중...")
+
+            last_source_check = 0.0
+            while True:
+                with browser.lock:
+                    # 1) 네트워크 로그에서 segment / items 요청 찾기
+                    handles = [h for h in browser.driver.window_handles if h != browser.main_handle]
+                    browser.drain_log(handles)
+                    source = browser.found.pop(handle, None)
+                    if source:
+                        if status_callback:
+                            status_callback(f"세그먼트 요청 감지 ({time.monotonic() - t0:.1f}초)")
+                        return source
+
+                    # 2) 페이지 소스에서 items1.shtml 패턴으로 베이스 URL 추출 (1초 간격)
+                    now = time.monotonic()
+                    if now - last_source_check >= 1.0:
+                        last_source_check = now
+                        try:
+                            browser.driver.switch_to.window(handle)
+                            m = ITEMS_SOURCE_RE.search(browser.driver.page_source)
+                        except Exception:
+                            m = None  # 로딩 중에는 소스를 못 읽을 수 있음
+                        if m:
+                            return _source_from_match(m)
+
+                if now >= deadline:
+                    break
+                time.sleep(poll_interval)
+
+            raise RuntimeError(f"{timeout:.0f}초 안에 세그먼트 URL을 찾지 못했습니다. 페이지를 확인하세요.")
+        except RuntimeError:
+            raise
+        except Exception:
+            broken = True  # 드라이버 오류 → 이 브라우저는 교체
+            raise
+        finally:
+            if handle is not None and not broken:
+                try:
+                    with browser.lock:
+                        browser.found.pop(handle, None)
+                        browser.driver.switch_to.window(handle)
+                        browser.driver.close()
+                        browser.driver.switch_to.window(browser.main_handle)
+                except Exception:
+                    broken = True
+            self._checkin(browser, broken=broken)
+
+    def shutdown(self):
+        """모든 브라우저 종료 (앱 종료 시)"""
+        with self._cond:
+            self._closed = True
+            browsers = list(self._browsers)
+            self._browsers.clear()
+            self._cond.notify_all()
+        for browser in browsers:
+            browser.quit()
+
+
+_service: Optional[ResolverService] = None
+_service_lock = threading.Lock()
+
+
+def get_resolver_service() -> ResolverService:
+    """프로세스 전역 URL 추출 서비스"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ResolverService()
+            atexit.register(_service.shutdown)
+        return _service
+
+
+def shutdown_resolver_service():
+    """띄워 둔 브라우저가 있으면 모두 종료"""
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        service.shutdown()
+
+
+def resolve_yasya_url(page_url: str, status_callback=None, timeout: float = 20.0,
+                      poll_interval: float = 0.25) -> str:
+    """yasyadong.tv 페이지 URL에서 세그먼트 베이스 URL을 자동 추출.
+    전역 ResolverService 를 사용한다 (HTTP 빠른 경로 → 브라우저 풀).
+    반환: 'https://yavidssgood.com/HASH/' 형태의 베이스 URL
+    """
+    return get_resolver_service().resolve(page_url, status_callback, timeout, poll_interval).base_url
@@ -0,0 +1,163 @@
+import bisect
+import itertools
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+
+def job_host(url: str) -> str:
+    """호스트별 제한에 쓸 키 (URL 의 호스트 이름)"""
+    return (urlparse(url.strip()).hostname or "").lower()
+
+
+@dataclass
+class _QueuedJob:
+    worker: QThread
+    host: str
+    priority: int = 0
+    seq: int = 0  # 같은 우선순위 안에서는 먼저 들어온 순서
+
+    @property
+    def sort_key(self):
+        return (-self.priority, self.seq)
+
+    def __lt__(self, other: "_QueuedJob") -> bool:
+        return self.sort_key < other.sort_key  # bisect.insort 용
+
+
+class DownloadScheduler(QObject):
+    """다운로드 작업 대기열
+
+    워커를 바로 시작하지 않고 대기열에 넣은 뒤, 전체 동시 실행 수(max_running)와
+    호스트당 동시 실행 수(per_host) 안에서 우선순위가 높은 것부터 시작한다.
+    워커의 done(또는 후처리로 넘어가는 downloaded) 시그널이 오면 자리를 비우고 다음 작업을 시작한다.
+    """
+
+    queue_changed = pyqtSignal()  # 대기열 순서/실행 상태가 바뀜
+
+    def __init__(self, max_running: int = 3, per_host: int = 2, parent=None):
+        super().__init__(parent)
+        self.max_running = max(1, max_running)
+        self.per_host = max(1, per_host)
+        self._queue: List[_QueuedJob] = []
+        self._queued: Dict[QThread, _QueuedJob] = {}  # 대기 중인 워커 → 항목 (작업이 많아도 바로 찾음)
+        self._queued_hosts: Dict[str, int] = {}       # 호스트 → 대기 중인 작업 수
+        self._running: Dict[QThread, str] = {}  # 실행 중인 워커 → 호스트
+        self._seq = itertools.count()
+
+    # ---------- 조회 ----------
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    @property
+    def queued_count(self) -> int:
+        return len(self._queue)
+
+    def is_queued(self, worker: QThread) -> bool:
+        return self._find(worker) is not None
+
+    def queue_position(self, worker: QThread) -> Optional[int]:
+        """대기열 순번 (1부터), 대기 중이 아니면 None"""
+        return self.queue_positions().get(worker)
+
+    def queue_positions(self) -> Dict[QThread, int]:
+        """대기 중인 모든 워커의 순번 (1부터) - 워커마다 queue_position 을 부르면 대기열을 여러 번 훑음"""
+        return {job.worker: pos for pos, job in enumerate(self._queue, 1)}
+
+    def _find(self, worker: QThread) -> Optional[_QueuedJob]:
+        return self._queued.get(worker)
+
+    def _enqueue(self, job: _QueuedJob):
+        bisect.insort(self._queue, job)  # 정렬 유지 (작업마다 대기열 전체를 다시 정렬하지 않음)
+        self._queued[job.worker] = job
+        self._queued_hosts[job.host] = self._queued_hosts.get(job.host, 0) + 1
+
+    def _dequeue(self, job: _QueuedJob):
+        self._queue.remove(job)
+        del self._queued[job.worker]
+        self._queued_hosts[job.host] -= 1
+        if not self._queued_hosts[job.host]:
+            del self._queued_hosts[job.host]
+
+    # ---------- 등록/취소 ----------
+    def submit(self, worker: QThread, host: str, priority: int = 0):
+        """워커를 대기열에 넣음 (자리가 있으면 바로 시작)"""
+        worker.done.connect(lambda *_args, w=worker: self.release(w))
+        # 후처리로 넘어간 워커는 다운로드가 끝난 것이므로 그때 바로 자리 반납
+        downloaded = getattr(worker, "downloaded", None)
+        if downloaded is not None:
+            downloaded.connect(lambda *_args, w=worker: self.release(w))
+        self._enqueue(_QueuedJob(worker, host, priority, next(self._seq)))
+        self._dispatch()
+
+    def cancel(self, worker: QThread) -> bool:
+        """아직 시작 안 한 워커를 대기열에서 뺌"""
+        job = self._find(worker)
+        if job is None:
+            return False
+        self._dequeue(job)
+        self.queue_changed.emit()
+        return True
+
+    def release(self, worker: QThread):
+        """워커가 끝나서 자리를 반납 (여러 번 불려도 안전)"""
+        if self._running.pop(worker, None) is not None:
+            self._dispatch()
+
+    # ---------- 순서/제한 변경 ----------
+    def set_priority(self, worker: QThread, priority: int):
+        job = self._find(worker)
+        if job is None:
+            return
+        job.priority = priority
+        self._queue.sort(key=lambda j: j.sort_key)
+        self.queue_changed.emit()
+
+    def change_priority(self, worker: QThread, delta: int):
+        job = self._find(worker)
+        if job is not None:
+            self.set_priority(worker, job.priority + delta)
+
+    def move_to_front(self, worker: QThread):
+        """가장 높은 우선순위로 올려 맨 앞에 둠"""
+        job = self._find(worker)
+        if job is None:
+            return
+        job.priority = max(j.priority for j in self._queue) + 1
+        self._queue.sort(key=lambda j: j.sort_key)
+        self._dispatch()
+
+    def set_limits(self, max_running: int, per_host: int):
+        """실행 중에도 변경 가능 - 늘리면 바로 다음 작업 시작, 줄이면 끝나는 대로 반영"""
+        self.max_running = max(1, max_running)
+        self.per_host = max(1, per_host)
+        self._dispatch()
+
+    # ---------- 실행 ----------
+    def _dispatch(self):
+        """제한 안에서 대기열 앞쪽부터 시작"""
+        host_running: Dict[str, int] = {}
+        for host in self._running.values():
+            host_running[host] = host_running.get(host, 0) + 1
+        full_hosts = set()
+        starting = []
+        for job in self._queue:
+            if len(self._running) + len(starting) >= self.max_running:
+                break
+            if job.host in full_hosts:
+                continue
+            if host_running.get(job.host, 0) >= self.per_host:
+                full_hosts.add(job.host)  # 이 호스트는 꽉 참 → 다른 호스트 작업 먼저
+                if len(full_hosts) == len(self._queued_hosts):
+                    break  # 대기 중인 모든 호스트가 꽉 참 (대기열이 길어도 끝까지 훑지 않음)
+                continue
+            host_running[job.host] = host_running.get(job.host, 0) + 1
+            starting.append(job)
+        for job in starting:
+            self._dequeue(job)
+            self._running[job.worker] = job.host
+            job.worker.start()
+        self.queue_changed.emit()
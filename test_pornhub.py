@@ -3,17 +3,14 @@
 import sys
 import os
 from models import JobConfig, VideoType
-from workers import PornhubDownloadWorker
-from PyQt6.QtCore import QCoreApplication
+from engine import PornhubDownloadJob
+from progress import format_progress
 
 def test_pornhub_download(url: str):
     """Pornhub 비디오 다운로드 테스트"""
     print(f"\n테스트 시작: {url}")
     print("=" * 60)
 
-    # Qt 애플리케이션 (시그널 처리를 위해 필요)
-    app = QCoreApplication(sys.argv)
-
     # 설정
     cfg = JobConfig(
         base_folder_url=url,
@@ -22,19 +19,13 @@ def test_pornhub_download(url: str):
         video_type=VideoType.PORNHUB,
     )
 
-    # 워커 생성
-    worker = PornhubDownloadWorker(cfg)
+    # 작업 생성 (Qt 없이 이 스레드에서 실행)
+    job = PornhubDownloadJob(cfg)
+    result = []
 
     # 시그널 연결
-    def on_progress(downloaded, total):
-        if total > 0:
-            percent = int((downloaded / total) * 100)
-            downloaded_mb = downloaded / (1024 * 1024)
-            total_mb = total / (1024 * 1024)
-            print(f"\r진행: {percent}% ({downloaded_mb:.1f}/{total_mb:.1f} MB)", end='', flush=True)
-        else:
-            downloaded_mb = downloaded / (1024 * 1024)
-            print(f"\r다운로드: {downloaded_mb:.1f} MB", end='', flush=True)
+    def on_progress(event):
+        print(f"\r진행: {format_progress(event)}", end='', flush=True)
 
     def on_status(msg):
         print(f"\n상태: {msg}")
@@ -43,17 +34,15 @@ def test_pornhub_download(url: str):
         print(f"\n\n결과: {'성공' if success else '실패'}")
         print(f"메시지: {message}")
         print("=" * 60)
-        app.quit()
-
-    worker.progress.connect(on_progress)
-    worker.status.connect(on_status)
-    worker.done.connect(on_done)
+        result.append(success)
 
-    # 워커 시작
-    worker.start()
+    job.progress.connect(on_progress)
+    job.status.connect(on_status)
+    job.done.connect(on_done)
 
-    # 이벤트 루프 실행
-    sys.exit(app.exec())
+    # 다운로드 실행 (끝날 때까지 대기)
+    job.run()
+    sys.exit(0 if result and result[0] else 1)
 
 if __name__ == "__main__":
     # 테스트 URL - 사용자가 제공한 새 URL (제대로 된 영상)
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+import adaptive
+from adaptive import AimdController, get_controller
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(adaptive.time, "monotonic", c)
+    return c
+
+
+def _round(ctl, clock, latency=0.1, nbytes=1000, seconds=1.0):
+    """창 크기만큼 요청을 끝내 한 라운드를 채움"""
+    clock.now += seconds
+    for _ in range(ctl.window):
+        ctl.on_success(latency, nbytes)
+
+
+def test_additive_increase_while_throughput_grows(clock):
+    ctl = AimdController("h", initial=2, maximum=5)
+    for _ in range(10):
+        _round(ctl, clock)  # 창이 클수록 라운드당 바이트가 늘어 처리량 증가
+    assert ctl.window == 5 and ctl.increases == 3
+
+
+def test_no_increase_when_latency_grows(clock):
+    ctl = AimdController("h", initial=2)
+    _round(ctl, clock, latency=0.1)
+    assert ctl.window == 3
+    _round(ctl, clock, latency=0.5)  # 기준 지연의 2배 넘음
+    assert ctl.window == 3
+
+
+def test_no_increase_when_throughput_flat(clock):
+    ctl = AimdController("h", initial=2)
+    _round(ctl, clock)
+    assert ctl.window == 3
+    _round(ctl, clock, nbytes=2000 // 3)  # 창은 컸지만 처리량이 그대로
+    assert ctl.window == 3
+
+
+def test_multiplicative_decrease_once_per_cooldown(clock):
+    ctl = AimdController("h", initial=16)
+    _round(ctl, clock, latency=0.2)
+    window = ctl.window
+    ctl.on_congestion()
+    assert ctl.window == window // 2
+    ctl.on_congestion()  # 같은 혼잡의 연속 신호 - 무시
+    assert ctl.window == window // 2 and ctl.decreases == 1
+    clock.now += 1.0  # 대기 시간 = max(1초, 기준 지연 × 2)
+    ctl.on_congestion()
+    assert ctl.window == window // 4 and ctl.decreases == 2
+
+
+def test_decrease_stops_at_minimum(clock):
+    ctl = AimdController("h", initial=2, minimum=1)
+    for _ in range(3):
+        ctl.on_congestion()
+        clock.now += 10
+    assert ctl.window == 1 and ctl.decreases == 1
+
+
+def test_acquire_respects_window():
+    ctl = AimdController("h", initial=2)
+    assert ctl.acquire(timeout=0) and ctl.acquire(timeout=0)
+    assert not ctl.acquire(timeout=0.01)
+    assert ctl.in_flight == 2
+    waiter = threading.Thread(target=ctl.acquire)
+    waiter.start()
+    ctl.release()  # 자리가 나면 기다리던 요청이 들어감
+    waiter.join(2)
+    assert not waiter.is_alive() and ctl.in_flight == 2
+
+
+def test_shared_controller_per_host():
+    a = get_controller("Shared.Example", initial=3, maximum=8)
+    b = get_controller("shared.example", initial=10, maximum=20)
+    assert a is b and a.window == 3 and a.maximum == 20
@@ -0,0 +1,74 @@
+import gzip
+
+import pytest
+
+from buffers import MAX_RESERVE_BYTES, SegmentBufferPool, read_segment_into
+
+TS = bytes([0x47]) + bytes(188 * 40 - 1)
+
+
+class FakeResponse:
+    """requests 스트리밍 응답 흉내 - iter_content 는 압축을 푼 본문"""
+
+    def __init__(self, body: bytes, headers: dict):
+        self.headers = headers
+        self._body = body
+
+    def iter_content(self, chunk_size):
+        for pos in range(0, len(self._body), chunk_size):
+            yield self._body[pos:pos + chunk_size]
+
+
+def _read(body: bytes, headers: dict, pool=None):
+    pool = pool or SegmentBufferPool(1, initial_size=1024)
+    buf = pool.acquire()
+    try:
+        return read_segment_into(FakeResponse(body, headers), buf, 1000), buf
+    finally:
+        pool.release(buf)
+
+
+def test_identity_body():
+    n, buf = _read(TS, {"Content-Length": str(len(TS))})
+    assert n == len(TS) and bytes(buf.view()) == TS
+
+
+def test_truncated_identity_body_fails():
+    with pytest.raises(RuntimeError, match="truncated"):
+        _read(TS[:-188], {"Content-Length": str(len(TS))})
+
+
+def test_encoded_body_is_not_compared_with_content_length():
+    # Content-Length 는 압축된 크기, 본문은 압축을 푼 크기
+    headers = {"Content-Length": str(len(gzip.compress(TS))), "Content-Encoding": "gzip"}
+    n, buf = _read(TS, headers)
+    assert n == len(TS) and bytes(buf.view()) == TS
+
+
+def test_reservation_is_capped():
+    pool = SegmentBufferPool(1, initial_size=1024)
+    with pytest.raises(RuntimeError, match="truncated"):
+        _read(TS, {"Content-Length": str(50 * 1024 ** 3)}, pool)  # 서버가 50 GB 라고 주장
+    buf = pool.acquire()
+    assert buf.capacity <= MAX_RESERVE_BYTES
+
+
+def test_non_ts_body_fails_on_first_chunk():
+    with pytest.raises(RuntimeError, match="0x47"):
+        _read(b"<html>not found</html>", {})
+
+
+def test_pool_reuses_buffers_and_reports_peak():
+    pool = SegmentBufferPool(2, initial_size=1024, preallocate=1)
+    a = pool.acquire()
+    b = pool.acquire()
+    assert pool.capacity_bytes == 2048
+    a.append(bytes(4000))  # 늘어난 용량은 반납 후에도 유지
+    assert pool.peak_bytes == 1024 + 4000
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.01)  # 버퍼 2개를 모두 쓰는 중
+    pool.release(a)
+    again = pool.acquire()
+    assert again is a and again.length == 0 and again.capacity == 4000
+    pool.release(again)
+    pool.release(b)
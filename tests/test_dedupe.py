@@ -0,0 +1,50 @@
+from dedupe import PlaceholderSignature, SegmentHashTable
+
+
+def test_unique_segments_pass():
+    table = SegmentHashTable(run_limit=3)
+    assert all(table.check(seg, (seg, 1000)) is None for seg in range(1, 50))
+    assert not table.end_of_stream and not table.duplicates
+
+
+def test_end_of_stream_after_run_of_same_content():
+    table = SegmentHashTable(run_limit=3)
+    for seg in range(1, 6):
+        table.check(seg, (seg, 1000))
+    assert table.check(6, (5, 1000)) == "5번과 내용이 같음"
+    assert not table.end_of_stream
+    table.check(7, (5, 1000))
+    assert not table.end_of_stream
+    table.check(8, (5, 1000))
+    assert table.end_of_stream
+    assert table.run_origin == 5
+    assert [seg for seg, _ in table.duplicates] == [6, 7, 8]
+
+
+def test_run_resets_on_new_content():
+    table = SegmentHashTable(run_limit=2)
+    table.check(1, (1, 10))
+    table.check(2, (1, 10))
+    assert not table.end_of_stream
+    table.check(3, (3, 10))  # 새 내용 → 연속 끊김
+    table.check(4, (1, 10))
+    assert table.run_length == 1 and not table.end_of_stream
+
+
+def test_different_duplicates_do_not_form_a_run():
+    table = SegmentHashTable(run_limit=2)
+    table.check(1, (1, 10))
+    table.check(2, (2, 10))
+    table.check(3, (1, 10))
+    table.check(4, (2, 10))
+    assert table.run_length == 1 and not table.end_of_stream
+
+
+def test_placeholder_signature():
+    placeholder = PlaceholderSignature(crc=0xABCD, length=512)
+    table = SegmentHashTable(run_limit=2, placeholder=placeholder)
+    assert table.check(1, placeholder.key) == "플레이스홀더 응답"
+    assert table.run_origin == -1 and not table.end_of_stream
+    assert table.check(2, placeholder.key) == "플레이스홀더 응답"
+    assert table.end_of_stream
+    assert "2개" in table.summary()
@@ -0,0 +1,220 @@
+import os
+import shutil
+
+import pytest
+
+import engine
+from bench.server import SegmentServer, ServerConfig, synthetic_segment
+from engine import SegmentDownloadJob
+from journal import SegmentJournal
+from models import JobConfig
+
+SEGMENTS = 8
+
+
+@pytest.fixture
+def server():
+    srv = SegmentServer(ServerConfig(segments=SEGMENTS, segment_bytes=8 * 1024, segment_seconds=0.5,
+                                     fps=4, latency=0.0)).start()
+    yield srv
+    srv.stop()
+
+
+@pytest.fixture(autouse=True)
+def copy_remux(monkeypatch):
+    """변환 대신 병합 TS 를 그대로 복사 - 출력 파일로 어떤 바이트가 어떤 순서로 기록됐는지 확인"""
+    monkeypatch.setattr(engine, "remux_file", shutil.copyfile)
+
+
+def _config(srv, save_dir, **overrides) -> JobConfig:
+    cfg = JobConfig(base_folder_url=f"{srv.url}/v/", save_dir=str(save_dir), out_name="clip.mp4",
+                    start=1, end=SEGMENTS, auto_detect=False, use_cache=False, concurrency=3,
+                    adaptive_concurrency=False, retry=2, timeout=5, remuxer="builtin", metrics_report=False)
+    for key, value in overrides.items():
+        setattr(cfg, key, value)
+    return cfg
+
+
+def _run(cfg: JobConfig):
+    job = SegmentDownloadJob(cfg)
+    messages, result = [], []
+    job.status.connect(messages.append)
+    job.done.connect(lambda ok, message: result.append((ok, message)))
+    job.run()
+    assert len(result) == 1
+    return result[0], messages
+
+
+def _expected(orders) -> bytes:
+    cfg = ServerConfig(segments=SEGMENTS, segment_bytes=8 * 1024, segment_seconds=0.5, fps=4)
+    return b"".join(synthetic_segment(order, cfg) for order in orders)
+
+
+def _leftover_journal(srv, save_dir, done: int, out_name: str = "clip.mp4") -> str:
+    """done 번까지 커밋하고 중단된 잡처럼 저널 + TS (커밋 뒤에 쓰다 만 바이트 포함) 를 만듦"""
+    out_ts = os.path.join(str(save_dir), "clip_abc123.ts")
+    path = os.path.join(str(save_dir), "clip_abc123.journal")
+    journal = SegmentJournal.create(path, {
+        "source_url": f"{srv.url}/v/", "out_name": out_name, "base_url": f"{srv.url}/v/segment_",
+        "start": 1, "end": SEGMENTS, "zero_pad": 4, "out_ts": out_ts,
+        "out_mp4": os.path.join(str(save_dir), "clip_abc123.mp4"), "missing": [],
+    }, fsync_every=1)
+    with open(out_ts, "wb") as f:
+        offset = 0
+        for order in range(done):
+            data = _expected([order])
+            f.write(data)
+            offset += len(data)
+            journal.commit(order + 1, offset, f)
+        f.write(b"\x47" * 500)  # 저널에 없는 쓰다 만 데이터
+    journal.close()
+    return path
+
+
+def test_resume_from_journal(server, tmp_path):
+    path = _leftover_journal(server, tmp_path, done=3)
+    (ok, out_mp4), messages = _run(_config(server, tmp_path, resume_journal=path))
+    assert ok, messages
+    assert any("이어받기: 4번부터" in m for m in messages)
+    assert server.stats["get"] == SEGMENTS - 3  # 커밋된 세그먼트는 다시 받지 않음
+    with open(out_mp4, "rb") as f:
+        assert f.read() == _expected(range(SEGMENTS))  # 쓰다 만 바이트는 잘라내고 이어씀
+    assert not os.path.exists(path) and not os.path.exists(str(tmp_path / "clip_abc123.ts"))
+
+
+def test_leftover_journal_is_not_resumed_without_request(server, tmp_path):
+    path = _leftover_journal(server, tmp_path, done=3)
+    (ok, out_mp4), messages = _run(_config(server, tmp_path))
+    assert ok, messages
+    assert any("이전에 중단된 다운로드가 있습니다" in m for m in messages)
+    assert server.stats["get"] == SEGMENTS
+    assert os.path.basename(out_mp4) != "clip_abc123.mp4"
+    with open(out_mp4, "rb") as f:
+        assert f.read() == _expected(range(SEGMENTS))
+    # 남아 있던 저널과 TS 는 그대로 (나중에 이어받기 가능)
+    assert os.path.exists(path) and os.path.exists(str(tmp_path / "clip_abc123.ts"))
+
+
+def test_missing_resume_journal_starts_over(server, tmp_path):
+    (ok, _), messages = _run(_config(server, tmp_path, resume_journal=str(tmp_path / "gone.journal")))
+    assert ok, messages
+    assert server.stats["get"] == SEGMENTS
+
+
+def test_stopped_job_keeps_journal_for_resume(server, tmp_path):
+    cfg = _config(server, tmp_path, concurrency=1)
+    job = SegmentDownloadJob(cfg)
+    result = []
+    fetch = job._fetch_segment
+
+    def fetch_then_stop(session, base, num, headers, buf):
+        if num == 4:
+            job.stop()  # 3번까지 받은 뒤 사용자가 중단
+        return fetch(session, base, num, headers, buf)
+
+    job._fetch_segment = fetch_then_stop
+    job.done.connect(lambda ok, message: result.append((ok, message)))
+    job.run()
+    assert result and not result[0][0] and "이어받기 가능" in result[0][1]
+    journal = SegmentJournal.load(job.journal_path)
+    try:
+        assert journal.last_seg == 3 and journal.header["out_name"] == "clip.mp4"
+        assert journal.offset == len(_expected(range(3)))
+    finally:
+        journal.close()
+
+
+def _serve_modified(srv, modify):
+    """srv.segment 응답을 modify(번호, 요청 횟수, 바이트) 로 바꿔서 돌려줌"""
+    original = srv.segment
+    calls = {}
+
+    def segment(num):
+        calls[num] = calls.get(num, 0) + 1
+        return modify(num, calls[num], original(num))
+
+    srv.segment = segment
+    return calls
+
+
+def test_continuity_error_is_accepted_without_retry(server, tmp_path):
+    def break_cc(num, _call, data):
+        if num != 3:
+            return data
+        data = bytearray(data)
+        data[5 * 188 + 3] = (data[5 * 188 + 3] & 0xF0) | ((data[5 * 188 + 3] + 5) & 0x0F)
+        return bytes(data)
+
+    calls = _serve_modified(server, break_cc)
+    (ok, _), messages = _run(_config(server, tmp_path, retry=5))
+    assert ok, messages
+    assert calls[3] == 1  # 다시 받지 않음
+    assert any("연속성 오류 그대로 사용 1개" in m and "재요청 0회" in m for m in messages)
+
+
+def test_bad_sync_segment_is_retried(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(engine.time, "sleep", lambda _s: None)  # 재시도 대기 생략
+
+    def corrupt_first(num, call, data):
+        if num == 5 and call == 1:
+            data = bytearray(data)
+            data[10 * 188] = 0x00  # 가운데 패킷 동기 바이트 손상
+            return bytes(data)
+        return data
+
+    calls = _serve_modified(server, corrupt_first)
+    (ok, out_mp4), messages = _run(_config(server, tmp_path))
+    assert ok, messages
+    assert calls[5] == 2
+    assert any("재요청 1회" in m for m in messages)
+    with open(out_mp4, "rb") as f:
+        assert f.read() == _expected(range(SEGMENTS))
+
+
+def test_profile_summary_comes_before_done(server, tmp_path):
+    job = SegmentDownloadJob(_config(server, tmp_path, profile=True, profile_dir=str(tmp_path / "profiles")))
+    events = []
+    job.status.connect(lambda message: events.append(("status", message)))
+    job.done.connect(lambda ok, message: events.append(("done", ok)))
+    job.run()
+    assert events[-1] == ("done", True)
+    assert any(kind == "status" and "프로파일" in message for kind, message in events[:-1]), events
+    assert os.listdir(str(tmp_path / "profiles"))
+
+
+@pytest.fixture
+def placeholder_server():
+    """범위 밖 번호에 200 + 같은 TS 본문(플레이스홀더)을 주는 서버"""
+    srv = SegmentServer(ServerConfig(segments=SEGMENTS, segment_bytes=8 * 1024, segment_seconds=0.5,
+                                     fps=4, latency=0.0, placeholder="ts")).start()
+    yield srv
+    srv.stop()
+
+
+def test_placeholder_tail_is_rewound_when_end_is_unknown(placeholder_server, tmp_path):
+    (ok, out_mp4), messages = _run(_config(placeholder_server, tmp_path, end=None, concurrency=2))
+    assert ok, messages
+    assert any(f"{SEGMENTS + 1}번은 플레이스홀더 응답" in m for m in messages)
+    with open(out_mp4, "rb") as f:
+        assert f.read() == _expected(range(SEGMENTS))  # 처음 받은 플레이스홀더 하나만 제거
+
+
+def test_rewind_keeps_segments_written_after_the_first_copy(placeholder_server, tmp_path):
+    # 3번이 플레이스홀더와 같은 내용 → 끝에서 반복될 때 그 내용의 첫 번호는 3번이지만 4번 이후는 정상
+    _serve_modified(placeholder_server, lambda num, _call, data: placeholder_server._placeholder_body
+                    if num == 3 else data)
+    (ok, out_mp4), messages = _run(_config(placeholder_server, tmp_path, end=None, concurrency=2))
+    assert ok, messages
+    with open(out_mp4, "rb") as f:
+        data = f.read()
+    assert data == _expected(range(2)) + placeholder_server._placeholder_body + _expected(range(3, SEGMENTS))
+
+
+def test_duplicate_run_inside_known_range_is_skipped(server, tmp_path):
+    # 5~7번이 4번과 같은 내용 (끝번호는 알고 있음) → 건너뛰고 8번까지 받음
+    _serve_modified(server, lambda num, _call, data: _expected([3]) if 5 <= num <= 7 else data)
+    (ok, out_mp4), messages = _run(_config(server, tmp_path))
+    assert ok, messages
+    assert any("건너뛰고 8번까지 계속" in m for m in messages)
+    with open(out_mp4, "rb") as f:
+        assert f.read() == _expected([0, 1, 2, 3, 7])
@@ -0,0 +1,59 @@
+from PyQt6.QtCore import Qt
+
+from jobtable import COL_CHECK, COL_NAME, COL_PROGRESS, FRACTION_ROLE, JobTableModel
+
+
+def _model(n):
+    model = JobTableModel()
+    jobs = model.add_jobs((f"https://h/{i}", "/tmp", f"{i}.mp4") for i in range(n))
+    changed = []
+    model.dataChanged.connect(lambda first, last, roles: changed.append((first.row(), last.row(), first.column())))
+    return model, jobs, changed
+
+
+def test_ids_stay_stable_after_removal():
+    model, jobs, _ = _model(6)
+    assert [job.job_id for job in jobs] == [1, 2, 3, 4, 5, 6]
+    removed = model.remove_jobs([2, 3, 5, 99])
+    assert [job.job_id for job in removed] == [5, 2, 3]  # 뒤쪽 구간부터
+    assert model.rowCount() == 3
+    assert [model.row_of(j) for j in (1, 4, 6)] == [0, 1, 2]
+    assert model.job(3) is None
+    assert model.add_job("https://h/x", "/tmp", "x.mp4").job_id == 7
+
+
+def test_flush_reports_only_changed_rows_in_ranges():
+    model, jobs, changed = _model(6)
+    model.set_status(2, "받는 중")
+    model.set_progress(3, "10%", 0.1)
+    model.set_progress(5, "50%", 0.5)
+    model.set_status(6, "대기 중")  # 그대로 - 바뀜 아님
+    assert changed == []  # flush 전에는 알리지 않음
+    assert model.flush() == 3
+    assert changed == [(1, 2, COL_PROGRESS), (4, 4, COL_PROGRESS)]
+    assert model.flush() == 0
+
+
+def test_data_roles_and_finish():
+    model, jobs, changed = _model(2)
+    model.set_progress(1, "45% (9/20)", 0.45)
+    index = model.index(0, COL_PROGRESS)
+    assert model.data(index) == "45% (9/20)"
+    assert model.data(index, FRACTION_ROLE) == 0.45
+    assert model.data(index, Qt.ItemDataRole.ToolTipRole) == "45% (9/20)"
+    model.finish(1, "완료", resume_journal=None)
+    assert model.data(index, FRACTION_ROLE) is None and model.job(1).completed
+    assert changed == [(0, 0, COL_PROGRESS)]  # finish 는 바로 반영
+
+
+def test_check_and_edit():
+    model, jobs, _ = _model(2)
+    check = model.index(1, COL_CHECK)
+    assert model.flags(check) & Qt.ItemFlag.ItemIsUserCheckable
+    assert model.setData(check, Qt.CheckState.Unchecked.value, Qt.ItemDataRole.CheckStateRole)
+    assert model.data(check, Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Unchecked
+    assert [job.job_id for job in model.checked_jobs()] == [1]
+    name = model.index(0, COL_NAME)
+    assert model.setData(name, "renamed.mp4")
+    assert model.job(1).out_name == "renamed.mp4"
+    assert not model.setData(model.index(0, COL_PROGRESS), "x")  # 진행상황은 편집 불가
@@ -0,0 +1,79 @@
+import pytest
+
+from journal import SegmentJournal, find_journal
+
+
+def _write_journal(path, header: dict, entries):
+    journal = SegmentJournal.create(str(path), header, fsync_every=1)
+    with open(str(path) + ".ts", "wb") as data:
+        for seg, offset in entries:
+            journal.commit(seg, offset, data)
+    journal.close()
+
+
+def test_load_ignores_truncated_last_line(tmp_path):
+    path = tmp_path / "out_1.journal"
+    _write_journal(path, {"source_url": "https://example.com/v/"}, [(1, 100), (2, 200), (3, 300)])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"seg": 4, "off')  # 쓰다가 끊긴 줄
+    journal = SegmentJournal.load(str(path))
+    try:
+        assert journal.header == {"source_url": "https://example.com/v/"}
+        assert (journal.last_seg, journal.offset) == (3, 300)
+    finally:
+        journal.close()
+
+
+def test_load_stops_at_first_bad_line(tmp_path):
+    path = tmp_path / "out_2.journal"
+    path.write_text('{"source_url": "x"}\n{"seg": 1, "offset": 10}\n{"seg": 2}\n{"seg": 3, "offset": 30}\n',
+                    encoding="utf-8")
+    journal = SegmentJournal.load(str(path))
+    try:
+        assert (journal.last_seg, journal.offset) == (1, 10)
+    finally:
+        journal.close()
+
+
+def test_load_header_only_and_empty(tmp_path):
+    path = tmp_path / "out_3.journal"
+    _write_journal(path, {"source_url": "x"}, [])
+    journal = SegmentJournal.load(str(path))
+    try:
+        assert not journal.has_commits and journal.offset == 0
+    finally:
+        journal.close()
+
+    empty = tmp_path / "empty.journal"
+    empty.write_text("", encoding="utf-8")
+    with pytest.raises(ValueError):
+        SegmentJournal.load(str(empty))
+
+
+def test_same_journal_cannot_be_opened_twice(tmp_path):
+    path = tmp_path / "out_4.journal"
+    _write_journal(path, {"source_url": "x"}, [(1, 10)])
+    journal = SegmentJournal.load(str(path))
+    try:
+        with pytest.raises(RuntimeError):
+            SegmentJournal.load(str(path))
+    finally:
+        journal.close()
+
+
+def test_find_journal_matches_url_and_out_name(tmp_path):
+    out_ts = tmp_path / "clip_abc123.ts"
+    out_ts.write_bytes(b"")
+
+    def make(name, header):
+        journal = SegmentJournal.create(str(tmp_path / name), dict(header, out_ts=str(out_ts)))
+        journal.close()
+        return str(tmp_path / name)
+
+    path = make("clip_abc123.journal", {"source_url": "https://example.com/v/", "out_name": "clip.mp4"})
+    make("other_def456.journal", {"source_url": "https://example.com/v/", "out_name": "other.mp4"})
+    make("old_0a0b0c.journal", {"source_url": "https://example.com/w/"})  # 저장이름 없는 이전 형식
+
+    assert find_journal(str(tmp_path), "https://example.com/v/", "clip.mp4") == path
+    assert find_journal(str(tmp_path), "https://example.com/v/", "new.mp4") is None
+    assert find_journal(str(tmp_path), "https://example.com/w/", "clip.mp4") is None
@@ -0,0 +1,35 @@
+from listing import parse_segment_listing
+
+
+def test_contiguous_listing():
+    text = "\n".join(f"segment_{n:04d}.jpg" for n in range(1, 11))
+    listing = parse_segment_listing(text)
+    assert (listing.start, listing.end, listing.count, listing.zero_pad) == (1, 10, 10, 4)
+    assert listing.missing == []
+
+
+def test_listing_with_gaps():
+    numbers = [3, 4, 5, 9, 10, 12]
+    text = "#EXTM3U\n" + "".join(f"#EXTINF:4.0,\nsegment_{n:04d}.jpg\n" for n in numbers)
+    listing = parse_segment_listing(text)
+    assert (listing.start, listing.end) == (3, 12)
+    assert listing.names == [f"segment_{n:04d}.jpg" for n in numbers]
+    assert listing.missing == [6, 7, 8, 11]
+
+
+def test_duplicates_and_unordered_names():
+    text = '<a href="segment_0005.jpg">5</a> segment_0002.jpg segment_0005.jpg segment_0003.jpg'
+    listing = parse_segment_listing(text)
+    assert listing.names == ["segment_0005.jpg", "segment_0002.jpg", "segment_0003.jpg"]
+    assert (listing.start, listing.end, listing.count) == (2, 5, 3)
+    assert listing.missing == [4]
+
+
+def test_zero_pad_from_smallest_number():
+    listing = parse_segment_listing("segment_9999.jpg segment_10000.jpg segment_10001.jpg")
+    assert listing.zero_pad == 4
+    assert str(listing.end).zfill(listing.zero_pad) == "10001"
+
+
+def test_no_segments():
+    assert parse_segment_listing("<html>no segments</html>") is None
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from bench.server import SegmentServer, ServerConfig
+from metrics import BUCKETS, Histogram, JobMetrics, MetricsRegistry, current_timing, error_class, prometheus_text
+from transport import Transport
+
+
+class FakeTimeout(Exception):
+    pass
+
+
+class ConnectionResetLike(Exception):
+    pass
+
+
+def _job():
+    registry = MetricsRegistry()
+    return JobMetrics(registry), registry
+
+
+def test_histogram_quantile_interpolates_within_bucket():
+    hist = Histogram()
+    for _ in range(10):
+        hist.observe(0.03)  # 0.025 ~ 0.05 구간
+    assert hist.count == 10 and hist.sum == pytest.approx(0.3)
+    assert hist.quantile(0.5) == pytest.approx(0.025 + 0.025 * 0.5)
+    hist.observe(100.0)  # +Inf 구간은 마지막 상한으로
+    assert hist.quantile(1.0) == BUCKETS[-1]
+    assert Histogram().quantile(0.5) is None
+
+
+def test_error_class():
+    assert error_class(FakeTimeout()) == "timeout"
+    assert error_class(ConnectionResetLike()) == "connection"
+    assert error_class(RuntimeError(), 429) == "http_429"
+    assert error_class(RuntimeError(), 503) == "http_5xx"
+    assert error_class(ValueError()) == "ValueError"
+    labelled = RuntimeError()
+    labelled.error_class = "bad_sync"
+    assert error_class(labelled, 500) == "bad_sync"
+
+
+def test_request_timing_records_per_host_and_registry():
+    job, registry = _job()
+    with job.request("segment", "https://CDN.example/v/1.ts") as timing:
+        assert current_timing() is timing
+        timing.response(200)
+        timing.body_done(1000)
+    assert current_timing() is None
+    with pytest.raises(FakeTimeout):
+        with job.request("segment", "https://cdn.example/v/2.ts", attempt=2):
+            raise FakeTimeout()
+    with job.request("probe", "https://other.example/x") as timing:
+        timing.response(404)
+        timing.fail("http_4xx")
+    report = job.to_dict()
+    segment = report["hosts"]["cdn.example"]["segment"]
+    assert segment["requests"] == {"200": 1, "error": 1}
+    assert segment["errors"] == {"timeout": 1}
+    assert segment["retries"] == 1 and segment["bytes"] == 1000
+    assert set(segment["phases"]) == {"ttfb", "transfer", "total"}  # 새 연결 없음 → dns/connect/tls 없음
+    assert report["total"]["probe"]["errors"] == {"http_4xx": 1}
+    # 다른 잡이 같은 호스트를 쓰면 전역 집계에서 합쳐짐
+    other = JobMetrics(registry)
+    with other.request("segment", "https://cdn.example/v/3.ts") as timing:
+        timing.response(200)
+    assert registry.to_dict()["hosts"]["cdn.example"]["segment"]["requests"] == {"200": 2, "error": 1}
+    assert "재시도 1회" in job.summary() and "timeout 1" in job.summary()
+
+
+def test_prometheus_text_cumulative_buckets_and_escaping():
+    job, _ = _job()
+    with job.request("segment", "https://h.example/a") as timing:
+        timing.response(200)
+    text = prometheus_text([({"job": 'a "b"\\c'}, job.total)])
+    assert '# TYPE segmentgrabber_request_phase_seconds histogram' in text
+    assert 'job="a \\"b\\"\\\\c"' in text
+    buckets = [line for line in text.splitlines()
+               if line.startswith("segmentgrabber_request_phase_seconds_bucket") and 'phase="total"' in line]
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert len(counts) == len(BUCKETS) + 1 and counts == sorted(counts) and counts[-1] == 1
+    assert 'segmentgrabber_requests_total{job="a \\"b\\"\\\\c",kind="segment",status="200"} 1' in text
+
+
+def test_write_reports(tmp_path):
+    job, _ = _job()
+    with job.request("segment", "https://h.example/a") as timing:
+        timing.response(200)
+        timing.body_done(10)
+    json_path, prom_path = job.write_reports(str(tmp_path / "clip.mp4"), "clip")
+    assert json_path.endswith("clip.metrics.json") and prom_path.endswith("clip.prom")
+    with open(json_path, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["job"] == "clip" and report["hosts"]["h.example"]["segment"]["bytes"] == 10
+    with open(prom_path, encoding="utf-8") as f:
+        assert 'host="h.example"' in f.read()
+
+
+def test_connection_phases_recorded_for_new_connections():
+    srv = SegmentServer(ServerConfig(segments=2, segment_bytes=4 * 1024, latency=0.0)).start()
+    transport = Transport()
+    try:
+        job, _ = _job()
+        url = f"{srv.url}/v/segment_0001.jpg"
+        for _ in range(2):
+            with job.request("segment", url) as timing:
+                r = transport.session_for(url).get(url, timeout=5)
+                timing.response(r.status_code)
+                timing.body_done(len(r.content))
+        segment = job.to_dict()["total"]["segment"]
+        assert segment["new_connections"] == 1  # 두 번째는 keep-alive 재사용
+        assert segment["phases"]["connect"]["count"] == 1
+        assert segment["phases"]["total"]["count"] == 2
+    finally:
+        transport.close()
+        srv.stop()
@@ -0,0 +1,84 @@
+import threading
+
+from postprocess import PostJob, PostProcessCancelled, PostProcessQueue, PostStep, format_durations, run_post_job
+
+
+def _job(key, steps, log):
+    def finish(error):
+        log.append(("finish", key, type(error).__name__ if error else None))
+        return error is None, str(error) if error else "ok"
+    return PostJob(key, [PostStep(name, run) for name, run in steps], finish)
+
+
+def test_steps_run_in_order_and_stop_on_failure():
+    log = []
+
+    def fail():
+        raise RuntimeError("변환 실패")
+
+    job = _job("k", [("a", lambda: log.append("a")), ("b", fail), ("c", lambda: log.append("c"))], log)
+    steps = []
+    ok, message = run_post_job(job, on_step=steps.append)
+    assert (ok, message) == (False, "변환 실패")
+    assert steps == ["a", "b"] and log == ["a", ("finish", "k", "RuntimeError")]
+    assert [name for name, _ in job.durations] == ["a", "b"]
+
+
+def test_finish_error_becomes_failure():
+    def finish(error):
+        raise OSError("정리 실패")
+    ok, message = run_post_job(PostJob("k", [], finish))
+    assert not ok and "정리 실패" in message
+
+
+def test_format_durations():
+    assert format_durations([("변환", 3.21), ("정리", 0.04)]) == "변환 3.2초, 정리 0.0초"
+
+
+def test_queue_bounds_running_and_pending():
+    queue = PostProcessQueue(max_workers=1, max_pending=1)
+    gate = threading.Event()
+    started = threading.Event()
+    finished = []
+    queue.job_finished.connect(lambda key, ok, message, durations: finished.append((key, ok)))
+    log = []
+
+    def blocking():
+        started.set()
+        gate.wait(5)
+
+    assert queue.put(_job(1, [("run", blocking)], log))
+    started.wait(5)
+    assert queue.running_count == 1 and queue.is_pending(1)
+    assert queue.put(_job(2, [], log))  # 대기 한 자리
+    # 대기열이 꽉 참 - 중지 신호가 오면 등록하지 않고 돌아옴
+    assert not queue.put(_job(3, [], log), should_stop=lambda: True)
+    assert queue.pending_count == 1
+    both_done = threading.Event()
+    queue.job_finished.connect(lambda *_args: len(finished) == 2 and both_done.set())
+    gate.set()
+    assert both_done.wait(5)
+    queue.shutdown(wait=True)
+    assert finished == [(1, True), (2, True)]
+
+
+def test_shutdown_cancels_pending_with_failure():
+    queue = PostProcessQueue(max_workers=1, max_pending=4)
+    gate = threading.Event()
+    started = threading.Event()
+    finished = []
+    queue.job_finished.connect(lambda key, ok, message, durations: finished.append((key, ok)))
+    log = []
+
+    def blocking():
+        started.set()
+        gate.wait(5)
+
+    queue.put(_job("run", [("run", blocking)], log))
+    started.wait(5)
+    queue.put(_job("wait", [("never", lambda: log.append("never"))], log))
+    threading.Timer(0.1, gate.set).start()
+    queue.shutdown(wait=True)
+    assert ("finish", "wait", PostProcessCancelled.__name__) in log and "never" not in log
+    assert ("wait", False) in finished and ("run", True) in finished
+    assert not queue.put(_job("late", [], log))
@@ -0,0 +1,151 @@
+import math
+import threading
+import time
+
+import pytest
+
+import progress
+from progress import Phase, ProgressBus, ProgressEvent, ProgressTracker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(progress.time, "monotonic", c)
+    return c
+
+
+def _tracker(interval=0.25, time_constant=5.0):
+    events = []
+    return ProgressTracker(events.append, interval=interval, time_constant=time_constant), events
+
+
+def test_no_event_before_first_phase(clock):
+    tracker, events = _tracker()
+    tracker.add(100, 1)
+    assert events == []
+    tracker.set_phase(Phase.DOWNLOAD)
+    assert events[-1].phase == Phase.DOWNLOAD
+
+
+def test_throttled_to_interval(clock):
+    tracker, events = _tracker(interval=0.25)
+    tracker.set_range(1, 100)
+    tracker.set_phase(Phase.DOWNLOAD)
+    for n in range(1, 21):  # 0.05초마다 세그먼트 하나 - 1초 동안 20번
+        clock.now += 0.05
+        tracker.add(1000, n)
+    download = [e for e in events if e.phase == Phase.DOWNLOAD]
+    assert len(download) <= 1 + 1.0 / 0.25
+    assert download[-1].segments_done <= 20
+
+
+def test_phase_change_and_finish_are_forced(clock):
+    tracker, events = _tracker(interval=10.0)
+    tracker.set_phase(Phase.PROBE)
+    tracker.set_phase(Phase.PROBE)  # 같은 단계 - 이벤트 없음
+    tracker.set_phase(Phase.DOWNLOAD)
+    tracker.add(500, 1)  # 간격 안 - 이벤트 없음
+    tracker.finish()
+    assert [e.phase for e in events] == [Phase.PROBE, Phase.DOWNLOAD, Phase.DONE]
+    assert events[-1].bytes_done == 500 and events[-1].segments_done == 1
+
+
+def test_ewma_speed_follows_rate_change(clock):
+    tracker, events = _tracker(interval=0.0, time_constant=5.0)
+    tracker.set_phase(Phase.DOWNLOAD)
+    tracker.add(0)
+    for _ in range(10):
+        clock.now += 1.0
+        tracker.add(1000)
+    assert events[-1].speed == pytest.approx(1000.0)
+    clock.now += 1.0
+    tracker.add(3000)  # 한 표본만 빨라짐 - 시정수만큼 완만하게 따라감
+    alpha = 1.0 - math.exp(-1.0 / 5.0)
+    assert events[-1].speed == pytest.approx(1000.0 + alpha * 2000.0)
+
+
+def test_eta_from_estimated_total(clock):
+    tracker, events = _tracker(interval=0.0)
+    tracker.set_range(1, 10)
+    tracker.set_phase(Phase.DOWNLOAD)
+    tracker.add(0)
+    for n in range(1, 5):
+        clock.now += 1.0
+        tracker.add(1000, n)
+    event = events[-1]
+    # 세그먼트 5개(첫 add 포함) 평균 800 바이트 × 10개로 전체 추정
+    assert event.total_estimated and event.bytes_total == 8000
+    assert event.segments_total == 10
+    assert event.eta == pytest.approx((8000 - 4000) / event.speed)
+
+
+def test_resume_excluded_from_speed(clock):
+    tracker, events = _tracker(interval=0.0)
+    tracker.resume(1_000_000, 50)
+    tracker.set_phase(Phase.DOWNLOAD)
+    tracker.add(0)
+    clock.now += 1.0
+    tracker.add(1000)
+    assert events[-1].bytes_done == 1_001_000
+    assert events[-1].speed == pytest.approx(1000.0)
+
+
+class _GateLock:
+    """gated 스레드는 release_gate 가 열린 뒤에야 잠금을 잡음 - 내보내기 순서를 정해서 재현"""
+
+    def __init__(self, gated):
+        self._lock = threading.Lock()
+        self.gated = gated
+        self.release_gate = threading.Event()
+
+    def __enter__(self):
+        if threading.current_thread() is self.gated[0]:
+            self.release_gate.wait(2)
+        self._lock.acquire()
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+def test_stale_snapshot_not_emitted_after_newer():
+    """먼저 찍은 장면이 내보내기를 기다리는 사이 더 새 장면이 나가면 옛 장면은 버림"""
+    events = []
+    tracker = ProgressTracker(events.append, interval=0.0)
+    tracker.set_phase(Phase.DOWNLOAD)
+    gated = []
+    gate = tracker._emit_lock = _GateLock(gated)
+    first = threading.Thread(target=tracker.add, args=(100, 1))
+    gated.append(first)
+    first.start()
+    deadline = time.monotonic() + 2
+    while tracker._seq < 2 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    tracker.add(100, 2)  # 첫 스레드가 장면을 찍은 뒤 더 새 장면을 먼저 내보냄
+    gate.release_gate.set()
+    first.join()
+    assert [(e.bytes_done, e.segment) for e in events] == [(0, None), (200, 2)]
+
+
+def test_bus_coalesces_latest_per_key():
+    bus = ProgressBus(interval=60)
+    batches = []
+    bus.updated.connect(batches.append)
+    bus.publish("a", ProgressEvent(Phase.DOWNLOAD, bytes_done=1))
+    bus.publish("a", ProgressEvent(Phase.DOWNLOAD, bytes_done=2))
+    bus.publish("b", ProgressEvent(Phase.PROBE))
+    bus.flush()
+    bus.flush()  # 그 사이 바뀐 게 없으면 내보내지 않음
+    assert len(batches) == 1
+    assert batches[0]["a"].bytes_done == 2 and batches[0]["b"].phase == Phase.PROBE
+    bus.publish("a", ProgressEvent(Phase.DONE))
+    bus.shutdown()  # 남은 것 내보내고 종료
+    assert batches[-1] == {"a": ProgressEvent(Phase.DONE)}
@@ -0,0 +1,45 @@
+import pytest
+
+from ratelimit import ScheduleRule, parse_limit_rules
+
+
+def test_hosts_and_schedule():
+    hosts, schedule = parse_limit_rules("CDN.example.com=512, 09:00-18:00=1024;\n22:30 - 06:00 = 0")
+    assert hosts == {"cdn.example.com": 512 * 1024}
+    assert schedule == [ScheduleRule(540, 1080, 1024 * 1024), ScheduleRule(1350, 360, 0)]
+
+
+def test_empty_text():
+    assert parse_limit_rules("") == ({}, [])
+    assert parse_limit_rules(None) == ({}, [])
+    assert parse_limit_rules(" , ;\n") == ({}, [])
+
+
+@pytest.mark.parametrize("text", ["00:00-24:00=1", "23:59-24:00=1", "24:00-01:00=1", "0:00-9:05=1"])
+def test_boundary_times_accepted(text):
+    _, schedule = parse_limit_rules(text)
+    assert len(schedule) == 1
+
+
+@pytest.mark.parametrize("text", [
+    "24:59-01:00=1", "00:00-24:01=1", "25:00-01:00=1", "10:60-11:00=1", "10:00-11:99=1",
+])
+def test_out_of_range_times_rejected(text):
+    with pytest.raises(ValueError, match="잘못된 시각"):
+        parse_limit_rules(text)
+
+
+@pytest.mark.parametrize("text", [
+    "cdn.example.com", "cdn.example.com=fast", "=512", "cdn.example.com=-1", "cdn.example.com=nan",
+])
+def test_malformed_rules_rejected(text):
+    with pytest.raises(ValueError):
+        parse_limit_rules(text)
+
+
+def test_schedule_across_midnight():
+    rule = ScheduleRule(22 * 60, 6 * 60, 0)
+    assert rule.active(23 * 60) and rule.active(0) and rule.active(6 * 60 - 1)
+    assert not rule.active(6 * 60) and not rule.active(12 * 60)
+    day = ScheduleRule(9 * 60, 18 * 60, 0)
+    assert day.active(9 * 60) and not day.active(18 * 60)
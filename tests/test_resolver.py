@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+import resolver
+from resolver import ResolverService
+
+
+class FakeDriver:
+    """Chrome 대신 - 풀 관리(대여/반납/교체)만 확인"""
+    current_window_handle = "main"
+    browser_pid = None
+
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def drivers(monkeypatch):
+    created = []
+
+    def create():
+        created.append(FakeDriver())
+        return created[-1]
+
+    monkeypatch.setattr(resolver, "_create_driver", create)
+    return created
+
+
+def _use(service: ResolverService):
+    browser = service._checkout(time.monotonic() + 1)
+    service._checkin(browser)
+    return browser
+
+
+def test_browser_is_reused_until_max_uses(drivers):
+    service = ResolverService(max_browsers=1, max_uses=3, max_rss_mb=0)
+    browsers = [_use(service) for _ in range(3)]
+    assert len(drivers) == 1 and all(b is browsers[0] for b in browsers)
+    assert drivers[0].quit_called  # 3번째 반납에서 교체
+    _use(service)
+    assert len(drivers) == 2
+
+
+def test_without_psutil_browsers_are_recycled_by_use_count(drivers):
+    service = ResolverService(max_browsers=1, max_uses=50, max_rss_mb=1500, fallback_max_uses=2)
+    service.rss_supported = False
+    _use(service)
+    assert not drivers[0].quit_called
+    _use(service)
+    assert drivers[0].quit_called
+
+
+def test_browser_over_memory_cap_is_recycled(drivers, monkeypatch):
+    monkeypatch.setattr(resolver, "_browser_rss_mb", lambda driver: 2000.0)
+    service = ResolverService(max_browsers=1, max_uses=50, max_rss_mb=1500)
+    service.rss_supported = True
+    _use(service)
+    assert drivers[0].quit_called
+
+
+def test_missing_psutil_warning_is_shown_once():
+    service = ResolverService(max_rss_mb=1500, fallback_max_uses=20)
+    service.rss_supported = False
+    messages = []
+    service._warn_no_rss(messages.append)
+    service._warn_no_rss(messages.append)
+    assert len(messages) == 1 and "psutil" in messages[0] and "20번" in messages[0]
+
+
+def test_checkout_waits_for_a_free_tab(drivers):
+    service = ResolverService(max_browsers=1, tabs_per_browser=2, max_rss_mb=0)
+    first = service._checkout(time.monotonic() + 1)
+    second = service._checkout(time.monotonic() + 1)
+    assert first is second and first.tabs == 2
+    with pytest.raises(RuntimeError):
+        service._checkout(time.monotonic() + 0.05)
+    service._checkin(first)
+    assert service._checkout(time.monotonic() + 1) is first
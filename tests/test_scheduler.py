@@ -0,0 +1,88 @@
+from events import Signal
+from scheduler import DownloadScheduler, job_host
+
+
+class FakeWorker:
+    """QThread 대신 - 스케줄러는 done/downloaded 시그널과 start() 만 씀"""
+
+    def __init__(self, name):
+        self.name = name
+        self.done = Signal()
+        self.downloaded = Signal()
+        self.started = False
+
+    def start(self):
+        self.started = True
+
+    def __repr__(self):
+        return self.name
+
+
+def _submit(scheduler, *specs):
+    workers = []
+    for name, host, *priority in specs:
+        worker = FakeWorker(name)
+        scheduler.submit(worker, host, *priority)
+        workers.append(worker)
+    return workers
+
+
+def _started(workers):
+    return [w.name for w in workers if w.started]
+
+
+def test_job_host():
+    assert job_host(" https://CDN.Example.com:8443/a/b.ts ") == "cdn.example.com"
+
+
+def test_global_and_per_host_limits():
+    scheduler = DownloadScheduler(max_running=3, per_host=2)
+    workers = _submit(scheduler, ("a1", "a"), ("a2", "a"), ("a3", "a"), ("b1", "b"), ("b2", "b"))
+    # a 는 호스트당 2개까지, 남은 자리는 뒤에 있는 b 가 먼저 씀
+    assert _started(workers) == ["a1", "a2", "b1"]
+    assert scheduler.running_count == 3 and scheduler.queued_count == 2
+    workers[0].done.emit(True, "")
+    assert _started(workers) == ["a1", "a2", "a3", "b1"]
+    workers[3].done.emit(True, "")
+    assert _started(workers) == ["a1", "a2", "a3", "b1", "b2"]
+
+
+def test_downloaded_releases_slot_once():
+    scheduler = DownloadScheduler(max_running=1, per_host=1)
+    first, second, third = _submit(scheduler, ("1", "h"), ("2", "h"), ("3", "h"))
+    first.downloaded.emit("out.ts")  # 후처리로 넘어가면 바로 자리 반납
+    first.done.emit(True, "")        # 나중에 오는 done 은 두 번째 자리를 비우지 않음
+    assert _started([first, second, third]) == ["1", "2"]
+
+
+def test_priority_and_move_to_front():
+    scheduler = DownloadScheduler(max_running=1, per_host=1)
+    running, low, high, last = _submit(scheduler, ("run", "h"), ("low", "h"), ("high", "h", 5), ("last", "h"))
+    assert scheduler.queue_positions() == {high: 1, low: 2, last: 3}
+    scheduler.move_to_front(last)
+    assert scheduler.queue_position(last) == 1
+    scheduler.change_priority(low, -1)
+    assert scheduler.queue_positions() == {last: 1, high: 2, low: 3}
+    running.done.emit(True, "")
+    assert last.started and not high.started
+
+
+def test_cancel_and_raise_limits():
+    scheduler = DownloadScheduler(max_running=1, per_host=1)
+    workers = _submit(scheduler, ("a1", "a"), ("a2", "a"), ("a3", "a"), ("b1", "b"))
+    assert _started(workers) == ["a1"]
+    assert scheduler.cancel(workers[1]) and not scheduler.cancel(workers[1])
+    scheduler.set_limits(3, 2)  # 늘리면 바로 다음 작업 시작
+    assert _started(workers) == ["a1", "a3", "b1"]
+    assert not workers[1].started and not scheduler.is_queued(workers[1])
+
+
+def test_lowering_limits_applies_as_jobs_finish():
+    scheduler = DownloadScheduler(max_running=3, per_host=3)
+    workers = _submit(scheduler, ("1", "h"), ("2", "h"), ("3", "h"), ("4", "h"))
+    scheduler.set_limits(1, 1)
+    workers[0].done.emit(True, "")
+    workers[1].done.emit(True, "")
+    assert not workers[3].started  # 아직 하나가 실행 중
+    workers[2].done.emit(True, "")
+    assert workers[3].started
@@ -0,0 +1,53 @@
+import pytest
+
+from bench.server import SegmentServer, ServerConfig
+from transport import Transport
+
+
+@pytest.fixture
+def server():
+    srv = SegmentServer(ServerConfig(segments=4, segment_bytes=4 * 1024, latency=0.0)).start()
+    yield srv
+    srv.stop()
+
+
+def _get(transport, url):
+    resp = transport.session_for(url).get(url, timeout=5)
+    assert resp.status_code == 200
+    return resp.content
+
+
+def _pool_maxsize(transport, url):
+    adapter = transport.session_for(url).get_adapter(url)
+    return adapter._pool_maxsize, adapter._pool_connections
+
+
+def test_keepalive_reuse(server):
+    transport = Transport()
+    url = f"{server.url}/v/segment_0001.jpg"
+    for _ in range(3):
+        _get(transport, url)
+    reqs, conns = transport.connection_stats(url)
+    assert reqs == 3 and conns == 1
+    transport.close()
+
+
+def test_configure_applies_to_existing_hosts(server):
+    transport = Transport(pool_maxsize=8)
+    url = f"{server.url}/v/segment_0001.jpg"
+    session = transport.session_for(url)
+    _get(transport, url)
+    transport.configure(pool_maxsize=2, pool_connections=1)
+    # 같은 세션을 계속 쓰지만 어댑터는 새 설정으로 교체
+    assert transport.session_for(url) is session
+    assert _pool_maxsize(transport, url) == (2, 1)
+    _get(transport, url)
+    # 교체 전 통계는 누적값에 남고, 새 풀에서 연결을 하나 더 엶
+    assert transport.connection_stats(url) == (2, 2)
+    transport.close()
+
+
+def test_configure_applies_to_new_hosts():
+    transport = Transport()
+    transport.configure(pool_maxsize=5)
+    assert _pool_maxsize(transport, "http://example.invalid/a.ts") == (5, transport.pool_connections)
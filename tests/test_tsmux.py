@@ -0,0 +1,208 @@
+import io
+import struct
+
+from bench import server
+from bench.server import ServerConfig, synthetic_segment
+from tsmux import TsToMp4Remuxer
+
+
+def _boxes(data: bytes, start: int = 0, end: int = None):
+    """(종류, 본문 시작, 끝) 목록 - 크기가 범위를 넘으면 실패"""
+    end = len(data) if end is None else end
+    pos = start
+    boxes = []
+    while pos < end:
+        size, kind = struct.unpack_from(">I4s", data, pos)
+        assert size >= 8 and pos + size <= end, f"{kind} 크기 오류 ({size} @ {pos})"
+        boxes.append((kind, pos + 8, pos + size))
+        pos += size
+    return boxes
+
+
+def _child(data: bytes, parent, kind: bytes, skip: int = 0):
+    """parent 본문에서 skip 바이트(버전/플래그 등) 뒤의 kind 상자"""
+    _, start, end = parent
+    for box in _boxes(data, start + skip, end):
+        if box[0] == kind:
+            return box
+    raise AssertionError(f"{kind} 없음")
+
+
+def _remux(segments: int, chunk: int = 7000):
+    cfg = ServerConfig(segments=segments, segment_bytes=16 * 1024, segment_seconds=1.0, fps=10)
+    ts = b"".join(synthetic_segment(order, cfg) for order in range(segments))
+    out = io.BytesIO()
+    remuxer = TsToMp4Remuxer(out, fragment_duration=1.0)
+    for pos in range(0, len(ts), chunk):  # 패킷 경계와 맞지 않는 청크
+        remuxer.feed(ts[pos:pos + chunk])
+    remuxer.close()
+    return remuxer, out.getvalue()
+
+
+def test_box_structure_and_sample_count():
+    remuxer, data = _remux(segments=3)
+    top = _boxes(data)
+    kinds = [kind for kind, _, _ in top]
+    assert kinds[:2] == [b"ftyp", b"moov"]
+    assert kinds[2:] == [b"moof", b"mdat"] * remuxer.fragments
+    assert remuxer.fragments >= 2
+
+    moov = top[1]
+    assert _child(data, moov, b"mvhd")
+    trak = _child(data, moov, b"trak")
+    mdia = _child(data, trak, b"mdia")
+    hdlr = _child(data, mdia, b"hdlr")
+    assert data[hdlr[1] + 8:hdlr[1] + 12] == b"vide"
+    stsd = _child(data, _child(data, _child(data, mdia, b"minf"), b"stbl"), b"stsd")
+    avc1 = _child(data, stsd, b"avc1", skip=8)  # 버전/플래그 + 항목 수
+    assert _child(data, avc1, b"avcC", skip=78)  # VisualSampleEntry 고정 필드
+
+    # 조각마다 trun 의 샘플 크기 합 == mdat 본문, data_offset 은 mdat 본문 시작
+    samples = 0
+    for (kind, start, end), (_, mdat_start, mdat_end) in zip(top[2::2], top[3::2]):
+        traf = _child(data, (kind, start, end), b"traf")
+        _, trun_start, _ = _child(data, traf, b"trun")
+        flags = struct.unpack_from(">I", data, trun_start)[0] & 0xFFFFFF
+        count, offset = struct.unpack_from(">Ii", data, trun_start + 4)
+        entry = 16 if flags & 0x800 else 12
+        sizes = [struct.unpack_from(">I", data, trun_start + 12 + i * entry + 4)[0] for i in range(count)]
+        assert sum(sizes) == mdat_end - mdat_start
+        assert start - 8 + offset == mdat_start
+        samples += count
+    assert samples == 3 * 10
+    assert remuxer.sample_counts == {"vide": 30}
+
+
+def test_first_fragment_starts_with_keyframe():
+    _, data = _remux(segments=2)
+    top = _boxes(data)
+    traf = _child(data, top[2], b"traf")
+    _, trun_start, _ = _child(data, traf, b"trun")
+    first_flags = struct.unpack_from(">I", data, trun_start + 12 + 8)[0]
+    assert not first_flags & 0x00010000  # sample_is_non_sync_sample 이 꺼져 있음
+
+
+# ---------- AAC (ADTS) 음성 ----------
+AUDIO_PID = 0x101
+AAC_FRAME = 1024  # ADTS 프레임 하나의 샘플 수
+AAC_RATE = 48000
+
+
+def _adts_frame(n: int, payload_len: int = 200) -> bytes:
+    """AAC-LC 48kHz 스테레오 ADTS 프레임 (CRC 없음, 본문에 0xFF 없음)"""
+    length = 7 + payload_len
+    header = bytes([
+        0xFF, 0xF1,
+        (1 << 6) | (3 << 2) | (2 >> 2),                  # profile LC, 48kHz, 채널 상위 비트
+        ((2 & 0x03) << 6) | (length >> 11),
+        (length >> 3) & 0xFF,
+        ((length & 0x07) << 5) | 0x1F,
+        0xFC,
+    ])
+    return header + bytes((n + k) % 0xFE for k in range(payload_len))
+
+
+def _packets(pid: int, pes: bytes) -> bytes:
+    """PES 를 188바이트 패킷들로 (마지막 패킷은 adaptation field 로 채움)"""
+    out = bytearray()
+    first = True
+    for pos in range(0, len(pes), 184):
+        chunk = pes[pos:pos + 184]
+        header = bytes([0x47, (0x40 if first else 0) | (pid >> 8), pid & 0xFF])
+        if len(chunk) == 184:
+            out += header + b"\x10" + chunk
+        else:
+            af_total = 184 - len(chunk)
+            af = b"\x00" if af_total == 1 else bytes([af_total - 1, 0]) + b"\xFF" * (af_total - 2)
+            out += header + b"\x30" + af + chunk
+        first = False
+    return bytes(out)
+
+
+def _pmt_with_audio() -> bytes:
+    body = struct.pack(">HBBBHH", 1, 0xC1, 0, 0, 0xE000 | server.VIDEO_PID, 0xF000)
+    body += struct.pack(">BHH", 0x1B, 0xE000 | server.VIDEO_PID, 0xF000)
+    body += struct.pack(">BHH", 0x0F, 0xE000 | AUDIO_PID, 0xF000)
+    return server._section_packet(server.PMT_PID, bytes([0x02, 0xB0, len(body) + 4]) + body, 0)
+
+
+def _remux_av(segments: int, pes_bytes: int, chunk: int = 5000):
+    """영상 + ADTS 음성 TS → MP4. 음성 PES 는 pes_bytes 마다 잘라 프레임이 PES 경계에 걸치게 함"""
+    cfg = ServerConfig(segments=segments, segment_bytes=16 * 1024, segment_seconds=1.0, fps=10)
+    frame_ticks = AAC_FRAME * 90000 // AAC_RATE
+    frames_per_segment = -(-90000 // frame_ticks)
+    ts = bytearray()
+    frame_no = 0
+    for order in range(segments):
+        segment = bytearray(synthetic_segment(order, cfg))
+        segment[188:376] = _pmt_with_audio()
+        ts += segment
+        # 이 세그먼트 구간의 음성 프레임 - PES PTS 는 그 PES 에서 처음 시작하는 프레임의 시각
+        starts, stream = [], bytearray()
+        for _ in range(frames_per_segment):
+            starts.append((len(stream), server._FRAME_TICKS_BASE + frame_no * frame_ticks))
+            stream += _adts_frame(frame_no)
+            frame_no += 1
+        for pos in range(0, len(stream), pes_bytes):
+            pts = next((t for at, t in starts if at >= pos), starts[-1][1])
+            ts += _packets(AUDIO_PID, b"\x00\x00\x01\xC0\x00\x00\x80\x80\x05" + server._pts_bytes(pts)
+                           + stream[pos:pos + pes_bytes])
+    out = io.BytesIO()
+    remuxer = TsToMp4Remuxer(out, fragment_duration=1.0)
+    for pos in range(0, len(ts), chunk):
+        remuxer.feed(bytes(ts[pos:pos + chunk]))
+    remuxer.close()
+    return remuxer, out.getvalue(), frame_no
+
+
+def _audio_runs(data: bytes):
+    """조각마다 음성 트랙(track_id 2)의 (tfdt, [(duration, size)])"""
+    runs = []
+    for kind, start, end in _boxes(data):
+        if kind != b"moof":
+            continue
+        for box in _boxes(data, start, end):
+            if box[0] != b"traf":
+                continue
+            tfhd = _child(data, box, b"tfhd")
+            if struct.unpack_from(">I", data, tfhd[1] + 4)[0] != 2:
+                continue
+            tfdt = struct.unpack_from(">Q", data, _child(data, box, b"tfdt")[1] + 4)[0]
+            _, trun_start, _ = _child(data, box, b"trun")
+            count = struct.unpack_from(">I", data, trun_start + 4)[0]
+            entries = [struct.unpack_from(">II", data, trun_start + 12 + i * 12) for i in range(count)]
+            runs.append((tfdt, entries))
+    return runs
+
+
+def test_audio_track_sample_entry():
+    remuxer, data, frames = _remux_av(segments=2, pes_bytes=1000)
+    assert remuxer.sample_counts == {"vide": 20, "soun": frames}
+    moov = _boxes(data)[1]
+    traks = [box for box in _boxes(data, moov[1], moov[2]) if box[0] == b"trak"]
+    assert len(traks) == 2
+    mdia = _child(data, traks[1], b"mdia")
+    hdlr = _child(data, mdia, b"hdlr")
+    assert data[hdlr[1] + 8:hdlr[1] + 12] == b"soun"
+    mdhd = _child(data, mdia, b"mdhd")
+    assert struct.unpack_from(">I", data, mdhd[1] + 12)[0] == AAC_RATE
+    stsd = _child(data, _child(data, _child(data, mdia, b"minf"), b"stbl"), b"stsd")
+    mp4a = _child(data, stsd, b"mp4a", skip=8)
+    assert struct.unpack_from(">H", data, mp4a[1] + 16)[0] == 2  # 채널 수
+    esds = _child(data, mp4a, b"esds", skip=28)  # AudioSampleEntry 고정 필드
+    # AudioSpecificConfig: AAC-LC(2), 48kHz(3), 스테레오(2)
+    assert b"\x05\x02\x11\x90" in data[esds[1]:esds[2]]
+
+
+def test_audio_frames_split_across_pes():
+    """PES 경계에 걸친 ADTS 프레임도 온전한 샘플 하나로, 시간은 1024 샘플씩 이어짐"""
+    remuxer, data, frames = _remux_av(segments=3, pes_bytes=500)
+    runs = _audio_runs(data)
+    entries = [entry for _, run in runs for entry in run]
+    assert len(entries) == frames
+    assert all(entry == (AAC_FRAME, 200) for entry in entries)
+    # 조각의 시작 시각(tfdt)은 앞 조각들의 길이 합과 같음 (영상과 같은 기준 시각에서 시작)
+    expected = 0
+    for tfdt, run in runs:
+        assert tfdt == expected
+        expected += sum(duration for duration, _ in run)
@@ -0,0 +1,54 @@
+import pytest
+
+from bench.server import ServerConfig, synthetic_segment
+from tsvalidate import _validate_python, validate_ts
+
+_CFG = ServerConfig(segment_bytes=8 * 1024, segment_seconds=0.5, fps=4)
+
+
+def _segment() -> bytearray:
+    return bytearray(synthetic_segment(0, _CFG))
+
+
+def _break_cc(data: bytearray, packet: int = 5) -> bytearray:
+    pos = packet * 188
+    data[pos + 3] = (data[pos + 3] & 0xF0) | ((data[pos + 3] + 5) & 0x0F)
+    return data
+
+
+@pytest.fixture(params=["numpy", "python"])
+def validate(request):
+    """NumPy 경로와 순수 파이썬 경로 (NumPy 가 없을 때) 를 모두 검사"""
+    if request.param == "python":
+        return lambda data: _validate_python(memoryview(bytes(data)), True)
+    pytest.importorskip("numpy")
+    return validate_ts
+
+
+def test_valid_segment(validate):
+    check = validate(_segment())
+    assert check.ok and check.packets == len(_segment()) // 188 and check.cc_errors == 0
+
+
+def test_continuity_error_is_counted(validate):
+    check = validate(_break_cc(_segment()))
+    assert not check.ok and check.cc_errors == 2  # 끊긴 곳과 다시 이어지는 곳
+
+
+def test_bad_sync_byte(validate):
+    data = _segment()
+    data[10 * 188] = 0x00
+    check = validate(data)
+    assert not check.ok and "동기 바이트" in check.reason and check.cc_errors == 0
+
+
+def test_truncated_and_empty():
+    check = validate_ts(_segment()[:-100])
+    assert not check.ok and "188의 배수" in check.reason and check.cc_errors == 0
+    assert not validate_ts(b"").ok
+
+
+def test_html_error_page():
+    body = b"<html>" + b" " * (188 * 3 - 6)
+    check = validate_ts(body)
+    assert not check.ok and check.cc_errors == 0
@@ -0,0 +1,41 @@
+from engine import PornhubDownloadJob
+from models import JobConfig, VideoType
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.charged = []
+
+    def consume(self, host, nbytes, should_stop=None):
+        self.charged.append(nbytes)
+
+
+def _job():
+    job = PornhubDownloadJob(JobConfig(base_folder_url="https://www.pornhub.com/view_video.php?viewkey=x",
+                                       save_dir=".", out_name="v.mp4", video_type=VideoType.PORNHUB))
+    job._limiter = RecordingLimiter()
+    return job
+
+
+def _feed(job, *hooks):
+    for filename, downloaded in hooks:
+        job._progress_hook({"status": "downloading", "filename": filename, "downloaded_bytes": downloaded,
+                            "total_bytes": 1000})
+    return job._limiter.charged
+
+
+def test_increments_are_charged():
+    assert _feed(_job(), ("a.mp4", 100), ("a.mp4", 250), ("a.mp4", 250), ("a.mp4", 400)) == [100, 150, 150]
+
+
+def test_new_format_file_starts_from_zero():
+    # 영상 다 받고 오디오 포맷으로 - 카운터가 0부터 다시 시작해도 오디오 바이트를 모두 계산
+    charged = _feed(_job(), ("v.f137.mp4", 900), ("v.f140.m4a", 300), ("v.f140.m4a", 500))
+    assert charged == [900, 300, 200] and sum(charged) == 1400
+
+
+def test_fragment_retry_rewind_charges_refetched_bytes():
+    # 조각 재시도로 누적값이 700 → 600 으로 줄었다가 다시 늘어남 - 다시 받은 100 바이트도 계산
+    charged = _feed(_job(), ("a.mp4", 700), ("a.mp4", 600), ("a.mp4", 800))
+    assert charged == [700, 200]
+    assert all(n > 0 for n in charged)
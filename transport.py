@@ -0,0 +1,200 @@
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from metrics import current_timing
+
+DEFAULT_POOL_MAXSIZE = 64  # 호스트당 유지할 keep-alive 연결 수
+DEFAULT_POOL_CONNECTIONS = 4  # 세션(호스트)당 캐시할 연결 풀 수 (scheme/포트별)
+
+
+def host_key(url: str) -> str:
+    """연결 풀 키 (scheme://host:port)"""
+    p = urlparse(url)
+    port = p.port or (443 if p.scheme == "https" else 80)
+    return f"{p.scheme}://{(p.hostname or '').lower()}:{port}"
+
+
+class _TimedConnectionMixin:
+    """새 연결을 열 때 DNS 조회와 TCP 연결 시간을 현재 요청(metrics.RequestTiming)에 기록
+
+    주소를 직접 조회해 시간을 재고, 주소가 하나면 그 IP 로 연결해 같은 조회를 두 번 하지 않는다
+    (여러 개면 urllib3 가 차례로 시도하도록 호스트 이름 그대로 넘김). TLS 의 서버 이름 확인은
+    self.host 를 쓰므로 IP 로 연결해도 바뀌지 않는다.
+    """
+
+    def _new_conn(self):
+        timing = current_timing()
+        if timing is None:
+            return super()._new_conn()
+        host = self._dns_host
+        t0 = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            infos = []  # 실패는 원래 경로에서 같은 예외로 알림
+        t1 = time.perf_counter()
+        addresses = {info[4][0] for info in infos}
+        if len(addresses) == 1:
+            self._dns_host = addresses.pop()
+        try:
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = host
+        timing.dns += t1 - t0
+        timing.connect += time.perf_counter() - t1
+        timing.new_connection = True
+        return sock
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        """connect() 전체에서 DNS/TCP 연결 시간을 뺀 나머지가 TLS 핸드셰이크"""
+        timing = current_timing()
+        if timing is None:
+            return super().connect()
+        before = timing.dns + timing.connect
+        t0 = time.perf_counter()
+        super().connect()
+        timing.tls += time.perf_counter() - t0 - (timing.dns + timing.connect - before)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """연결 단계 시간을 재는 연결 클래스를 쓰는 어댑터"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def _adapters(session: requests.Session) -> List[HTTPAdapter]:
+    """세션에 마운트된 어댑터 (http/https 가 같은 어댑터면 하나로)"""
+    return list({id(a): a for a in session.adapters.values()}.values())
+
+
+def _adapter_stats(adapters: List[HTTPAdapter]) -> Tuple[int, int]:
+    """어댑터 연결 풀들의 누적 (요청 수, 새 연결 수)"""
+    requests_total = 0
+    connections = 0
+    for adapter in adapters:
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_total += pool.num_requests
+            connections += pool.num_connections
+    return requests_total, connections
+
+
+class Transport:
+    """프로세스 전역 HTTP 전송 계층
+
+    호스트마다 requests.Session 하나를 만들어 모든 워커(세그먼트 다운로드, 프로브,
+    HTTP 페이지 추출)가 공유한다. 같은 CDN 으로 가는 잡들이 keep-alive 연결을
+    재사용하므로 TCP/TLS 핸드셰이크가 줄어든다. 요청 헤더는 지금처럼 요청마다 넘긴다.
+    새 연결의 DNS/연결/TLS 시간은 metrics.RequestTiming 으로 감싼 요청에서만 기록된다.
+    """
+
+    def __init__(self, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS):
+        self.pool_maxsize = pool_maxsize
+        self.pool_connections = pool_connections
+        self._sessions: Dict[str, requests.Session] = {}
+        self._retired: Dict[str, Tuple[int, int]] = {}  # 교체된 어댑터의 누적 (요청, 새 연결)
+        self._lock = threading.Lock()
+
+    def _mount(self, session: requests.Session):
+        adapter = _TimedAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    def _make_session(self) -> requests.Session:
+        session = requests.Session()
+        self._mount(session)
+        return session
+
+    def session_for(self, url: str) -> requests.Session:
+        """URL 호스트의 공유 세션 (없으면 생성)"""
+        key = host_key(url)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self._make_session()
+            return session
+
+    def configure(self, pool_maxsize: Optional[int] = None, pool_connections: Optional[int] = None):
+        """호스트당 연결 수 변경 - 이미 만든 세션도 새 어댑터로 바꿔 다음 요청부터 적용
+
+        진행 중인 요청은 이전 어댑터의 연결로 끝나고, 반납되는 연결은 닫힌다.
+        이전 어댑터의 요청/연결 수는 connection_stats 누적값에 그대로 남긴다.
+        """
+        with self._lock:
+            if pool_maxsize is not None:
+                self.pool_maxsize = max(1, pool_maxsize)
+            if pool_connections is not None:
+                self.pool_connections = max(1, pool_connections)
+            retired = []
+            for key, session in self._sessions.items():
+                old = _adapters(session)
+                reqs, conns = _adapter_stats(old)
+                prev_reqs, prev_conns = self._retired.get(key, (0, 0))
+                self._retired[key] = (prev_reqs + reqs, prev_conns + conns)
+                self._mount(session)
+                retired.extend(old)
+        for adapter in retired:
+            adapter.close()
+
+    def connection_stats(self, url: str) -> Tuple[int, int]:
+        """호스트의 누적 (요청 수, 새 연결 수) - 차이가 keep-alive 재사용 횟수"""
+        key = host_key(url)
+        with self._lock:
+            session = self._sessions.get(key)
+            retired_reqs, retired_conns = self._retired.get(key, (0, 0))
+        if session is None:
+            return 0, 0
+        requests_total, connections = _adapter_stats(_adapters(session))
+        return retired_reqs + requests_total, retired_conns + connections
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._retired.clear()
+        for session in sessions:
+            session.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """프로세스 전역 전송 계층"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport
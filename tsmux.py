@@ -0,0 +1,642 @@
+"""ffmpeg 없이 MPEG-TS(H.264/AAC) → fragmented MP4 변환
+
+세그먼트를 받는 순서대로 feed() 에 넣으면 바로 MP4 조각(moof+mdat)을 써 나간다.
+메모리에는 조각 하나 분량(기본 2초)의 샘플만 들고 있으므로 영상 길이와 상관없이 일정하다.
+지원: H.264(stream_type 0x1B) 영상, ADTS AAC(0x0F) 음성. 나머지 스트림은 무시한다.
+"""
+import struct
+from typing import BinaryIO, Dict, List, Optional
+
+TS_PACKET_SIZE = 188
+_SYNC = 0x47
+_PTS_WRAP = 1 << 33
+
+STREAM_TYPE_H264 = 0x1B
+STREAM_TYPE_AAC = 0x0F
+
+_VIDEO_TIMESCALE = 90000
+_MOVIE_TIMESCALE = 1000
+
+# AAC sampling_frequency_index → Hz
+_AAC_SAMPLE_RATES = [96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050,
+                     16000, 12000, 11025, 8000, 7350]
+
+# sample_flags (ISO/IEC 14496-12 8.8.3.1)
+_FLAGS_SYNC = 0x02000000      # 다른 샘플에 의존하지 않음 (키프레임/오디오)
+_FLAGS_NON_SYNC = 0x01010000  # 의존함 + non-sync
+
+
+class TsMuxError(Exception):
+    """변환할 수 없는 입력 (지원하지 않는 코덱, 스트림 없음 등)"""
+
+
+# ---------- MP4 box ----------
+def _box(kind: bytes, *payloads: bytes) -> bytes:
+    body = b"".join(payloads)
+    return struct.pack(">I4s", 8 + len(body), kind) + body
+
+
+def _full_box(kind: bytes, version: int, flags: int, *payloads: bytes) -> bytes:
+    return _box(kind, struct.pack(">I", (version << 24) | flags), *payloads)
+
+
+_MATRIX = struct.pack(">9I", 0x00010000, 0, 0, 0, 0x00010000, 0, 0, 0, 0x40000000)
+
+
+# ---------- H.264 ----------
+def _split_nals(data: bytes) -> List[bytes]:
+    """Annex B 바이트 스트림 → NAL 목록 (시작 코드 제거)"""
+    nals = []
+    i = data.find(b"\x00\x00\x01")
+    while i >= 0:
+        start = i + 3
+        j = data.find(b"\x00\x00\x01", start)
+        nal = data[start:] if j < 0 else data[start:j]
+        nal = nal.rstrip(b"\x00")  # 다음 4바이트 시작 코드의 앞 0 / trailing zero
+        if nal:
+            nals.append(nal)
+        i = j
+    return nals
+
+
+class _BitReader:
+    def __init__(self, data: bytes):
+        # emulation prevention byte(00 00 03) 제거
+        self._data = data.replace(b"\x00\x00\x03", b"\x00\x00")
+        self._pos = 0
+
+    def u(self, n: int) -> int:
+        value = 0
+        for _ in range(n):
+            byte = self._data[self._pos >> 3]
+            value = (value << 1) | ((byte >> (7 - (self._pos & 7))) & 1)
+            self._pos += 1
+        return value
+
+    def ue(self) -> int:
+        zeros = 0
+        while self.u(1) == 0:
+            zeros += 1
+        return (1 << zeros) - 1 + self.u(zeros)
+
+    def se(self) -> int:
+        k = self.ue()
+        return (k + 1) // 2 if k & 1 else -(k // 2)
+
+
+_HIGH_PROFILES = {100, 110, 122, 244, 44, 83, 86, 118, 128, 138, 139, 134, 135}
+
+
+def parse_sps(sps: bytes) -> dict:
+    """SPS 에서 해상도와 avcC 에 필요한 값 추출"""
+    r = _BitReader(sps[1:])  # NAL 헤더 제외
+    profile = r.u(8)
+    r.u(8)  # constraint flags
+    r.u(8)  # level
+    r.ue()  # seq_parameter_set_id
+    chroma_format = 1
+    bit_depth_luma = bit_depth_chroma = 8
+    if profile in _HIGH_PROFILES:
+        chroma_format = r.ue()
+        if chroma_format == 3:
+            r.u(1)  # separate_colour_plane_flag
+        bit_depth_luma = r.ue() + 8
+        bit_depth_chroma = r.ue() + 8
+        r.u(1)  # qpprime_y_zero_transform_bypass_flag
+        if r.u(1):  # seq_scaling_matrix_present_flag
+            for i in range(8 if chroma_format != 3 else 12):
+                if r.u(1):
+                    size = 16 if i < 6 else 64
+                    last = nxt = 8
+                    for _ in range(size):
+                        if nxt != 0:
+                            nxt = (last + r.se() + 256) % 256
+                        last = last if nxt == 0 else nxt
+    r.ue()  # log2_max_frame_num_minus4
+    poc_type = r.ue()
+    if poc_type == 0:
+        r.ue()
+    elif poc_type == 1:
+        r.u(1)
+        r.se()
+        r.se()
+        for _ in range(r.ue()):
+            r.se()
+    r.ue()  # max_num_ref_frames
+    r.u(1)  # gaps_in_frame_num_value_allowed_flag
+    width_mbs = r.ue() + 1
+    height_units = r.ue() + 1
+    frame_mbs_only = r.u(1)
+    if not frame_mbs_only:
+        r.u(1)  # mb_adaptive_frame_field_flag
+    r.u(1)  # direct_8x8_inference_flag
+    crop_left = crop_right = crop_top = crop_bottom = 0
+    if r.u(1):
+        crop_left, crop_right, crop_top, crop_bottom = r.ue(), r.ue(), r.ue(), r.ue()
+    if chroma_format == 0:
+        crop_x, crop_y = 1, 2 - frame_mbs_only
+    else:
+        sub_w = 1 if chroma_format == 3 else 2
+        sub_h = 2 if chroma_format == 1 else 1
+        crop_x, crop_y = sub_w, sub_h * (2 - frame_mbs_only)
+    return {
+        "profile": profile,
+        "chroma_format": chroma_format,
+        "bit_depth_luma": bit_depth_luma,
+        "bit_depth_chroma": bit_depth_chroma,
+        "width": width_mbs * 16 - crop_x * (crop_left + crop_right),
+        "height": (2 - frame_mbs_only) * height_units * 16 - crop_y * (crop_top + crop_bottom),
+    }
+
+
+# ---------- 트랙 ----------
+class _Sample:
+    __slots__ = ("data", "dts", "cts", "sync", "duration")
+
+    def __init__(self, data: bytes, dts: int, cts: int, sync: bool):
+        self.data = data
+        self.dts = dts
+        self.cts = cts
+        self.sync = sync
+        self.duration = 0
+
+
+class _Track:
+    kind = b""
+
+    def __init__(self, track_id: int, pid: int):
+        self.track_id = track_id
+        self.pid = pid
+        self.timescale = _VIDEO_TIMESCALE
+        self.samples: List[_Sample] = []  # 다음 조각에 들어갈 샘플 (duration 확정된 것)
+        self._pending: Optional[_Sample] = None  # 다음 샘플이 와야 duration 이 정해짐
+        self._last_duration = 0
+        self.sample_count = 0
+        self.end_time = 0  # 마지막으로 확정된 샘플의 끝 (90kHz)
+        self.first_dts: Optional[int] = None
+
+    @property
+    def ready(self) -> bool:
+        raise NotImplementedError
+
+    def _push(self, sample: _Sample):
+        if self.first_dts is None:
+            self.first_dts = sample.dts
+        prev = self._pending
+        if prev is not None:
+            prev.duration = max(0, sample.dts - prev.dts)
+            if prev.duration == 0:
+                prev.duration = self._last_duration
+            else:
+                self._last_duration = prev.duration
+            self._commit(prev)
+        self._pending = sample
+
+    def _commit(self, sample: _Sample):
+        self.samples.append(sample)
+        self.sample_count += 1
+        self.end_time = sample.dts + sample.duration
+
+    def flush_pending(self, default_duration: int):
+        if self._pending is not None:
+            self._pending.duration = self._last_duration or default_duration
+            self._commit(self._pending)
+            self._pending = None
+
+    def buffered_duration(self) -> int:
+        if not self.samples:
+            return 0
+        return self.end_time - self.samples[0].dts
+
+
+class _VideoTrack(_Track):
+    kind = b"vide"
+
+    def __init__(self, track_id: int, pid: int):
+        super().__init__(track_id, pid)
+        self.sps: Optional[bytes] = None
+        self.pps: Optional[bytes] = None
+        self.info: dict = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.sps is not None and self.pps is not None
+
+    def add_pes(self, payload: bytes, pts: Optional[int], dts: Optional[int]):
+        """PES 하나 = 액세스 유닛 하나 (HLS TS 기준)"""
+        if pts is None:
+            return  # 타임스탬프 없는 조각은 버림
+        dts = pts if dts is None else dts
+        out = []
+        sync = False
+        for nal in _split_nals(payload):
+            nal_type = nal[0] & 0x1F
+            if nal_type == 9:  # AUD
+                continue
+            if nal_type == 7:
+                if self.sps is None:
+                    self.sps = nal
+                    self.info = parse_sps(nal)
+                if nal == self.sps:
+                    continue
+            elif nal_type == 8:
+                if self.pps is None:
+                    self.pps = nal
+                if nal == self.pps:
+                    continue
+            elif nal_type == 5:
+                sync = True
+            out.append(struct.pack(">I", len(nal)))
+            out.append(nal)
+        if out:
+            self._push(_Sample(b"".join(out), dts, pts - dts, sync))
+
+    def sample_entry(self) -> bytes:
+        sps, pps, info = self.sps, self.pps, self.info
+        avcc = bytes([1, sps[1], sps[2], sps[3], 0xFF, 0xE1]) + struct.pack(">H", len(sps)) + sps
+        avcc += bytes([1]) + struct.pack(">H", len(pps)) + pps
+        if sps[1] in (100, 110, 122, 144):
+            avcc += bytes([0xFC | info["chroma_format"], 0xF8 | (info["bit_depth_luma"] - 8),
+                           0xF8 | (info["bit_depth_chroma"] - 8), 0])
+        return _box(
+            b"avc1",
+            bytes(6), struct.pack(">H", 1),              # reserved, data_reference_index
+            bytes(16),                                    # pre_defined/reserved
+            struct.pack(">HH", info["width"], info["height"]),
+            struct.pack(">II", 0x00480000, 0x00480000),   # 72 dpi
+            bytes(4), struct.pack(">H", 1),               # reserved, frame_count
+            bytes(32),                                    # compressorname
+            struct.pack(">Hh", 0x0018, -1),
+            _box(b"avcC", avcc),
+        )
+
+    def media_header(self) -> bytes:
+        return _full_box(b"vmhd", 0, 1, bytes(8))
+
+    @property
+    def size(self):
+        return self.info.get("width", 0), self.info.get("height", 0)
+
+
+class _AudioTrack(_Track):
+    kind = b"soun"
+
+    def __init__(self, track_id: int, pid: int):
+        super().__init__(track_id, pid)
+        self.config: Optional[bytes] = None  # AudioSpecificConfig
+        self.channels = 2
+        self._carry = b""          # 다음 PES 로 이어지는 ADTS 프레임 앞부분
+        self._next_dts: Optional[int] = None  # 다음 프레임 시작 (90kHz)
+
+    @property
+    def ready(self) -> bool:
+        return self.config is not None
+
+    def add_pes(self, payload: bytes, pts: Optional[int], dts: Optional[int]):
+        data = self._carry + payload
+        carried = len(self._carry)
+        self._carry = b""
+        pos = 0
+        first_new = True
+        while pos + 7 <= len(data):
+            if data[pos] != 0xFF or (data[pos + 1] & 0xF0) != 0xF0:
+                pos += 1  # 동기 단어 찾기
+                continue
+            header_len = 7 if data[pos + 1] & 0x01 else 9
+            frame_len = ((data[pos + 3] & 0x03) << 11) | (data[pos + 4] << 3) | (data[pos + 5] >> 5)
+            if frame_len < header_len:
+                pos += 1
+                continue
+            if pos + frame_len > len(data):
+                break
+            if self.config is None:
+                profile = ((data[pos + 2] >> 6) & 0x03) + 1
+                sf_index = (data[pos + 2] >> 2) & 0x0F
+                if sf_index >= len(_AAC_SAMPLE_RATES):
+                    raise TsMuxError(f"지원하지 않는 AAC 샘플레이트 인덱스: {sf_index}")
+                self.channels = ((data[pos + 2] & 0x01) << 2) | (data[pos + 3] >> 6)
+                self.timescale = _AAC_SAMPLE_RATES[sf_index]
+                self.config = struct.pack(">H", (profile << 11) | (sf_index << 7) | (self.channels << 3))
+            blocks = (data[pos + 6] & 0x03) + 1
+            # 이번 PES 에서 시작한 첫 프레임은 PES 의 PTS 를 따름, 나머지는 이어서 계산
+            if pos >= carried and first_new:
+                first_new = False
+                if pts is not None:
+                    self._next_dts = pts
+            if self._next_dts is not None:
+                frame_ticks = blocks * 1024 * _VIDEO_TIMESCALE // self.timescale
+                self._push(_Sample(data[pos + header_len:pos + frame_len], self._next_dts, 0, True))
+                self._next_dts += frame_ticks
+            pos += frame_len
+        self._carry = data[pos:]
+
+    def sample_entry(self) -> bytes:
+        config = self.config
+        dec_specific = bytes([0x05, len(config)]) + config
+        dec_config = bytes([0x04, 13 + len(dec_specific), 0x40, 0x15]) + bytes(11) + dec_specific
+        es = bytes([0x03, 3 + len(dec_config) + 3]) + struct.pack(">HB", self.track_id, 0) + dec_config
+        es += bytes([0x06, 0x01, 0x02])
+        return _box(
+            b"mp4a",
+            bytes(6), struct.pack(">H", 1),
+            bytes(8),
+            struct.pack(">HH", self.channels, 16),
+            bytes(4),
+            struct.pack(">I", (self.timescale if self.timescale < 65536 else 0) << 16),
+            _full_box(b"esds", 0, 0, es),
+        )
+
+    def media_header(self) -> bytes:
+        return _full_box(b"smhd", 0, 0, bytes(4))
+
+    @property
+    def size(self):
+        return 0, 0
+
+
+# ---------- 변환기 ----------
+class TsToMp4Remuxer:
+    """MPEG-TS 바이트를 받아 fragmented MP4 를 out 에 씀
+
+    - feed(): 임의 크기 청크 (패킷 경계와 상관없음)
+    - close(): 남은 샘플을 마지막 조각으로 쓰고, out 이 seek 가능하면 전체 길이(mehd) 기록
+    - 모든 트랙의 코덱 설정(SPS/PPS, AAC 설정)을 알기 전까지는 샘플을 모아 둔다
+    """
+
+    def __init__(self, out: BinaryIO, fragment_duration: float = 2.0):
+        self._out = out
+        self._fragment_ticks = int(fragment_duration * _VIDEO_TIMESCALE)
+        self._buf = bytearray()
+        self._pmt_pids = set()
+        self._tracks: Dict[int, _Track] = {}   # PID → 트랙
+        self._pes: Dict[int, bytearray] = {}   # PID → 모으는 중인 PES
+        self._base_ts = 0                      # 모든 트랙 공통 기준 시각 (90kHz, 헤더 쓸 때 정함)
+        self._last_raw: Dict[int, int] = {}    # PID → 직전 PTS (33비트 wrap 보정용)
+        self._wrap: Dict[int, int] = {}
+        self._header_written = False
+        self._mehd_pos: Optional[int] = None
+        self._sequence = 0
+        self.fragments = 0
+        self.bytes_in = 0
+
+    # ----- TS -----
+    def feed(self, data):
+        self.bytes_in += len(data)
+        buf = self._buf
+        buf += data
+        n = len(buf)
+        pos = 0
+        while pos + TS_PACKET_SIZE <= n:
+            if buf[pos] != _SYNC:
+                nxt = buf.find(b"\x47", pos + 1)  # 동기 잃음 → 다음 0x47 부터
+                pos = n if nxt < 0 else nxt
+                continue
+            self._packet(buf, pos)
+            pos += TS_PACKET_SIZE
+        del buf[:pos]
+
+    def _packet(self, buf: bytearray, pos: int):
+        b1 = buf[pos + 1]
+        pid = ((b1 & 0x1F) << 8) | buf[pos + 2]
+        afc = (buf[pos + 3] >> 4) & 0x03
+        if not afc & 0x01:
+            return  # 페이로드 없음
+        start = pos + 4
+        if afc & 0x02:
+            start += 1 + buf[pos + 4]
+        end = pos + TS_PACKET_SIZE
+        if start >= end:
+            return
+        pusi = b1 & 0x40
+        track = self._tracks.get(pid)
+        if track is not None:
+            pes = self._pes.get(pid)
+            if pusi:
+                if pes:
+                    self._pes_done(track, pes)
+                self._pes[pid] = bytearray(buf[start:end])
+            elif pes is not None:
+                pes += buf[start:end]
+        elif pid == 0:
+            if pusi:
+                self._parse_pat(bytes(buf[start:end]))
+        elif pid in self._pmt_pids and pusi:
+            self._parse_pmt(bytes(buf[start:end]))
+
+    def _parse_pat(self, payload: bytes):
+        section = payload[1 + payload[0]:]
+        length = ((section[1] & 0x0F) << 8) | section[2]
+        for i in range(8, 3 + length - 4, 4):
+            program = (section[i] << 8) | section[i + 1]
+            if program != 0:
+                self._pmt_pids.add(((section[i + 2] & 0x1F) << 8) | section[i + 3])
+
+    def _parse_pmt(self, payload: bytes):
+        if self._tracks:
+            return  # 첫 PMT 기준으로 트랙 고정
+        section = payload[1 + payload[0]:]
+        length = ((section[1] & 0x0F) << 8) | section[2]
+        i = 12 + (((section[10] & 0x0F) << 8) | section[11])
+        end = 3 + length - 4
+        video = audio = None
+        while i + 5 <= end:
+            stream_type = section[i]
+            pid = ((section[i + 1] & 0x1F) << 8) | section[i + 2]
+            if stream_type == STREAM_TYPE_H264 and video is None:
+                video = pid
+            elif stream_type == STREAM_TYPE_AAC and audio is None:
+                audio = pid
+            i += 5 + (((section[i + 3] & 0x0F) << 8) | section[i + 4])
+        if video is None and audio is None:
+            raise TsMuxError("H.264/AAC 스트림이 없습니다")
+        track_id = 1
+        if video is not None:
+            self._tracks[video] = _VideoTrack(track_id, video)
+            track_id += 1
+        if audio is not None:
+            self._tracks[audio] = _AudioTrack(track_id, audio)
+
+    @staticmethod
+    def _read_ts(b: bytes, i: int) -> int:
+        return (((b[i] >> 1) & 0x07) << 30) | (b[i + 1] << 22) | ((b[i + 2] >> 1) << 15) \
+            | (b[i + 3] << 7) | (b[i + 4] >> 1)
+
+    def _unwrap(self, pid: int, ts: int) -> int:
+        """33비트 PTS 가 한 바퀴 돌면 이어지게 보정"""
+        last = self._last_raw.get(pid)
+        if last is not None and ts < last - (_PTS_WRAP >> 1):
+            self._wrap[pid] = self._wrap.get(pid, 0) + _PTS_WRAP
+        self._last_raw[pid] = ts
+        return ts + self._wrap.get(pid, 0)
+
+    def _pes_done(self, track: _Track, pes: bytearray):
+        if len(pes) < 9 or pes[0] != 0 or pes[1] != 0 or pes[2] != 1:
+            return
+        flags = pes[7]
+        header_end = 9 + pes[8]
+        pts = dts = None
+        if flags & 0x80:
+            pts = self._unwrap(track.pid, self._read_ts(pes, 9))
+            if flags & 0x40:
+                dts = pts - ((self._read_ts(pes, 9) - self._read_ts(pes, 14)) % _PTS_WRAP)
+        track.add_pes(bytes(pes[header_end:]), pts, dts)
+        self._maybe_flush()
+
+    # ----- MP4 -----
+    def _ordered_tracks(self) -> List[_Track]:
+        return sorted(self._tracks.values(), key=lambda t: t.track_id)
+
+    def _write_header(self):
+        tracks = [t for t in self._ordered_tracks() if t.ready]
+        if not tracks:
+            raise TsMuxError("코덱 설정(SPS/PPS, AAC)을 찾지 못했습니다")
+        # 설정을 끝내 못 찾은 트랙은 버림
+        self._tracks = {t.pid: t for t in tracks}
+        # 가장 먼저 디코딩되는 샘플을 0 으로 (트랙 간 싱크는 유지)
+        firsts = [t.first_dts for t in tracks if t.first_dts is not None]
+        self._base_ts = min(firsts) if firsts else 0
+        ftyp = _box(b"ftyp", b"isom", struct.pack(">I", 0x200), b"isom", b"iso5", b"avc1", b"mp41")
+        traks = b"".join(self._trak(t) for t in tracks)
+        trex = b"".join(_full_box(b"trex", 0, 0, struct.pack(">5I", t.track_id, 1, 0, 0, 0)) for t in tracks)
+        mehd = _full_box(b"mehd", 1, 0, struct.pack(">Q", 0))
+        mvhd = _full_box(
+            b"mvhd", 0, 0,
+            struct.pack(">IIII", 0, 0, _MOVIE_TIMESCALE, 0),
+            struct.pack(">IH", 0x00010000, 0x0100), bytes(10), _MATRIX, bytes(24),
+            struct.pack(">I", len(tracks) + 1),
+        )
+        moov_prefix = 8 + len(mvhd) + len(traks)
+        moov = _box(b"moov", mvhd, traks, _box(b"mvex", mehd, trex))
+        try:
+            start = self._out.tell()
+            # mehd 의 duration 필드 위치 (ftyp + moov 헤더 + mvhd + trak + mvex 헤더 + mehd 헤더)
+            self._mehd_pos = start + len(ftyp) + moov_prefix + 8 + 12
+        except (AttributeError, OSError):
+            self._mehd_pos = None
+        self._out.write(ftyp)
+        self._out.write(moov)
+        self._header_written = True
+
+    def _trak(self, t: _Track) -> bytes:
+        width, height = t.size
+        tkhd = _full_box(
+            b"tkhd", 0, 3,
+            struct.pack(">IIIII", 0, 0, t.track_id, 0, 0), bytes(8),
+            struct.pack(">hhhH", 0, 0, 0x0100 if t.kind == b"soun" else 0, 0), _MATRIX,
+            struct.pack(">II", width << 16, height << 16),
+        )
+        mdhd = _full_box(b"mdhd", 0, 0, struct.pack(">IIIIHH", 0, 0, t.timescale, 0, 0x55C4, 0))
+        name = b"VideoHandler\x00" if t.kind == b"vide" else b"SoundHandler\x00"
+        hdlr = _full_box(b"hdlr", 0, 0, bytes(4), t.kind, bytes(12), name)
+        dinf = _box(b"dinf", _full_box(b"dref", 0, 0, struct.pack(">I", 1), _full_box(b"url ", 0, 1)))
+        stbl = _box(
+            b"stbl",
+            _full_box(b"stsd", 0, 0, struct.pack(">I", 1), t.sample_entry()),
+            _full_box(b"stts", 0, 0, bytes(4)),
+            _full_box(b"stsc", 0, 0, bytes(4)),
+            _full_box(b"stsz", 0, 0, bytes(8)),
+            _full_box(b"stco", 0, 0, bytes(4)),
+        )
+        minf = _box(b"minf", t.media_header(), dinf, stbl)
+        return _box(b"trak", tkhd, _box(b"mdia", mdhd, hdlr, minf))
+
+    def _to_track_time(self, t: _Track, ticks: int) -> int:
+        if t.timescale == _VIDEO_TIMESCALE:
+            return ticks
+        return ticks * t.timescale // _VIDEO_TIMESCALE
+
+    def _maybe_flush(self):
+        """영상 키프레임 직전에서 조각 단위로 내보냄 (영상이 없으면 오디오 길이 기준)"""
+        if not self._header_written:
+            if not all(t.ready for t in self._tracks.values()):
+                # 설정이 안 나온 트랙 때문에 무한정 모으지 않도록 제한
+                if sum(len(t.samples) for t in self._tracks.values()) < 2000:
+                    return
+            self._write_header()
+        video = next((t for t in self._tracks.values() if t.kind == b"vide"), None)
+        lead = video or next(iter(self._tracks.values()))
+        if lead.buffered_duration() < self._fragment_ticks:
+            return
+        if video is not None and lead.buffered_duration() < self._fragment_ticks * 10:
+            pending = video._pending
+            if pending is None or not pending.sync:
+                return  # 다음 조각은 키프레임으로 시작 (GOP 가 아주 길면 메모리 제한을 위해 그냥 자름)
+        self._write_fragment()
+
+    def _write_fragment(self):
+        tracks = [t for t in self._ordered_tracks() if t.samples]
+        if not tracks:
+            return
+        self._sequence += 1
+        # data_offset 은 moof 크기를 알아야 하므로 한 번 만들어 크기를 잰 뒤 다시 만듦
+        moof = self._moof(tracks, 0)
+        moof = self._moof(tracks, len(moof))
+        payload_size = sum(len(s.data) for t in tracks for s in t.samples)
+        self._out.write(moof)
+        self._out.write(struct.pack(">I4s", 8 + payload_size, b"mdat"))
+        for t in tracks:
+            for s in t.samples:
+                self._out.write(s.data)
+            t.samples = []
+        self.fragments += 1
+
+    def _moof(self, tracks: List[_Track], moof_size: int) -> bytes:
+        trafs = []
+        offset = moof_size + 8  # mdat 헤더 뒤
+        for t in tracks:
+            samples = t.samples
+            video = t.kind == b"vide"
+            flags = 0x000001 | 0x000100 | 0x000200 | 0x000400 | (0x000800 if video else 0)
+            entries = bytearray()
+            for s in samples:
+                duration = self._to_track_time(t, s.dts + s.duration) - self._to_track_time(t, s.dts)
+                entries += struct.pack(">III", duration, len(s.data), _FLAGS_SYNC if s.sync else _FLAGS_NON_SYNC)
+                if video:
+                    entries += struct.pack(">I", max(0, s.cts))
+            trun = _full_box(b"trun", 0, flags, struct.pack(">Ii", len(samples), offset), bytes(entries))
+            tfhd = _full_box(b"tfhd", 0, 0x020000, struct.pack(">I", t.track_id))
+            tfdt = _full_box(b"tfdt", 1, 0, struct.pack(">Q", max(0, self._to_track_time(t, samples[0].dts - self._base_ts))))
+            trafs.append(_box(b"traf", tfhd, tfdt, trun))
+            offset += sum(len(s.data) for s in samples)
+        return _box(b"moof", _full_box(b"mfhd", 0, 0, struct.pack(">I", self._sequence)), *trafs)
+
+    def close(self):
+        """남은 PES/샘플을 마지막 조각으로 쓰고 마무리"""
+        for pid, pes in list(self._pes.items()):
+            track = self._tracks.get(pid)
+            if track is not None and pes:
+                self._pes_done(track, pes)
+        self._pes.clear()
+        if not self._tracks:
+            raise TsMuxError("PAT/PMT 를 찾지 못했습니다 (MPEG-TS 가 아님)")
+        for t in self._tracks.values():
+            t.flush_pending(3000 if t.kind == b"vide" else 1024 * _VIDEO_TIMESCALE // t.timescale)
+        if not self._header_written:
+            self._write_header()
+        self._write_fragment()
+        if self._mehd_pos is not None:
+            duration = max(t.end_time for t in self._tracks.values()) - self._base_ts
+            try:
+                here = self._out.tell()
+                self._out.seek(self._mehd_pos)
+                self._out.write(struct.pack(">Q", duration * _MOVIE_TIMESCALE // _VIDEO_TIMESCALE))
+                self._out.seek(here)
+            except (AttributeError, OSError):
+                pass
+
+    @property
+    def sample_counts(self) -> Dict[str, int]:
+        return {t.kind.decode(): t.sample_count for t in self._tracks.values()}
+
+
+def remux_file(ts_path: str, mp4_path: str, chunk_size: int = 1024 * 1024) -> TsToMp4Remuxer:
+    """.ts 파일을 청크 단위로 읽어 MP4 로 (메모리는 조각 하나 분량)"""
+    with open(ts_path, "rb") as src, open(mp4_path, "wb") as dst:
+        remuxer = TsToMp4Remuxer(dst)
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            remuxer.feed(chunk)
+        remuxer.close()
+    return remuxer
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+
+from buffers import TS_SYNC_BYTE
+from tsmux import TS_PACKET_SIZE
+
+NULL_PID = 0x1FFF  # 널 패킷은 연속성 카운터 검사 제외
+
+
+@dataclass
+class TsCheck:
+    """세그먼트 검증 결과"""
+    ok: bool
+    packets: int = 0
+    reason: str = ""     # 실패 이유 (ok 면 빈 문자열)
+    cc_errors: int = 0   # 연속성 카운터가 끊긴 횟수
+
+
+def validate_ts(data, check_continuity: bool = True) -> TsCheck:
+    """세그먼트 전체를 188바이트 패킷 단위로 검사
+
+    - 길이가 188의 배수인지 (잘린 세그먼트)
+    - 모든 패킷의 동기 바이트가 0x47 인지 (HTML 오류 페이지 등)
+    - PID 별 연속성 카운터가 1씩 증가하는지 (중복 1회, discontinuity 표시는 허용)
+    NumPy 가 있으면 패킷 배열을 (N, 188) 뷰로 보고 한 번에 계산한다.
+    """
+    length = len(data)
+    if length == 0:
+        return TsCheck(False, 0, "빈 세그먼트")
+    if length % TS_PACKET_SIZE:
+        return TsCheck(False, length // TS_PACKET_SIZE,
+                       f"길이 {length} 가 188의 배수가 아님 (잘린 세그먼트)")
+    try:
+        import numpy as np
+    except ImportError:
+        return _validate_python(memoryview(data), check_continuity)
+
+    pkts = np.frombuffer(data, dtype=np.uint8).reshape(-1, TS_PACKET_SIZE)
+    count = pkts.shape[0]
+    bad_sync = np.flatnonzero(pkts[:, 0] != TS_SYNC_BYTE)
+    if bad_sync.size:
+        return TsCheck(False, count, f"패킷 {int(bad_sync[0])} 동기 바이트 오류 (총 {bad_sync.size}개)")
+    if not check_continuity:
+        return TsCheck(True, count)
+
+    b1, b3 = pkts[:, 1].astype(np.uint16), pkts[:, 3]
+    pid = ((b1 & 0x1F) << 8) | pkts[:, 2]
+    afc = (b3 >> 4) & 0x03
+    cc = (b3 & 0x0F).astype(np.int16)
+    has_payload = (afc & 0x01).astype(bool)
+    # adaptation field 가 있고 길이 > 0 이면 다음 바이트의 최상위 비트가 discontinuity_indicator
+    discontinuity = ((afc & 0x02) != 0) & (pkts[:, 4] > 0) & ((pkts[:, 5] & 0x80) != 0)
+
+    # PID 별로 묶어 (안정 정렬이라 같은 PID 안에서는 원래 순서 유지) 이웃끼리 비교
+    order = np.argsort(pid, kind="stable")
+    spid, scc = pid[order], cc[order]
+    same = spid[1:] == spid[:-1]
+    diff = (scc[1:] - scc[:-1]) % 16
+    cur_payload = has_payload[order][1:]
+    ok = np.where(cur_payload, (diff == 1) | (diff == 0), diff == 0)
+    ok |= discontinuity[order][1:] | (spid[1:] == NULL_PID)
+    cc_errors = int(np.count_nonzero(same & ~ok))
+    if cc_errors:
+        return TsCheck(False, count, f"연속성 카운터 오류 {cc_errors}회", cc_errors)
+    return TsCheck(True, count)
+
+
+def _validate_python(view: memoryview, check_continuity: bool) -> TsCheck:
+    """NumPy 가 없을 때 (동기 바이트는 슬라이싱으로, 연속성은 패킷 루프로)"""
+    count = len(view) // TS_PACKET_SIZE
+    if view[::TS_PACKET_SIZE].tobytes() != bytes([TS_SYNC_BYTE]) * count:
+        return TsCheck(False, count, "동기 바이트 오류")
+    if not check_continuity:
+        return TsCheck(True, count)
+    last = {}
+    cc_errors = 0
+    for i in range(0, len(view), TS_PACKET_SIZE):
+        pid = ((view[i + 1] & 0x1F) << 8) | view[i + 2]
+        if pid == NULL_PID:
+            continue
+        afc = (view[i + 3] >> 4) & 0x03
+        cc = view[i + 3] & 0x0F
+        prev = last.get(pid)
+        last[pid] = cc
+        if prev is None:
+            continue
+        if afc & 0x02 and view[i + 4] > 0 and view[i + 5] & 0x80:
+            continue
+        diff = (cc - prev) % 16
+        if diff not in ((0, 1) if afc & 0x01 else (0,)):
+            cc_errors += 1
+    if cc_errors:
+        return TsCheck(False, count, f"연속성 카운터 오류 {cc_errors}회", cc_errors)
+    return TsCheck(True, count)
@@ -1,18 +1,25 @@
 # ui.py
 import os
-import re
+import sys
 from typing import Dict, Optional
 
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QLabel, QPushButton,
-    QFileDialog, QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox,
-    QMessageBox, QTextEdit, QSpinBox, QRadioButton, QButtonGroup
+    QFileDialog, QTableView, QHeaderView, QCheckBox,
+    QMessageBox, QTextEdit, QSpinBox, QRadioButton, QButtonGroup, QComboBox
 )
 
+from jobtable import COL_CHECK, COL_DIR, COL_NAME, COL_PROGRESS, COL_URL, CheckBoxDelegate, JobTableModel, \
+    ProgressDelegate
+from journal import find_journal
 from models import JobConfig, VideoType
-from workers import DownloadWorker, PornhubDownloadWorker
-from utils import parse_headers_text
+from workers import DownloadWorker, PornhubDownloadWorker, QtPostProcessQueue, QtProgressBus
+from scheduler import DownloadScheduler, job_host
+from postprocess import format_durations
+from progress import format_progress
+from ratelimit import get_limiter, parse_limit_rules
+from utils import parse_headers_text, sanitize_filename
 
 
 class App(QWidget):
@@ -94,6 +101,37 @@ class App(QWidget):
         self.stop404_spin.setEnabled(False)  # 자동 탐지 시 비활성화
         adv.addWidget(QLabel("연속404 임계"))
         adv.addWidget(self.stop404_spin)
+
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, 32)
+        self.concurrency_spin.setValue(4)
+        self.concurrency_spin.setToolTip("동시에 받을 세그먼트 수 (1=순차)")
+        adv.addWidget(QLabel("동시 요청"))
+        adv.addWidget(self.concurrency_spin)
+
+        self.adaptive_chk = QCheckBox("자동 조절")
+        self.adaptive_chk.setChecked(True)
+        self.adaptive_chk.setToolTip("응답 지연/오류에 따라 호스트별 동시 요청 수를 자동으로 늘리고 줄입니다 "
+                                     "(동시 요청 값에서 시작)")
+        adv.addWidget(self.adaptive_chk)
+
+        self.stream_remux_chk = QCheckBox("스트리밍 변환")
+        self.stream_remux_chk.setToolTip("세그먼트를 받는 대로 변환기로 넘겨 .ts 임시 파일 없이 MP4를 만듭니다 "
+                                         "(중단 후 이어받기 불가, ffmpeg가 없으면 내장 변환기 사용)")
+        adv.addWidget(self.stream_remux_chk)
+
+        self.remuxer_combo = QComboBox()
+        self.remuxer_combo.addItem("자동", "auto")
+        self.remuxer_combo.addItem("ffmpeg", "ffmpeg")
+        self.remuxer_combo.addItem("내장", "builtin")
+        self.remuxer_combo.setToolTip("TS→MP4 변환기 (자동: ffmpeg가 없으면 내장 변환기 사용)")
+        adv.addWidget(QLabel("변환기"))
+        adv.addWidget(self.remuxer_combo)
+
+        self.profile_chk = QCheckBox("프로파일링")
+        self.profile_chk.setToolTip("새 작업의 CPU(cProfile)·메모리(tracemalloc) 프로파일을 "
+                                    "~/.segmentgrabber/profiles 에 기록하고 상위 항목을 상태에 표시합니다")
+        adv.addWidget(self.profile_chk)
         v.addLayout(adv)
 
         # ── 헤더/쿠키 입력
@@ -108,48 +146,129 @@ class App(QWidget):
         self.btn_add = QPushButton("추가")
         self.btn_start = QPushButton("선택 다운로드 시작")
         self.btn_stop = QPushButton("선택 중지")
+        self.btn_resume = QPushButton("선택 재개")
+        self.btn_resume.setToolTip("중단되거나 실패한 다운로드를 받은 곳부터 이어받습니다")
         self.btn_remove = QPushButton("선택 제거")
         btns.addWidget(self.btn_add)
         btns.addWidget(self.btn_start)
         btns.addWidget(self.btn_stop)
+        btns.addWidget(self.btn_resume)
         btns.addWidget(self.btn_remove)
         v.addLayout(btns)
 
+        # ── 대기열 (동시 실행 제한 / 우선순위)
+        queue_layout = QHBoxLayout()
+        self.max_jobs_spin = QSpinBox()
+        self.max_jobs_spin.setRange(1, 50)
+        self.max_jobs_spin.setValue(3)
+        queue_layout.addWidget(QLabel("동시 작업"))
+        queue_layout.addWidget(self.max_jobs_spin)
+        self.per_host_spin = QSpinBox()
+        self.per_host_spin.setRange(1, 50)
+        self.per_host_spin.setValue(2)
+        queue_layout.addWidget(QLabel("호스트당"))
+        queue_layout.addWidget(self.per_host_spin)
+        self.pool_spin = QSpinBox()
+        self.pool_spin.setRange(1, 256)
+        self.pool_spin.setValue(64)  # transport.DEFAULT_POOL_MAXSIZE (시작 때 requests 를 불러오지 않으려고 값으로)
+        self.pool_spin.setToolTip("호스트마다 유지할 keep-alive 연결 수 (실행 중인 작업에도 다음 요청부터 적용)")
+        queue_layout.addWidget(QLabel("호스트 연결"))
+        queue_layout.addWidget(self.pool_spin)
+        self.btn_priority_up = QPushButton("우선순위 ▲")
+        self.btn_priority_down = QPushButton("우선순위 ▼")
+        self.btn_front = QPushButton("맨 앞으로")
+        queue_layout.addWidget(self.btn_priority_up)
+        queue_layout.addWidget(self.btn_priority_down)
+        queue_layout.addWidget(self.btn_front)
+        self.queue_label = QLabel("실행 0 / 대기 0")
+        queue_layout.addStretch()
+        queue_layout.addWidget(self.queue_label)
+        self.post_label = QLabel("후처리 실행 0 / 대기 0")
+        queue_layout.addWidget(self.post_label)
+        v.addLayout(queue_layout)
+
+        # ── 대역폭 제한 (모든 작업 공유, 실행 중 변경 가능)
+        bw_layout = QHBoxLayout()
+        self.bandwidth_spin = QSpinBox()
+        self.bandwidth_spin.setRange(0, 10_000_000)
+        self.bandwidth_spin.setSingleStep(256)
+        self.bandwidth_spin.setSpecialValueText("무제한")
+        self.bandwidth_spin.setSuffix(" KB/s")
+        bw_layout.addWidget(QLabel("전체 대역폭"))
+        bw_layout.addWidget(self.bandwidth_spin)
+        self.limit_rules_edit = QLineEdit()
+        self.limit_rules_edit.setPlaceholderText("예) cdn.example.com=512, 09:00-18:00=1024  (KB/s)")
+        self.limit_rules_edit.setToolTip("호스트별 제한(호스트=KB/s)과 시간대별 전체 제한(HH:MM-HH:MM=KB/s)")
+        bw_layout.addWidget(QLabel("세부 제한"))
+        bw_layout.addWidget(self.limit_rules_edit, 1)
+        v.addLayout(bw_layout)
+
+        self.bandwidth_spin.valueChanged.connect(self._on_bandwidth_changed)
+        self.limit_rules_edit.editingFinished.connect(self._on_limit_rules_changed)
+
+        self.btn_priority_up.clicked.connect(lambda: self._reorder_selected(1))
+        self.btn_priority_down.clicked.connect(lambda: self._reorder_selected(-1))
+        self.btn_front.clicked.connect(lambda: self._reorder_selected(None))
+
         self.btn_add.clicked.connect(self.add_job)
         self.btn_start.clicked.connect(self.start_selected)
         self.btn_stop.clicked.connect(self.stop_selected)
+        self.btn_resume.clicked.connect(self.resume_selected)
         self.btn_remove.clicked.connect(self.remove_selected)
 
-        # ── 테이블
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["선택", "원본 URL", "저장경로", "저장이름", "진행상황"])
+        # ── 테이블 (작업 상태는 모델이 작업 ID 로 관리, 체크박스/진행 막대는 delegate 가 그림)
+        self.jobs = JobTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.jobs)
+        self.table.setItemDelegateForColumn(COL_CHECK, CheckBoxDelegate(self.table))
+        self.table.setItemDelegateForColumn(COL_PROGRESS, ProgressDelegate(self.table))
         # 모든 컬럼 크기 조절 가능하도록 설정
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         header.setStretchLastSection(True)
+        # 행 높이 고정 - 행이 많아도 높이를 다시 재지 않음
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         # 기본 컬럼 너비 설정
-        self.table.setColumnWidth(0, 50)   # 선택
-        self.table.setColumnWidth(1, 400)  # 원본 URL
-        self.table.setColumnWidth(2, 120)  # 저장경로
-        self.table.setColumnWidth(3, 120)  # 저장이름
-        self.table.setColumnWidth(4, 200)  # 진행상황
+        self.table.setColumnWidth(COL_CHECK, 50)
+        self.table.setColumnWidth(COL_URL, 400)
+        self.table.setColumnWidth(COL_DIR, 120)
+        self.table.setColumnWidth(COL_NAME, 120)
+        self.table.setColumnWidth(COL_PROGRESS, 200)
         v.addWidget(self.table)
 
-        # QThread 기반 워커 관리
+        # QThread 기반 워커 관리 (작업 ID → 워커, 워커 → 작업 ID)
         self.workers: Dict[int, DownloadWorker] = {}
+        self._job_ids: Dict[object, int] = {}
+
+        # 다운로드 대기열 - 동시 실행 수 제한 안에서 순서대로 시작
+        self.scheduler = DownloadScheduler(self.max_jobs_spin.value(), self.per_host_spin.value(), parent=self)
+        self.scheduler.queue_changed.connect(self._on_queue_changed)
+        # 대기열 순번 갱신은 이벤트 루프 한 바퀴에 한 번 (작업 여러 개를 넣을 때마다 전체를 훑지 않음)
+        self._queue_refresh = QTimer(self)
+        self._queue_refresh.setSingleShot(True)
+        self._queue_refresh.timeout.connect(self._refresh_queue_positions)
+        self.max_jobs_spin.valueChanged.connect(self._on_limits_changed)
+        self.per_host_spin.valueChanged.connect(self._on_limits_changed)
+        self.pool_spin.valueChanged.connect(self._on_pool_changed)
+
+        # 후처리(ffmpeg 변환) 대기열 - 다운로드 슬롯과 따로 제한
+        self.post_queue = QtPostProcessQueue(parent=self)
+        self.post_queue.step_started.connect(self._on_post_step)
+        self.post_queue.job_finished.connect(self._on_post_finished)
+        self.post_queue.depth_changed.connect(
+            lambda queued, running: self.post_label.setText(f"후처리 실행 {running} / 대기 {queued}")
+        )
+
+        # 진행 이벤트 - 모든 작업의 최신 상태를 0.5초마다 한 번에 받음 (작업 수와 상관없이 일정)
+        self.progress_bus = QtProgressBus(interval=0.5, parent=self)
+        self.progress_bus.updated.connect(self._on_progress_batch)
 
         # 저장이름 자동 증가 카운터
         self._job_counter = 0
 
-        # 진행 상태 저장 (row -> {'text': str, 'updated': bool})
-        self._progress_status: Dict[int, dict] = {}
-
-        # 완료된 다운로드 행 추적
-        self._completed_rows: set = set()
-
-        # 1초마다 UI 업데이트 타이머
+        # 1초마다 상태 메시지 반영 (바뀐 행만 다시 그림)
         self._update_timer = QTimer(self)
-        self._update_timer.timeout.connect(self._update_progress_labels)
+        self._update_timer.timeout.connect(self.jobs.flush)
         self._update_timer.start(1000)
 
     # ---------- helpers ----------
@@ -160,6 +279,10 @@ class App(QWidget):
         self.start_spin.setEnabled(is_segment and not self.auto_detect_chk.isChecked())
         self.end_spin.setEnabled(is_segment and not self.auto_detect_chk.isChecked())
         self.pad_spin.setEnabled(is_segment)
+        self.concurrency_spin.setEnabled(is_segment)
+        self.adaptive_chk.setEnabled(is_segment)
+        self.stream_remux_chk.setEnabled(is_segment)
+        self.remuxer_combo.setEnabled(is_segment)
         self.stop404_spin.setEnabled(is_segment and not self.auto_detect_chk.isChecked())
 
     def _get_video_type(self) -> VideoType:
@@ -180,105 +303,124 @@ class App(QWidget):
         if d:
             self.dir_edit.setText(d)
 
-    def _get_checkbox(self, row: int) -> Optional[QCheckBox]:
-        w = self.table.cellWidget(row, 0)
-        if isinstance(w, QCheckBox):
-            return w
-        if w is not None:
-            cb = w.findChild(QCheckBox)
-            if isinstance(cb, QCheckBox):
-                return cb
-        return None
-
     def parse_headers(self) -> Dict[str, str]:
         return parse_headers_text(self.hdr_edit.toPlainText())
 
     def _sanitize_filename(self, name: str) -> str:
         """파일명을 안전하게 정제 (경로 순회 방지 + .mp4 자동 부여)"""
-        name = (name or "output.mp4").strip()
-        # 경로 구분자 및 상위 디렉토리 참조 제거
-        name = name.replace(os.sep, "_").replace("/", "_").replace("\\", "_")
-        name = re.sub(r'\.\.+', '_', name)  # .. 제거
-        # 파일명에 허용되지 않는 문자 제거 (Windows 호환)
-        name = re.sub(r'[<>:"|?*]', '_', name)
-        # 확장자 확인
-        root, ext = os.path.splitext(name)
-        if not root:
-            root = "output"
-        if not ext:
-            ext = ".mp4"
-        return root + ext
-
-    def _cleanup_worker(self, row: int):
+        return sanitize_filename(name)
+
+    def _forget_worker(self, job_id: int):
+        """작업의 워커를 목록에서 빼고 정리"""
+        worker = self.workers.pop(job_id, None)
+        if worker is not None:
+            self._job_ids.pop(worker, None)
+            worker.deleteLater()
+
+    def _cleanup_worker(self, job_id: int):
         """완료된 워커 정리"""
-        if row in self.workers:
-            worker = self.workers[row]
-            if worker.isFinished():
-                worker.deleteLater()
-                del self.workers[row]
+        worker = self.workers.get(job_id)
+        if worker is not None and worker.isFinished():
+            self._forget_worker(job_id)
 
     def _generate_auto_filename(self) -> str:
         """자동 저장이름 생성 (output0001.mp4, output0002.mp4, ...)"""
         self._job_counter += 1
         return f"output{self._job_counter:04d}.mp4"
 
-    def _update_progress_labels(self):
-        """타이머로 1초마다 호출되어 진행 라벨 업데이트"""
-        for row, status in list(self._progress_status.items()):
-            if status.get('updated'):
-                label = self.table.cellWidget(row, 4)
-                if isinstance(label, QLabel):
-                    label.setText(status['text'])
-                status['updated'] = False
-
-    def _on_progress(self, row: int, seg_idx: int, last_size: int):
-        """프로그래스 시그널 핸들러 - 상태만 저장"""
-        info = self._segment_info.get(row, {})
-        if info.get('start') is not None and info.get('end') is not None:
-            total = info['end'] - info['start'] + 1
-            current = seg_idx - info['start'] + 1
-            percent = int((current / total) * 100)
-            text = f"{percent}% ({current}/{total}) - {last_size//1024} KB"
-        else:
-            text = f"{seg_idx} seg, {last_size//1024} KB"
-
-        if row in self._progress_status:
-            self._progress_status[row]['text'] = text
-            self._progress_status[row]['updated'] = True
-
-    def _on_status(self, row: int, msg: str):
-        """상태 시그널 핸들러 - 상태만 저장"""
-        if row in self._progress_status:
-            self._progress_status[row]['text'] = msg
-            self._progress_status[row]['updated'] = True
-
-        # 탐지 완료 메시지에서 범위 파싱
-        if "탐지 완료:" in msg:
-            try:
-                parts = msg.split(":")
-                if len(parts) >= 2:
-                    range_part = parts[1].split("(")[0].strip()
-                    start_end = range_part.split("~")
-                    if len(start_end) == 2:
-                        if row not in self._segment_info:
-                            self._segment_info[row] = {}
-                        self._segment_info[row]['start'] = int(start_end[0].strip())
-                        self._segment_info[row]['end'] = int(start_end[1].strip())
-            except:
-                pass
-
-    def _on_done(self, row: int, success: bool, message: str):
+    def _is_active(self, job_id: int) -> bool:
+        """실행 중이거나 대기열에 있는 작업인지"""
+        worker = self.workers.get(job_id)
+        return worker is not None and (worker.isRunning() or self.scheduler.is_queued(worker)
+                                       or self.post_queue.is_pending(worker))
+
+    def _on_post_step(self, worker, step: str):
+        job_id = self._job_ids.get(worker)
+        if job_id is not None:
+            self._on_status(job_id, f"{step} 중…")
+
+    def _on_post_finished(self, worker, success: bool, message: str, durations: list):
+        """후처리 결과 - 단계별 소요 시간을 붙여 완료 처리"""
+        job_id = self._job_ids.get(worker)
+        if job_id is None:
+            return
+        if durations:
+            message = f"{message} ({format_durations(durations)})"
+        self._on_done(job_id, success, message)
+
+    def _on_limits_changed(self, _value=None):
+        """동시 작업 수 변경 - 실행 중에도 바로 반영"""
+        self.scheduler.set_limits(self.max_jobs_spin.value(), self.per_host_spin.value())
+
+    def _on_pool_changed(self, value: int):
+        """호스트당 keep-alive 연결 수 변경 - 이미 연결된 호스트에도 적용"""
+        from transport import get_transport  # requests 는 처음 바꿀 때 로드
+        get_transport().configure(pool_maxsize=value)
+
+    def _on_bandwidth_changed(self, value: int):
+        """전체 대역폭 제한 변경 - 실행 중인 작업에도 다음 청크부터 적용"""
+        get_limiter().set_global_rate(value * 1024)
+
+    def _on_limit_rules_changed(self):
+        """호스트별/시간대별 제한 적용"""
+        try:
+            host_rates, schedule = parse_limit_rules(self.limit_rules_edit.text())
+        except ValueError as e:
+            QMessageBox.critical(self, "대역폭 제한 오류", str(e))
+            return
+        limiter = get_limiter()
+        limiter.set_host_rates(host_rates)
+        limiter.set_schedule(schedule)
+
+    def _on_queue_changed(self):
+        """대기열이 바뀜 - 순번 표시는 모아서 한 번에"""
+        self._queue_refresh.start(0)
+
+    def _refresh_queue_positions(self):
+        """대기 중인 작업에 대기열 순번 표시"""
+        for worker, pos in self.scheduler.queue_positions().items():
+            job_id = self._job_ids.get(worker)
+            if job_id is not None:
+                self.jobs.set_status(job_id, f"대기열 {pos}번")
+        self.jobs.flush()
+        self.queue_label.setText(f"실행 {self.scheduler.running_count} / 대기 {self.scheduler.queued_count}")
+
+    def _reorder_selected(self, delta: Optional[int]):
+        """선택된 대기 작업의 우선순위 변경 (delta=None 이면 맨 앞으로)"""
+        for job in self.jobs.checked_jobs():
+            worker = self.workers.get(job.job_id)
+            if worker is None:
+                continue
+            if delta is None:
+                self.scheduler.move_to_front(worker)
+            else:
+                self.scheduler.change_priority(worker, delta)
+        self._on_queue_changed()
+
+    def _on_progress_batch(self, batch: dict):
+        """진행 버스 핸들러 - 바뀐 작업들의 진행 이벤트 (범위, 속도, 남은 시간은 워커가 계산)"""
+        for worker, event in batch.items():
+            job = self.jobs.job(self._job_ids.get(worker))
+            if job is None or job.completed:
+                continue
+            self.jobs.set_progress(job.job_id, format_progress(event), event.fraction)
+        self.jobs.flush()
+
+    def _on_status(self, job_id: int, msg: str):
+        """상태 시그널 핸들러 - 상태만 저장 (타이머가 반영), 끝난 행의 완료/실패 문구는 덮어쓰지 않음"""
+        job = self.jobs.job(job_id)
+        if job is not None and not job.completed:
+            self.jobs.set_status(job_id, msg)
+
+    def _on_done(self, job_id: int, success: bool, message: str):
         """완료 시그널 핸들러 - 즉시 업데이트"""
         text = ("완료: " if success else "실패: ") + message
-        label = self.table.cellWidget(row, 4)
-        if isinstance(label, QLabel):
-            label.setText(text)
-        if row in self._progress_status:
-            self._progress_status[row]['text'] = text
-            self._progress_status[row]['updated'] = False
-        # 완료된 행으로 표시
-        self._completed_rows.add(row)
-        self._cleanup_worker(row)
+        # 중단/실패했지만 저널이 남아 있으면 재개 가능
+        worker = self.workers.get(job_id)
+        journal_path = getattr(worker, 'journal_path', None)
+        resumable = not success and journal_path and os.path.exists(journal_path)
+        self.jobs.finish(job_id, text, journal_path if resumable else None)
+        self._cleanup_worker(job_id)
 
     # ---------- actions ----------
     def add_job(self):
@@ -298,39 +440,12 @@ class App(QWidget):
         # 자동 저장이름 생성
         out_name = self._generate_auto_filename()
 
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-
-        # 체크박스를 중앙에 배치
-        chk = QCheckBox()
-        chk.setChecked(True)  # 자동 체크
-        chk_widget = QWidget()
-        chk_layout = QHBoxLayout(chk_widget)
-        chk_layout.addWidget(chk)
-        chk_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        chk_layout.setContentsMargins(0, 0, 0, 0)
-        self.table.setCellWidget(row, 0, chk_widget)
-
-        self.table.setItem(row, 1, QTableWidgetItem(url))
-        self.table.setItem(row, 2, QTableWidgetItem(save_dir))
-        self.table.setItem(row, 3, QTableWidgetItem(out_name))
-
-        # 진행상황 UI (텍스트 라벨)
-        label = QLabel("대기 중")
-        label.setStyleSheet("padding: 4px;")
-        self.table.setCellWidget(row, 4, label)
-
-        # 진행 상태 초기화
-        self._progress_status[row] = {'text': '대기 중', 'updated': False}
+        # 새 행 (자동 체크, '대기 중')
+        job = self.jobs.add_job(url, save_dir, out_name)
 
         # URL 입력창 비우기
         self.url_edit.clear()
 
-        # 새로 추가된 행만 다운로드 시작
-        self._start_row(row)
-
-    def _start_row(self, row: int):
-        """특정 행의 다운로드 시작"""
         # 헤더 파싱
         try:
             headers = self.parse_headers()
@@ -338,31 +453,53 @@ class App(QWidget):
             QMessageBox.critical(self, "헤더 오류", str(e))
             return
 
-        # 이미 실행 중인 워커가 있으면 스킵
-        if row in self.workers and self.workers[row].isRunning():
-            return
+        # 새로 추가된 행만 다운로드 시작 (같은 URL·이름으로 중단된 다운로드가 있으면 이어받을지 물어봄)
+        self._start_job(job.job_id, headers, resume_journal=self._offer_resume(job.job_id))
+
+    def _offer_resume(self, job_id: int) -> Optional[str]:
+        """저장 폴더에 같은 URL·저장이름의 중단된 저널이 있으면 이어받을지 확인 - 이어받을 저널 경로 또는 None"""
+        job = self.jobs.job(job_id)
+        if job is None or self.stream_remux_chk.isChecked() or self._get_video_type() != VideoType.YASYA:
+            return None
+        save_dir = job.save_dir.strip() or os.getcwd()
+        out_name = self._sanitize_filename(job.out_name.strip() or "output.mp4")
+        path = find_journal(save_dir, job.url.strip(), out_name)
+        if path is None:
+            return None
+        answer = QMessageBox.question(
+            self, "이어받기",
+            f"같은 URL 을 '{out_name}' 으로 받다가 중단된 기록이 있습니다.\n"
+            f"받은 곳부터 이어받을까요? ('아니요'면 새 파일로 처음부터 받습니다)\n\n{path}",
+        )
+        return path if answer == QMessageBox.StandardButton.Yes else None
+
+    def _start_job(self, job_id: int, headers: Dict[str, str], resume_journal: Optional[str] = None) -> bool:
+        """작업 하나를 대기열에 넣음 (resume_journal 이 있으면 해당 저널에서 이어받기) - 넣었으면 True"""
+        job = self.jobs.job(job_id)
+        if job is None:
+            return False
+
+        # 이미 실행 중이거나 대기 중인 워커가 있으면 스킵
+        if self._is_active(job_id):
+            return False
 
         # 이미 완료된 다운로드는 스킵
-        if row in self._completed_rows:
-            return
+        if job.completed:
+            return False
 
-        # URL/경로/파일명
-        url_item = self.table.item(row, 1)
-        dir_item = self.table.item(row, 2)
-        name_item = self.table.item(row, 3)
-        if not url_item:
-            return
+        # 기존 완료된 워커 정리
+        self._cleanup_worker(job_id)
 
-        url_text = (url_item.text() or "").strip()
+        # 1) URL/경로/파일명
+        url_text = (job.url or "").strip()
         if not url_text:
-            return
+            return False
 
-        save_dir = (dir_item.text().strip() if dir_item and dir_item.text() else os.getcwd())
-        raw_name = (name_item.text().strip() if name_item and name_item.text() else "output.mp4")
-        out_name = self._sanitize_filename(raw_name)
+        save_dir = job.save_dir.strip() or os.getcwd()
+        out_name = self._sanitize_filename(job.out_name.strip() or "output.mp4")
         os.makedirs(save_dir, exist_ok=True)
 
-        # 잡 설정
+        # 2) 잡 설정
         video_type = self._get_video_type()
         auto_detect = self.auto_detect_chk.isChecked()
         cfg = JobConfig(
@@ -378,148 +515,114 @@ class App(QWidget):
             timeout=30,
             headers=headers,
             auto_detect=auto_detect,
+            concurrency=self.concurrency_spin.value(),
+            adaptive_concurrency=self.adaptive_chk.isChecked(),
+            stream_remux=self.stream_remux_chk.isChecked(),
+            remuxer=self.remuxer_combo.currentData(),
+            profile=self.profile_chk.isChecked(),
+            resume_journal=resume_journal,
         )
 
-        # 비디오 타입에 따라 적절한 워커 생성
+        # 3) 비디오 타입에 따라 적절한 워커 생성
         if video_type == VideoType.PORNHUB:
             worker = PornhubDownloadWorker(cfg, parent=self)
         else:
             worker = DownloadWorker(cfg, parent=self)
-        self.workers[row] = worker
-
-        # 세그먼트 범위를 저장할 딕셔너리 초기화
-        if not hasattr(self, '_segment_info'):
-            self._segment_info = {}
-        self._segment_info[row] = {'start': None, 'end': None}
+        self.workers[job_id] = worker
+        self._job_ids[worker] = job_id
 
-        # 시그널 핸들러 연결
-        worker.progress.connect(lambda seg, size, r=row: self._on_progress(r, seg, size))
-        worker.status.connect(lambda msg, r=row: self._on_status(r, msg))
-        worker.done.connect(lambda success, msg, r=row: self._on_done(r, success, msg))
+        # 4) 시그널 핸들러 연결 (진행 이벤트는 버스로 모아서 받음)
+        worker.progress_bus = self.progress_bus
+        worker.status.connect(lambda msg, j=job_id: self._on_status(j, msg))
+        worker.done.connect(lambda success, msg, j=job_id: self._on_done(j, success, msg))
+        if isinstance(worker, DownloadWorker):
+            worker.post_queue = self.post_queue
 
-        # QThread 시작
-        worker.start()
+        # 5) 대기열에 넣음 (동시 실행 제한 안에서 시작됨)
+        self.scheduler.submit(worker, job_host(url_text))
+        return True
 
     def start_selected(self):
-        # 1) 헤더 파싱
+        # 헤더 파싱
         try:
             headers = self.parse_headers()
         except ValueError as e:
             QMessageBox.critical(self, "헤더 오류", str(e))
             return
 
-        started = 0
-        for row in range(self.table.rowCount()):
-            chk = self._get_checkbox(row)
-            if not chk or not chk.isChecked():
-                continue
-
-            # 이미 실행 중인 워커가 있으면 스킵
-            if row in self.workers and self.workers[row].isRunning():
-                continue
-
-            # 이미 완료된 다운로드는 스킵
-            if row in self._completed_rows:
-                continue
-
-            # 기존 완료된 워커 정리
-            self._cleanup_worker(row)
+        started = sum(self._start_job(job.job_id, headers) for job in self.jobs.checked_jobs())
+        if started == 0:
+            QMessageBox.information(self, "안내", "체크된 항목이 없거나 이미 실행 중입니다.")
 
-            # 2) URL/경로/파일명
-            url_item = self.table.item(row, 1)
-            dir_item = self.table.item(row, 2)
-            name_item = self.table.item(row, 3)
-            if not url_item:
-                continue
+    def resume_selected(self):
+        """중단/실패한 선택 행을 저널에서 이어받기"""
+        try:
+            headers = self.parse_headers()
+        except ValueError as e:
+            QMessageBox.critical(self, "헤더 오류", str(e))
+            return
 
-            url_text = (url_item.text() or "").strip()
-            if not url_text:
+        resumed = 0
+        for job in self.jobs.checked_jobs():
+            journal_path = job.resume_journal
+            if not journal_path or not os.path.exists(journal_path):
                 continue
+            self._cleanup_worker(job.job_id)
+            job.resume_journal = None
+            job.completed = False
+            resumed += self._start_job(job.job_id, headers, resume_journal=journal_path)
 
-            save_dir = (dir_item.text().strip() if dir_item and dir_item.text() else os.getcwd())
-            raw_name = (name_item.text().strip() if name_item and name_item.text() else "output.mp4")
-            out_name = self._sanitize_filename(raw_name)
-            os.makedirs(save_dir, exist_ok=True)
-
-            # 3) 잡 설정
-            video_type = self._get_video_type()
-            auto_detect = self.auto_detect_chk.isChecked()
-            cfg = JobConfig(
-                base_folder_url=url_text,
-                save_dir=save_dir,
-                out_name=out_name,
-                video_type=video_type,
-                start=self.start_spin.value(),
-                zero_pad=self.pad_spin.value(),
-                end=(None if self.end_spin.value() == 0 else self.end_spin.value()),
-                stop_after_n_404=self.stop404_spin.value(),
-                retry=5,
-                timeout=30,
-                headers=headers,
-                auto_detect=auto_detect,
-            )
-
-            # 4) 비디오 타입에 따라 적절한 워커 생성
-            if video_type == VideoType.PORNHUB:
-                worker = PornhubDownloadWorker(cfg, parent=self)
-            else:
-                worker = DownloadWorker(cfg, parent=self)
-            self.workers[row] = worker
-
-            # 5) 세그먼트 범위를 저장할 딕셔너리 초기화
-            if not hasattr(self, '_segment_info'):
-                self._segment_info = {}
-            self._segment_info[row] = {'start': None, 'end': None}
-
-            # 6) 시그널 핸들러 연결
-            worker.progress.connect(lambda seg, size, r=row: self._on_progress(r, seg, size))
-            worker.status.connect(lambda msg, r=row: self._on_status(r, msg))
-            worker.done.connect(lambda success, msg, r=row: self._on_done(r, success, msg))
-
-            # 7) QThread 시작
-            worker.start()
-            started += 1
-
-        if started == 0:
-            QMessageBox.information(self, "안내", "체크된 항목이 없거나 이미 실행 중입니다.")
+        if resumed == 0:
+            QMessageBox.information(self, "안내", "이어받을 수 있는 항목이 없습니다.")
 
     def stop_selected(self):
         """선택된 다운로드 중지"""
         stopped = 0
-        for row in range(self.table.rowCount()):
-            chk = self._get_checkbox(row)
-            if not chk or not chk.isChecked():
+        for job in self.jobs.checked_jobs():
+            worker = self.workers.get(job.job_id)
+            if worker is None:
                 continue
-            if row in self.workers and self.workers[row].isRunning():
-                self.workers[row].stop()
+            if self.scheduler.cancel(worker):
+                # 아직 시작 전이면 대기열에서만 빼고 다시 시작할 수 있게 둠
+                self._forget_worker(job.job_id)
+                self.jobs.set_status(job.job_id, "대기 취소")
+                stopped += 1
+            elif worker.isRunning():
+                worker.stop()
                 stopped += 1
 
         if stopped == 0:
             QMessageBox.information(self, "안내", "중지할 항목이 없습니다.")
+        self.jobs.flush()
 
     def remove_selected(self):
-        rows_to_remove = []
-        for row in range(self.table.rowCount()):
-            chk = self._get_checkbox(row)
-            if chk and chk.isChecked():
-                # 실행 중인 워커가 있으면 중지
-                if row in self.workers:
-                    if self.workers[row].isRunning():
-                        self.workers[row].stop()
-                        self.workers[row].wait(1000)  # 최대 1초 대기
-                    self.workers[row].deleteLater()
-                    del self.workers[row]
-                rows_to_remove.append(row)
-
-        for offset, row in enumerate(rows_to_remove):
-            self.table.removeRow(row - offset)
+        job_ids = [job.job_id for job in self.jobs.checked_jobs()]
+        for job_id in job_ids:
+            # 실행 중인 워커가 있으면 중지 (대기 중이면 대기열에서 제거)
+            worker = self.workers.get(job_id)
+            if worker is None:
+                continue
+            self.scheduler.cancel(worker)
+            if worker.isRunning():
+                worker.stop()
+                worker.wait(1000)  # 최대 1초 대기
+            self._forget_worker(job_id)
+        # 상태는 작업 ID 로 찾으므로 남은 행의 번호가 바뀌어도 그대로
+        self.jobs.remove_jobs(job_ids)
 
     def closeEvent(self, event):
         """앱 종료 시 모든 워커 정리"""
-        for row, worker in list(self.workers.items()):
+        for job_id, worker in list(self.workers.items()):
+            self.scheduler.cancel(worker)
             if worker.isRunning():
                 worker.stop()
                 worker.wait(2000)  # 최대 2초 대기
-            worker.deleteLater()
-        self.workers.clear()
+            self._forget_worker(job_id)
+        # 진행 중인 변환은 마치고, 대기 중인 변환은 저널을 남겨 다음에 이어받기로 처리
+        self.post_queue.shutdown(wait=True)
+        self.progress_bus.shutdown()
+        # URL 추출용으로 띄워 둔 Chrome 종료 (작업을 하나도 안 했으면 resolver 는 로드되지 않음)
+        resolver = sys.modules.get("resolver")
+        if resolver is not None:
+            resolver.shutdown_resolver_service()
         event.accept()
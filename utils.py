@@ -1,3 +1,4 @@
+import os
 import re
 
 # 허용되는 헤더 키 패턴 (보안상 위험한 헤더 차단)
@@ -65,3 +66,20 @@ def parse_headers_text(text: str) -> dict:
         hdrs[k] = v
 
     return hdrs
+
+
+def sanitize_filename(name: str) -> str:
+    """파일명을 안전하게 정제 (경로 순회 방지 + .mp4 자동 부여)"""
+    name = (name or "output.mp4").strip()
+    # 경로 구분자 및 상위 디렉토리 참조 제거
+    name = name.replace(os.sep, "_").replace("/", "_").replace("\\", "_")
+    name = re.sub(r'\.\.+', '_', name)  # .. 제거
+    # 파일명에 허용되지 않는 문자 제거 (Windows 호환)
+    name = re.sub(r'[<>:"|?*]', '_', name)
+    # 확장자 확인
+    root, ext = os.path.splitext(name)
+    if not root:
+        root = "output"
+    if not ext:
+        ext = ".mp4"
+    return root + ext